@@ -1,6 +1,11 @@
+import argparse
 import json
+import os
+import random
+import re
 import time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # 우리가 만든 게임 로직과 AI들을 가져옵니다.
 from dalmuti_game import GameState
@@ -9,12 +14,19 @@ try:
 except ImportError:
     print("WARNING: mcts_pro.py not found. MCTS_PRO style will not be available.")
     MCTS_Pro_AI = None
+try:
+    from batched_rollout import BatchedRollout, np
+    from feature_encoder import FeatureEncoder
+except ImportError:
+    BatchedRollout, np, FeatureEncoder = None, None, None
 
 # --- 시뮬레이션 설정 ---
 PLAYER_COUNTS_TO_TEST = [4, 5, 6, 7]  # 테스트할 플레이어 수
 GAMES_PER_SETUP = 100               # 각 플레이어 수마다 반복할 게임 횟수 (10000은 매우 오래 걸립니다)
 MCTS_ITERATIONS = 500               # AI의 생각 깊이 (200~500 정도가 적당합니다)
+MCTS_TIME_BUDGET_MS = None          # 수마다 생각 시간 상한(ms). None이면 반복 횟수만 사용
 LOG_FILE_PATH = 'dalmuti_strategy_log.jsonl' # 로그가 저장될 파일 (.jsonl 형식)
+BASELINE_GAMES = 20000              # 무작위 플레이 기준선 통계에 사용할 게임 수 (NumPy 배치 롤아웃)
 
 def state_to_vector(state: GameState):
     """ 현재 게임 상태(State)를 머신러닝 모델이 이해할 수 있는 숫자 벡터로 변환합니다. """
@@ -64,6 +76,53 @@ def action_to_dict(action):
         return {"action_type": "pass"}
     return {"action_type": "play", "rank": action['rank'], "count": action['count']}
 
+def play_logged_game(mcts_ai, num_players, game_id):
+    """ MCTS-Pro끼리 한 판을 진행하고 (턴 데이터 목록, 승자 번호)를 반환합니다. 턴 데이터에는 결과까지 채워집니다. """
+    # 모든 플레이어는 MCTS_PRO 스타일
+    state = GameState(['mcts_pro'] * num_players)
+    # 특징 벡터는 인코더가 수마다 바뀐 만큼만 갱신 (NumPy가 없으면 state_to_vector로 매번 계산)
+    encoder = FeatureEncoder(state) if FeatureEncoder is not None else None
+    mcts_ai.reset()
+
+    game_turns_data = [] # 이번 게임의 모든 턴 데이터를 임시 저장
+    turn_number = 0
+
+    while not state.game_over:
+        turn_number += 1
+        current_player_index = state.turn_index
+
+        # 1. 행동 전 '상황' 기록
+        state_vector = encoder.encode().tolist() if encoder is not None else state_to_vector(state)
+
+        # 2. MCTS AI가 '행동' 결정
+        best_move = mcts_ai.find_best_move(initial_state=state)
+
+        # 3. (상황, 행동) 데이터를 임시 저장
+        turn_data = {
+            "game_id": game_id,
+            "turn_number": turn_number,
+            "player_index": current_player_index,
+            "state_vector": state_vector,
+            "action": action_to_dict(best_move)
+        }
+        game_turns_data.append(turn_data)
+
+        # 4. 결정된 행동으로 게임 진행 (AI의 보관 트리도 같은 수만큼 이동)
+        mcts_ai.observe(best_move, state)
+        if encoder is not None:
+            encoder.make_move(best_move)
+        elif best_move == "pass":
+            state.player_pass(state.turn_index)
+        else:
+            state.play_cards(state.turn_index, best_move['rank'], best_move['count'])
+
+    # 5. 게임 종료 후, 모든 턴 데이터에 '결과' 추가
+    winner_index = state.winner_index
+    for turn_data in game_turns_data:
+        # 이 턴을 수행한 플레이어가 최종 승자인지 여부
+        turn_data['outcome_win'] = 1 if turn_data['player_index'] == winner_index else 0
+    return game_turns_data, winner_index
+
 def run_simulation():
     if not MCTS_Pro_AI:
         print("MCTS_Pro_AI is not available. Please make sure mcts_pro.py is in the same folder.")
@@ -76,48 +135,13 @@ def run_simulation():
         for num_players in PLAYER_COUNTS_TO_TEST:
             print(f"\n--- Simulating for {num_players} players ---")
             
-            # 모든 플레이어는 MCTS_PRO 스타일
-            player_styles = ['mcts_pro'] * num_players
-            mcts_ai = MCTS_Pro_AI(iterations=MCTS_ITERATIONS)
+            # 플레이어별 탐색 트리를 보관해 두고 실제 진행된 수만큼 옮겨가며 재사용
+            mcts_ai = MCTS_Pro_AI(iterations=MCTS_ITERATIONS, reuse_tree=True,
+                                  time_budget_ms=MCTS_TIME_BUDGET_MS)
             
             for game_id in range(GAMES_PER_SETUP):
-                state = GameState(player_styles)
-                
-                game_turns_data = [] # 이번 게임의 모든 턴 데이터를 임시 저장
-                turn_number = 0
-
-                while not state.game_over:
-                    turn_number += 1
-                    current_player_index = state.turn_index
-                    
-                    # 1. 행동 전 '상황' 기록
-                    state_vector = state_to_vector(state)
-                    
-                    # 2. MCTS AI가 '행동' 결정
-                    best_move = mcts_ai.find_best_move(initial_state=state)
-                    
-                    # 3. (상황, 행동) 데이터를 임시 저장
-                    turn_data = {
-                        "game_id": f"{num_players}p_{game_id}",
-                        "turn_number": turn_number,
-                        "player_index": current_player_index,
-                        "state_vector": state_vector,
-                        "action": action_to_dict(best_move)
-                    }
-                    game_turns_data.append(turn_data)
-
-                    # 4. 결정된 행동으로 게임 진행
-                    if best_move == "pass":
-                        state.player_pass(state.turn_index)
-                    else:
-                        state.play_cards(state.turn_index, best_move['rank'], best_move['count'])
-
-                # 5. 게임 종료 후, 모든 턴 데이터에 '결과' 추가
-                winner_index = state.winner_index
+                game_turns_data, winner_index = play_logged_game(mcts_ai, num_players, f"{num_players}p_{game_id}")
                 for turn_data in game_turns_data:
-                    # 이 턴을 수행한 플레이어가 최종 승자인지 여부
-                    turn_data['outcome_win'] = 1 if turn_data['player_index'] == winner_index else 0
-                    
                     # 완성된 턴 데이터를 JSONL 형식으로 파일에 기록
                     f.write(json.dumps(turn_data) + '\n')
                 
@@ -125,8 +149,208 @@ def run_simulation():
 
     print(f"\nSimulation complete! All data saved to {LOG_FILE_PATH}")
 
-if __name__ == '__main__':
+# --- 병렬 데이터 생성 (generate) ---
+# 게임마다 (기준 시드, 게임 ID)로 정해지는 시드를 써서 같은 게임은 몇 번을 다시 돌려도 같은 기록이 나옵니다.
+# (time_budget_ms를 주면 반복 횟수가 기계 속도에 따라 달라지므로 재현되지 않습니다)
+# 작업 하나(= 한 플레이어 수의 연속된 게임 묶음)마다 샤드 파일 하나를 임시 이름으로 쓴 뒤 원자적으로 이름을 바꾸고,
+# 끝난 샤드의 game_id들을 manifest에 한 줄씩 덧붙입니다. 중단 후 다시 실행하면 manifest에 있는 게임은 건너뜁니다.
+MANIFEST_NAME = 'manifest.jsonl'
+
+def game_seed(base_seed, game_id):
+    """ 게임별 시드. random.seed에 문자열을 주면 해시 시드와 무관하게 항상 같은 값으로 초기화됩니다. """
+    return f"{base_seed}:{game_id}"
+
+SHARD_NAME_PATTERN = re.compile(r'\d+p_\d{6}-\d{6}\.jsonl')
+TMP_NAME_PATTERN = re.compile(r'\d+p_\d{6}-\d{6}\.jsonl\.\d+\.tmp')   # 쓰다 죽은 워커가 남긴 샤드
+
+def shard_name(num_players, first_game, last_game):
+    return f"{num_players}p_{first_game:06d}-{last_game:06d}.jsonl"
+
+def _generate_shard(out_dir, num_players, game_indexes, iterations, base_seed):
+    """ 워커 프로세스에서 게임 묶음을 진행해 샤드 하나를 씁니다. (플레이어 수, game_id 목록, 턴 수, 걸린 시간)을 반환 """
+    start = time.perf_counter()
+    mcts_ai = MCTS_Pro_AI(iterations=iterations, reuse_tree=True)
+    name = shard_name(num_players, game_indexes[0], game_indexes[-1])
+    final_path = os.path.join(out_dir, name)
+    tmp_path = f"{final_path}.{os.getpid()}.tmp"
+
+    game_ids = []
+    turns = 0
+    with open(tmp_path, 'w') as f:
+        for index in game_indexes:
+            game_id = f"{num_players}p_{index}"
+            random.seed(game_seed(base_seed, game_id))
+            game_turns_data, _ = play_logged_game(mcts_ai, num_players, game_id)
+            for turn_data in game_turns_data:
+                f.write(json.dumps(turn_data) + '\n')
+            game_ids.append(game_id)
+            turns += len(game_turns_data)
+        f.flush()
+        os.fsync(f.fileno())
+    # 다 쓴 샤드만 최종 이름으로 보이게 함 (중간에 죽으면 .tmp만 남고, 다음 실행의 recover_shards가 지운 뒤 다시 만듦)
+    os.replace(tmp_path, final_path)
+    return {'shard': name, 'num_players': num_players, 'game_ids': game_ids,
+            'turns': turns, 'elapsed': time.perf_counter() - start}
+
+def load_manifest(out_dir):
+    """ 이미 끝난 game_id 집합. 마지막 줄이 쓰다 만 채로 남아 있으면 무시합니다. """
+    done = set()
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                done.update(json.loads(line)['game_ids'])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+def recover_shards(out_dir):
+    """ 샤드 파일은 있는데 manifest에 없는 것 (최종 이름으로 바꾼 뒤 manifest에 쓰기 전에 죽은 경우)을 찾아
+        파일 안의 game_id로 manifest에 덧붙입니다. 샤드는 다 쓴 뒤에만 최종 이름이 되므로 그 게임들은 모두 끝난 것이고,
+        이렇게 해 두면 샤드 크기를 바꿔 다시 실행해도 같은 게임을 또 만들지 않습니다.
+        워커가 쓰다 죽어 남은 *.tmp는 지웁니다 (그 게임들은 manifest에 없으므로 다시 만들어짐).
+        실행 시작 때 워커를 띄우기 전에 부르므로 지금 쓰이고 있는 .tmp는 없습니다. 복구한 샤드 이름 목록을 반환합니다. """
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    listed = set()
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    listed.add(json.loads(line)['shard'])
+                except (ValueError, KeyError):
+                    continue
+
+    recovered = []
+    for name in sorted(os.listdir(out_dir)):
+        if TMP_NAME_PATTERN.fullmatch(name):
+            os.remove(os.path.join(out_dir, name))
+            continue
+        if name in listed or not SHARD_NAME_PATTERN.fullmatch(name):
+            continue
+        game_ids = []
+        turns = 0
+        with open(os.path.join(out_dir, name)) as f:
+            for line in f:
+                game_id = json.loads(line)['game_id']
+                if not game_ids or game_ids[-1] != game_id:
+                    game_ids.append(game_id)
+                turns += 1
+        recovered.append({'shard': name, 'game_ids': game_ids, 'turns': turns})
+    if recovered:
+        with open(path, 'a+b') as manifest:
+            # 쓰다 만 마지막 줄이 있으면 줄을 바꿔서 덧붙임
+            if manifest.tell():
+                manifest.seek(-1, os.SEEK_END)
+                if manifest.read(1) != b'\n':
+                    manifest.write(b'\n')
+            for entry in recovered:
+                manifest.write((json.dumps(entry) + '\n').encode())
+            manifest.flush()
+            os.fsync(manifest.fileno())
+    return [entry['shard'] for entry in recovered]
+
+def plan_shards(player_counts, games, games_per_shard, done):
+    """ 아직 끝나지 않은 샤드 작업 목록. 샤드 경계는 게임 번호로 고정되어 재실행해도 같은 이름이 나오고,
+        샤드 크기를 바꿔 다시 실행해도 이미 끝난 게임은 빼고 묶으므로 중복 기록이 생기지 않습니다. """
+    tasks = []
+    for num_players in player_counts:
+        for first in range(0, games, games_per_shard):
+            indexes = [i for i in range(first, min(first + games_per_shard, games))
+                       if f"{num_players}p_{i}" not in done]
+            if indexes:
+                tasks.append((num_players, indexes))
+    return tasks
+
+def run_generate(out_dir, player_counts=PLAYER_COUNTS_TO_TEST, games=GAMES_PER_SETUP, iterations=MCTS_ITERATIONS,
+                 workers=None, games_per_shard=10, base_seed=0):
+    """ 프로세스 풀로 게임을 나눠 돌려 out_dir에 JSONL 샤드로 기록합니다. 중단됐던 실행은 이어서 진행합니다. """
+    if not MCTS_Pro_AI:
+        print("MCTS_Pro_AI is not available. Please make sure mcts_pro.py is in the same folder.")
+        return
+
+    os.makedirs(out_dir, exist_ok=True)
+    recovered = recover_shards(out_dir)
+    if recovered:
+        print(f"Recovered {len(recovered)} finished shards missing from the manifest: {', '.join(recovered)}")
+    done = load_manifest(out_dir)
+    tasks = plan_shards(player_counts, games, games_per_shard, done)
+    print(f"--- Generating {games} games x {list(player_counts)} players into {out_dir} "
+          f"({len(done)} games already done, {len(tasks)} shards to go) ---")
+    if not tasks:
+        return
+
+    start = time.perf_counter()
+    progress = {n: {'games': 0, 'turns': 0} for n in player_counts}
+    workers = workers or os.cpu_count() or 1
+    with open(os.path.join(out_dir, MANIFEST_NAME), 'a') as manifest, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_generate_shard, out_dir, n, indexes, iterations, base_seed) for n, indexes in tasks]
+        for future in as_completed(futures):
+            result = future.result()
+            # 샤드 이름이 바뀐 뒤에만 기록하므로 manifest에 있는 게임은 항상 완성된 샤드에 들어 있음
+            manifest.write(json.dumps({'shard': result['shard'], 'game_ids': result['game_ids'],
+                                       'turns': result['turns']}) + '\n')
+            manifest.flush()
+            os.fsync(manifest.fileno())
+
+            counts = progress[result['num_players']]
+            counts['games'] += len(result['game_ids'])
+            counts['turns'] += result['turns']
+            elapsed = time.perf_counter() - start
+            print(f"  {result['shard']} done ({result['elapsed']:.1f}s) | " + " | ".join(
+                f"{n}p: {c['games']} games, {c['games'] / elapsed:.2f} games/s, {c['turns'] / elapsed:.1f} turns/s"
+                for n, c in progress.items() if c['games']))
+
+    print(f"\nGeneration complete! Shards saved to {out_dir}")
+
+def run_baseline_statistics(num_games=BASELINE_GAMES):
+    """ 모든 플레이어가 무작위로 둘 때의 기준선 통계 (선 플레이어 기준 좌석별 승률)를 빠르게 구합니다. """
+    if BatchedRollout is None or np is None:
+        print("NumPy is not available. Baseline statistics require numpy.")
+        return
+
+    print("--- Dalmuti Random-Play Baseline (batched rollouts) ---")
+    rollout = BatchedRollout()
+    for num_players in PLAYER_COUNTS_TO_TEST:
+        start = time.time()
+        batch = rollout.deal(num_games, num_players)
+        first_player = batch['turn'].copy()
+        winners = rollout.run(batch)
+        elapsed = time.time() - start
+
+        finished = winners >= 0
+        seat_offsets = (winners[finished] - first_player[finished]) % num_players
+        win_share = np.bincount(seat_offsets, minlength=num_players) / max(finished.sum(), 1)
+        seats = ", ".join(f"+{i}: {share:.3f}" for i, share in enumerate(win_share))
+        print(f"{num_players} players | {num_games / elapsed:,.0f} games/s | win share by seat after first player: {seats}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Dalmuti strategy simulation, logging and baseline statistics.")
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('simulate', help="play MCTS-Pro games one by one and append them to the log file (default)")
+    sub.add_parser('baseline', help="random-play baseline statistics with batched rollouts")
+    gen = sub.add_parser('generate', help="generate logged games in parallel into resumable JSONL shards")
+    gen.add_argument('--out-dir', default='dalmuti_strategy_shards')
+    gen.add_argument('--players', type=int, nargs='+', default=PLAYER_COUNTS_TO_TEST)
+    gen.add_argument('--games', type=int, default=GAMES_PER_SETUP, help="games per player count")
+    gen.add_argument('--iterations', type=int, default=MCTS_ITERATIONS)
+    gen.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    gen.add_argument('--games-per-shard', type=int, default=10)
+    gen.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
     start_time = time.time()
-    run_simulation()
+    if args.command == 'baseline':
+        run_baseline_statistics()
+    elif args.command == 'generate':
+        run_generate(args.out_dir, args.players, args.games, args.iterations,
+                     args.workers, args.games_per_shard, args.seed)
+    else:
+        run_simulation()
     end_time = time.time()
     print(f"Total simulation time: {end_time - start_time:.2f} seconds.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+# arena.py
+# 두 AI 설정(후보 vs 기준)을 한 게임 안에 섞어 앉혀 자가 대국을 돌리고,
+# 순차 확률비 검정(SPRT)으로 우열이 통계적으로 갈리는 즉시 멈추는 대국장.
+#  - 좌석: 후보가 candidate_seats개, 기준이 나머지 자리를 번갈아 차지하고, 게임마다 한 칸씩 돌려
+#    모든 설정이 모든 자리(선 플레이어 포함)를 같은 횟수만큼 맡게 합니다.
+#  - 병렬: 게임 하나가 워커 프로세스 작업 하나. 결과는 끝난 순서가 아니라 게임 번호 순서로 반영하므로
+#    짧게 끝나는 게임만 먼저 세어 SPRT가 치우치는 일이 없습니다.
+#  - Elo: 승자가 한 명인 N인 게임을 '이길 확률 ∝ 자리 수 × 강도'로 보고, 후보 팀 승률에서
+#    강도 비를 구해 Elo 차이(와 Wilson 95% 신뢰구간)로 바꿉니다. 후보가 절반 자리면 2인 게임과 같은 식입니다.
+#
+# AI 설정 문자열: 종류[:반복 횟수][:옵션=값,...]
+#   종류: mcts, pro, ismcts, flat, puct, random
+#   옵션: 생성자 인자 그대로 (예: reuse_tree=1, leaf_batch=16, c_puct=2.0)와 몇 가지 단축 옵션
+#         time=ms (time_budget_ms), rollout=정책 이름, belief=1 (pro/puct), net=모델 경로 (puct)
+#
+# 예) python arena.py pro:500 mcts:1000 --players 4 --games 400 --workers 4
+#     python arena.py pro:300:belief=1 pro:300 --elo0 0 --elo1 40 --out arena.json
+
+import argparse
+import json
+import math
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from analyze_strategy import game_seed
+from belief import CardBelief
+from dalmuti_game import GameState
+from flat_tree import FlatMCTS_AI
+from ismcts import ISMCTS_AI
+from mcts_ai import MCTS_AI
+from mcts_pro import MCTS_Pro_AI
+from mcts_puct import MCTS_PUCT_AI
+from rollout import make_rollout_engine
+
+Z_95 = 1.959963984540054
+
+
+class RandomAI:
+    """ 가능한 수 중 하나를 무작위로 고르는 기준선 """
+    def __init__(self, iterations=None):
+        pass
+
+    def find_best_move(self, state):
+        return random.choice(state.get_possible_moves())
+
+
+AI_TYPES = {
+    'mcts': MCTS_AI,
+    'pro': MCTS_Pro_AI,
+    'ismcts': ISMCTS_AI,
+    'flat': FlatMCTS_AI,
+    'puct': MCTS_PUCT_AI,
+    'random': RandomAI,
+}
+
+
+def _parse_value(text):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    lowered = text.lower()
+    if lowered in ('true', 'false'):
+        return lowered == 'true'
+    return text
+
+
+def make_ai(spec):
+    """ 'pro:500:reuse_tree=1,belief=1' 같은 설정 문자열로 AI를 만듭니다. """
+    kind, _, rest = spec.partition(':')
+    if kind not in AI_TYPES:
+        raise ValueError(f"Unknown AI type: {kind} (choose from {', '.join(AI_TYPES)})")
+    iterations, _, options = rest.partition(':')
+    kwargs = {}
+    if iterations:
+        kwargs['iterations'] = int(iterations)
+    for item in filter(None, options.split(',')):
+        key, _, value = item.partition('=')
+        value = _parse_value(value) if value else True
+        if key == 'time':
+            kwargs['time_budget_ms'] = value
+        elif key == 'rollout':
+            kwargs['rollout_engine'] = make_rollout_engine(value)
+        elif key == 'belief':
+            if value:
+                kwargs['belief'] = CardBelief()
+        else:
+            kwargs[key] = value
+    return AI_TYPES[kind](**kwargs)
+
+
+def seat_configs(num_players, candidate_seats, game_index):
+    """ 좌석별 설정 번호 (0 = 후보, 1 = 기준). 후보 자리를 고르게 흩어 놓고 게임마다 한 칸씩 돌립니다. """
+    pattern = [0 if (i * candidate_seats) // num_players != ((i + 1) * candidate_seats) // num_players else 1
+               for i in range(num_players)]
+    shift = game_index % num_players
+    return pattern[-shift:] + pattern[:-shift] if shift else pattern
+
+
+# ==============================================================================
+# 대국 (워커 프로세스에서 실행되므로 모듈 최상위 함수)
+# ==============================================================================
+_worker_ais = {}
+
+def _get_ai(spec):
+    ai = _worker_ais.get(spec)
+    if ai is None:
+        ai = _worker_ais[spec] = make_ai(spec)
+    return ai
+
+
+def play_game(specs, seats, seed):
+    """ 한 판을 진행하고 승자 자리, 설정별 생각 시간/수 개수, 전체 수 개수를 반환합니다. """
+    # AI를 처음 만들 때 (CardBelief 시드 등) 전역 random을 쓰므로, 캐시 여부와 관계없이 같은 판이 되도록 만든 뒤 시드
+    ais = [_get_ai(spec) for spec in specs]
+    random.seed(seed)
+    unique = list({id(ai): ai for ai in ais}.values())   # 같은 설정이면 같은 객체 (observe는 한 번만)
+    for index, ai in enumerate(unique):
+        if hasattr(ai, 'reset'):
+            ai.reset()
+        # 워커마다 한 번 만든 AI의 NumPy 난수(belief 배치 결정화, 배치 롤아웃)도 대국 시드로 다시 맞춤
+        # (전역 random 흐름은 건드리지 않도록 따로 만든 Random에서 뽑음)
+        if getattr(ai, 'belief', None) is not None:
+            ai.belief.reseed(random.Random(f"{seed}:belief:{index}").getrandbits(63))
+        if getattr(ai, 'batched_rollout', None) is not None:
+            ai.batched_rollout.rng = np.random.default_rng(random.Random(f"{seed}:rollout:{index}").getrandbits(63))
+
+    state = GameState(['mcts_pro'] * len(seats))
+    think = [0.0] * len(specs)
+    moves = [0] * len(specs)
+    plies = 0
+    while not state.game_over:
+        config = seats[state.turn_index]
+        start = time.perf_counter()
+        move = ais[config].find_best_move(state)
+        think[config] += time.perf_counter() - start
+        moves[config] += 1
+        plies += 1
+        for ai in unique:
+            if isinstance(ai, MCTS_Pro_AI):
+                ai.observe(move, state)
+            elif hasattr(ai, 'observe'):
+                ai.observe(move)
+
+        if move == "pass":
+            state.player_pass(state.turn_index)
+        else:
+            state.play_cards(state.turn_index, move['rank'], move['count'])
+    return {'winner_seat': state.winner_index, 'winner_config': seats[state.winner_index],
+            'think': think, 'moves': moves, 'plies': plies}
+
+
+# ==============================================================================
+# 통계: Elo, 신뢰구간, SPRT
+# ==============================================================================
+def expected_score(elo, candidate_seats, num_players):
+    """ 후보가 기준보다 elo만큼 강할 때 후보 자리 중 하나가 이길 확률 """
+    strength = 10 ** (elo / 400) * candidate_seats
+    return strength / (strength + num_players - candidate_seats)
+
+
+def elo_from_score(score, candidate_seats, num_players):
+    """ expected_score의 역함수. 승률 0이나 1은 ∓inf """
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    ratio = score * (num_players - candidate_seats) / ((1 - score) * candidate_seats)
+    return 400 * math.log10(ratio)
+
+
+def wilson_interval(wins, games, z=Z_95):
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    denom = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denom
+    half = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denom
+    return max(center - half, 0.0), min(center + half, 1.0)
+
+
+class SPRT:
+    """ 후보 팀 승패(베르누이)에 대한 Wald 순차 확률비 검정.
+        H0: 후보가 기준보다 elo0만큼 강함, H1: elo1만큼 강함 (elo0 < elo1). """
+
+    def __init__(self, elo0, elo1, alpha, beta, candidate_seats, num_players):
+        self.elo0, self.elo1 = elo0, elo1
+        self.alpha, self.beta = alpha, beta
+        p0 = expected_score(elo0, candidate_seats, num_players)
+        p1 = expected_score(elo1, candidate_seats, num_players)
+        self._win_llr = math.log(p1 / p0)
+        self._loss_llr = math.log((1 - p1) / (1 - p0))
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.llr = 0.0
+
+    def update(self, won):
+        self.llr += self._win_llr if won else self._loss_llr
+        return self.decision()
+
+    def decision(self):
+        """ 'H1' (후보가 elo1 이상 강함 채택), 'H0' (elo0 이하 채택), 아직이면 None """
+        if self.llr >= self.upper:
+            return 'H1'
+        if self.llr <= self.lower:
+            return 'H0'
+        return None
+
+
+# ==============================================================================
+# 대국장
+# ==============================================================================
+def run_match(candidate, baseline, num_players=4, max_games=1000, workers=1, seed=0, candidate_seats=None,
+              sprt=None, progress_every=50):
+    """ 후보와 기준 설정 문자열로 최대 max_games판을 돌리고 결과 요약 dict를 반환합니다.
+        sprt(SPRT 객체)가 결론을 내면 그 자리에서 멈춥니다. """
+    specs = [candidate, baseline]
+    if candidate_seats is None:
+        candidate_seats = max(num_players // 2, 1)
+    if not 0 < candidate_seats < num_players:
+        raise ValueError("candidate_seats must leave at least one seat for each configuration")
+    make_ai(candidate), make_ai(baseline)    # 설정 문자열 오류는 워커를 띄우기 전에 알림
+
+    results = []
+    decision = None
+    start = time.perf_counter()
+
+    def record(result):
+        nonlocal decision
+        results.append(result)
+        if sprt is not None:
+            decision = sprt.update(result['winner_config'] == 0)
+        if progress_every and len(results) % progress_every == 0:
+            wins = sum(r['winner_config'] == 0 for r in results)
+            print(f"  {len(results)} games | candidate {wins}/{len(results)}"
+                  + (f" | LLR {sprt.llr:+.2f} [{sprt.lower:.2f}, {sprt.upper:.2f}]" if sprt else ""))
+
+    def job(game_index):
+        return specs, seat_configs(num_players, candidate_seats, game_index), game_seed(seed, game_index)
+
+    if workers <= 1:
+        for game_index in range(max_games):
+            record(play_game(*job(game_index)))
+            if decision:
+                break
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending = {}
+            finished = {}
+            next_game = 0
+            while len(results) < max_games and not decision:
+                # 워커마다 두 판씩 밀어 넣어 두고, 끝난 결과는 게임 번호 순서대로만 반영
+                while next_game < max_games and len(pending) < workers * 2:
+                    pending[pool.submit(play_game, *job(next_game))] = next_game
+                    next_game += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished[pending.pop(future)] = future.result()
+                while len(results) in finished and not decision:
+                    record(finished.pop(len(results)))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    return summarize(results, specs, num_players, candidate_seats, sprt, time.perf_counter() - start)
+
+
+def summarize(results, specs, num_players, candidate_seats, sprt, elapsed):
+    games = len(results)
+    wins = sum(r['winner_config'] == 0 for r in results)
+    low, high = wilson_interval(wins, games)
+    configs = []
+    for i, spec in enumerate(specs):
+        think = sum(r['think'][i] for r in results)
+        moves = sum(r['moves'][i] for r in results)
+        configs.append({'spec': spec, 'seats': candidate_seats if i == 0 else num_players - candidate_seats,
+                        'ms_per_move': 1000 * think / max(moves, 1)})
+    report = {
+        'candidate': specs[0], 'baseline': specs[1], 'num_players': num_players,
+        'games': games, 'candidate_wins': wins,
+        'score': wins / games if games else 0.0,
+        'fair_score': candidate_seats / num_players,
+        'elo': elo_from_score(wins / games, candidate_seats, num_players) if games else 0.0,
+        'elo_95': [elo_from_score(low, candidate_seats, num_players), elo_from_score(high, candidate_seats, num_players)],
+        'elapsed': elapsed,
+        'games_per_sec': games / elapsed if elapsed > 0 else 0.0,
+        'plies_per_game': sum(r['plies'] for r in results) / max(games, 1),
+        'configs': configs,
+    }
+    if sprt is not None:
+        report['sprt'] = {'elo0': sprt.elo0, 'elo1': sprt.elo1, 'alpha': sprt.alpha, 'beta': sprt.beta,
+                          'llr': sprt.llr, 'bounds': [sprt.lower, sprt.upper], 'decision': sprt.decision()}
+    return report
+
+
+def print_report(report):
+    print(f"\n=== {report['candidate']} vs {report['baseline']} ({report['num_players']} players, "
+          f"{report['configs'][0]['seats']} candidate seats) ===")
+    print(f"games {report['games']} | candidate wins {report['candidate_wins']} | "
+          f"score {report['score']:.3f} (fair {report['fair_score']:.3f})")
+    low, high = report['elo_95']
+    print(f"Elo {report['elo']:+.1f}  95% CI [{low:+.1f}, {high:+.1f}]")
+    if 'sprt' in report:
+        s = report['sprt']
+        verdict = {'H1': f"candidate is at least {s['elo1']:+g} Elo (H1 accepted)",
+                   'H0': f"candidate is at most {s['elo0']:+g} Elo (H0 accepted)"}.get(s['decision'], 'undecided')
+        print(f"SPRT [{s['elo0']:+g}, {s['elo1']:+g}] alpha={s['alpha']} beta={s['beta']}: "
+              f"LLR {s['llr']:+.2f} in [{s['bounds'][0]:.2f}, {s['bounds'][1]:.2f}] -> {verdict}")
+    print(f"{report['games_per_sec']:.3f} games/s ({report['elapsed']:.1f}s, {report['plies_per_game']:.1f} plies/game)")
+    for config in report['configs']:
+        print(f"  {config['spec']:<32} {config['seats']} seats | {config['ms_per_move']:8.1f} ms/move")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Self-play arena with SPRT early stopping for two AI configurations.")
+    parser.add_argument('candidate', help="AI spec, e.g. pro:500 or pro:300:belief=1")
+    parser.add_argument('baseline', help="AI spec, e.g. mcts:1000")
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--candidate-seats', type=int, default=None, help="seats for the candidate (default: half)")
+    parser.add_argument('--games', type=int, default=1000, help="maximum number of games")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--elo0', type=float, default=0.0)
+    parser.add_argument('--elo1', type=float, default=50.0)
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    parser.add_argument('--no-sprt', action='store_true', help="always play --games games")
+    parser.add_argument('--out', help="write the report as JSON")
+    args = parser.parse_args()
+
+    candidate_seats = args.candidate_seats if args.candidate_seats is not None else max(args.players // 2, 1)
+    sprt = None if args.no_sprt else SPRT(args.elo0, args.elo1, args.alpha, args.beta,
+                                          candidate_seats, args.players)
+    report = run_match(args.candidate, args.baseline, args.players, args.games, args.workers, args.seed,
+                       candidate_seats, sprt)
+    print_report(report)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
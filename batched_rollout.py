@@ -0,0 +1,225 @@
+# batched_rollout.py
+# NumPy로 N개의 게임을 한꺼번에(lockstep) 무작위 플레이하는 벡터화 롤아웃 백엔드.
+# 손패는 (N, players, 13) 장수 배열로 보관하고, 매 스텝마다 모든 게임의 합법 수를
+# 테이블 rank/count에 맞춰 한 번에 계산한 뒤 그 중 하나를 무작위로 골라 적용합니다.
+#
+# 스텝마다 NumPy 호출 수십 번의 고정 비용이 들고 배치는 가장 긴 게임이 끝날 때까지 돌기 때문에,
+# 배치가 작으면 rollout.RolloutEngine의 직렬 플레이아웃보다 느립니다. 4인 게임에서 게임당 시간을 재면
+# 16개 배치는 직렬보다 약 7배, 64개는 약 2배 느리고, 256개쯤에서 직렬을 넘어 1000개 이상에서 약 2.4배 빠릅니다.
+# 그래서 MCTS 리프 평가는 MIN_EFFICIENT_BATCH개 이상 모였을 때만 이 백엔드를 쓰고, 수천 판 단위의
+# 기준 통계(analyze_strategy.py baseline)처럼 큰 배치에서 이득을 봅니다.
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from compact_state import CompactState
+
+NUM_RANKS = 13
+MAX_COUNT = 14                                # 한 번에 낼 수 있는 최대 장수 (12장 + 조커 2장)
+NUM_MOVE_SLOTS = 1 + NUM_RANKS * MAX_COUNT    # 0번은 패스, 나머지는 (rank, count) 조합
+FULL_DECK = [c for i in range(1, 13) for c in [i] * i] + [13, 13]
+MIN_EFFICIENT_BATCH = 256                     # 이보다 작은 배치는 직렬 RolloutEngine이 더 빠름 (위 설명 참고)
+
+
+def move_slot(rank, count):
+    """ (rank, count)를 합법 수 마스크의 열 번호로 변환합니다. 0번 열은 패스입니다. """
+    return 1 + (rank - 1) * MAX_COUNT + (count - 1)
+
+
+class BatchedRollout:
+    def __init__(self, rng=None):
+        if np is None:
+            raise ImportError("BatchedRollout requires numpy.")
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self._count_axis = np.arange(1, MAX_COUNT + 1)
+        self._rank_axis = np.arange(1, NUM_RANKS)
+
+        self.rollouts = 0
+        self.steps = 0
+        self.last_plies = None      # 직전 run()에서 게임마다 진행한 수 (N,) 배열
+
+    # --------------------------------------------------------------------------
+    # 배치 준비
+    # --------------------------------------------------------------------------
+    def deal(self, num_games, num_players):
+        """ 새로 카드를 나눠준 num_games개의 게임 배열을 만듭니다. """
+        decks = self.rng.permuted(np.tile(np.array(FULL_DECK, dtype=np.int8), (num_games, 1)), axis=1)
+        counts = np.zeros((num_games, num_players, NUM_RANKS), dtype=np.int8)
+        ranks = np.arange(1, NUM_RANKS + 1, dtype=np.int8)
+        for p in range(num_players):
+            hand = decks[:, p::num_players]
+            counts[:, p, :] = (hand[:, :, None] == ranks).sum(axis=1)
+        turn = self.rng.integers(0, num_players, size=num_games)
+        return {
+            'counts': counts,
+            'turn': turn,
+            'lead': turn.copy(),
+            'table_rank': np.zeros(num_games, dtype=np.int64),
+            'table_count': np.zeros(num_games, dtype=np.int64),
+            'passed': np.zeros((num_games, num_players), dtype=bool),
+        }
+
+    @staticmethod
+    def stack(states):
+        """ 같은 인원수의 GameState/CompactState 목록을 배치 배열로 묶습니다. """
+        compacts = [s if isinstance(s, CompactState) else CompactState.from_game_state(s) for s in states]
+        num_players = compacts[0].num_players
+        return {
+            'counts': np.array([s.counts for s in compacts], dtype=np.int8),
+            'turn': np.array([s.turn for s in compacts], dtype=np.int64),
+            'lead': np.array([s.lead for s in compacts], dtype=np.int64),
+            'table_rank': np.array([s.table_rank for s in compacts], dtype=np.int64),
+            'table_count': np.array([s.table_count for s in compacts], dtype=np.int64),
+            'passed': np.array([[s.passed >> i & 1 for i in range(num_players)] for s in compacts], dtype=bool),
+            'winner': np.array([s.winner for s in compacts], dtype=np.int64),
+        }
+
+    def simulate_states(self, states, max_plies=None):
+        """ 상태 목록 각각에서 무작위로 끝까지 플레이한 승자 배열을 반환합니다. """
+        return self.run(self.stack(states), max_plies)
+
+    # --------------------------------------------------------------------------
+    # 벡터화 규칙
+    # --------------------------------------------------------------------------
+    def legal_mask(self, hands, passed_self, table_rank, table_count):
+        """ hands: (G, 13) 현재 플레이어 손패. (G, NUM_MOVE_SLOTS) 합법 수 마스크를 반환합니다. """
+        g = hands.shape[0]
+        natives = hands[:, :12].astype(np.int64)[:, :, None]          # (G, 12, 1)
+        jokers = hands[:, 12].astype(np.int64)                          # (G,)
+        c = self._count_axis[None, None, :]                             # (1, 1, 14)
+
+        # 1~12번: 가진 장수 전부(조커 없이) 또는 거기에 조커를 1~J장 더한 장수
+        ranked = (natives > 0) & (c >= natives) & (c <= natives + jokers[:, None, None])
+        # 13번(조커만): 1~J장
+        joker_only = self._count_axis[None, :] <= jokers[:, None]
+
+        empty = table_count == 0
+        beats = (c == table_count[:, None, None]) & (self._rank_axis[None, :, None] < table_rank[:, None, None])
+        ranked &= empty[:, None, None] | beats
+        joker_only &= empty[:, None]
+
+        mask = np.zeros((g, NUM_MOVE_SLOTS), dtype=bool)
+        mask[:, 1:1 + 12 * MAX_COUNT] = ranked.reshape(g, -1)
+        mask[:, 1 + 12 * MAX_COUNT:] = joker_only
+        mask[passed_self] = False
+        # 패스: 이미 패스했거나, 테이블에 카드가 있거나, 낼 수 있는 수가 있을 때
+        mask[:, 0] = passed_self | ~empty | mask[:, 1:].any(axis=1)
+        return mask
+
+    def sample_moves(self, hands, passed_self, table_rank, table_count):
+        """ 게임마다 합법 수 하나를 균등하게 골라 (rank, count) 배열을 반환합니다. 패스는 rank 0입니다.
+            (G, 183) 마스크 대신 랭크별 합법 수 개수 (G, 14)만으로 같은 분포를 만듭니다. """
+        g = hands.shape[0]
+        natives = hands[:, :12].astype(np.int64)
+        jokers = hands[:, 12].astype(np.int64)
+        empty = table_count == 0
+        tc = table_count[:, None]
+
+        # 그룹별 합법 수 개수: 0번 패스, 1~12번 랭크, 13번 조커 단독
+        groups = np.zeros((g, NUM_RANKS + 1), dtype=np.int64)
+        has_rank = natives > 0
+        on_empty = has_rank * (jokers[:, None] + 1)
+        on_table = has_rank & (natives <= tc) & (tc <= natives + jokers[:, None]) \
+            & (self._rank_axis[None, :] < table_rank[:, None])
+        groups[:, 1:13] = np.where(empty[:, None], on_empty, on_table)
+        groups[:, 13] = np.where(empty, jokers, 0)
+        groups[passed_self, 1:] = 0
+        groups[:, 0] = passed_self | ~empty | (groups[:, 1:].sum(axis=1) > 0)
+
+        cum = groups.cumsum(axis=1)
+        pick = (self.rng.random(g) * cum[:, -1]).astype(np.int64)
+        rank = (cum > pick[:, None]).argmax(axis=1)
+        rows = np.arange(g)
+        offset = pick - (cum[rows, rank] - groups[rows, rank])
+
+        count = np.where(empty, natives[rows, np.minimum(rank, 12) - 1] + offset, table_count)
+        count = np.where(rank == NUM_RANKS, offset + 1, count)
+        count = np.where(rank == 0, 0, count)
+        return rank, count
+
+    def run(self, batch, max_plies=None):
+        """ 배치 배열을 제자리에서 끝까지 진행하고 (N,) 승자 배열을 반환합니다.
+            max_plies 안에 끝나지 않은 게임의 승자는 -1입니다. """
+        counts = batch['counts']
+        turn = batch['turn']
+        lead = batch['lead']
+        table_rank = batch['table_rank']
+        table_count = batch['table_count']
+        passed = batch['passed']
+        num_games, num_players, _ = counts.shape
+        winner = batch.get('winner')
+        if winner is None:
+            winner = np.full(num_games, -1, dtype=np.int64)
+        sizes = counts.sum(axis=2, dtype=np.int64)
+
+        plies = 0
+        game_plies = np.zeros(num_games, dtype=np.int64)
+        active = np.flatnonzero(winner < 0)
+        while active.size and plies != max_plies:
+            game_plies[active] += 1
+            t = turn[active]
+            hands = counts[active, t]
+            rank, count = self.sample_moves(hands, passed[active, t], table_rank[active], table_count[active])
+
+            is_pass = rank == 0
+            played = ~is_pass
+            self._play(counts, sizes, turn, lead, table_rank, table_count, winner,
+                       active[played], t[played], rank[played], count[played])
+            self._pass(sizes, turn, lead, table_rank, table_count, passed,
+                       active[is_pass], t[is_pass])
+
+            plies += 1
+            active = np.flatnonzero(winner < 0)
+
+        self.rollouts += num_games
+        self.steps += plies
+        self.last_plies = game_plies
+        return winner
+
+    def _play(self, counts, sizes, turn, lead, table_rank, table_count, winner, games, players, rank, count):
+        if not games.size:
+            return
+        is_joker = rank == NUM_RANKS
+        available = counts[games, players, rank - 1].astype(np.int64)
+        native = np.where(is_joker, 0, np.minimum(available, count))
+        jokers = count - native
+
+        counts[games, players, rank - 1] -= native.astype(np.int8)
+        counts[games, players, NUM_RANKS - 1] -= jokers.astype(np.int8)
+        sizes[games, players] -= count
+        table_rank[games] = rank
+        table_count[games] = count
+        lead[games] = players
+
+        finished = sizes[games, players] == 0
+        winner[games[finished]] = players[finished]
+        self._advance(sizes, turn, games[~finished])
+
+    def _pass(self, sizes, turn, lead, table_rank, table_count, passed, games, players):
+        if not games.size:
+            return
+        passed[games, players] = True
+        has_cards = sizes[games] > 0
+        unpassed = (has_cards & ~passed[games]).sum(axis=1)
+        reset = (unpassed <= 1) & (has_cards.sum(axis=1) > 1)
+
+        reset_games = games[reset]
+        table_rank[reset_games] = 0
+        table_count[reset_games] = 0
+        passed[reset_games] = False
+        turn[reset_games] = lead[reset_games]
+        # 라운드를 시작할 사람이 카드가 없으면 다음 사람에게 넘김
+        empty_lead = sizes[reset_games, turn[reset_games]] == 0
+        self._advance(sizes, turn, reset_games[empty_lead])
+        self._advance(sizes, turn, games[~reset])
+
+    @staticmethod
+    def _advance(sizes, turn, games):
+        num_players = sizes.shape[1]
+        pending = games
+        while pending.size:
+            turn[pending] = (turn[pending] + 1) % num_players
+            pending = pending[sizes[pending, turn[pending]] == 0]
@@ -0,0 +1,263 @@
+# belief.py
+# 공개된 정보로 상대 손패를 추적하는 카드 믿음(belief) 객체와 결정화 샘플러.
+#  - 지금까지 낸 카드(played)와 각 플레이어의 손패 장수를 수마다 증분으로 갱신하므로
+#    어떤 관찰자든 '모르는 카드' 묶음 = 전체 덱 - 낸 카드 - 자기 손패 를 바로 얻습니다 (remaining).
+#    (observe를 빠짐없이 받았는지는 matches로 확인)
+#  - 테이블(rank, count) 위에서 패스한 플레이어는 그 테이블을 이길 수 없었을 가능성이 높으므로
+#    '이 장수로 이 랭크보다 낮은 카드를 낼 수 없다'는 제약으로 기록합니다.
+#    패스는 일부러 할 수도 있으므로 (MCTS_Pro_AI는 낼 수 있을 때도 40% 정도 패스) 제약을 어긴 결정화를 버리지 않고
+#    pass_play_likelihood**(위반 수)의 가중치로만 덜 뽑습니다 (0이면 엄격한 제약, 1이면 제약 무시).
+#  - 결정화는 한 상태씩 (determinize_into, 직렬 탐색용) 또는 NumPy로 여러 개를 한 번에
+#    (sample_hands / determinize_batch) 뽑을 수 있습니다. 트리 리프처럼 실제 게임보다 진행된 상태는
+#    그 상태에서 다른 플레이어들이 가진 카드를 다시 나누고, 지금 게임의 결정화(ISMCTS 루트)는
+#    sample이 remaining으로 펼쳐 캐시해 둔 카드/자리 배열을 섞기만 해서 n개를 한 번에 뽑습니다.
+#  - perspective(관찰자)는 손패를 아는 플레이어입니다. 트리 리프에서는 차례인 플레이어가 아니라
+#    탐색을 시작한 루트 플레이어를 넘겨야 합니다.
+#
+# 손패에서 같은 랭크의 카드는 항상 한꺼번에 나가므로 (조커를 섞어도 원래 카드는 전부 냄)
+# 패스할 때 낼 수 없던 랭크는 이후에도 그 장수로 낼 수 없습니다. 그래서 제약은 게임이 끝날 때까지 유효합니다.
+
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUM_RANKS = 13
+# 전체 덱의 랭크별 장수 (1~12는 랭크만큼, 조커 2장)
+FULL_DECK_COUNTS = [r for r in range(1, 13)] + [2]
+
+
+def violations(hand, constraints):
+    """ 손패(13칸 장수 배열)가 (count, rank) 제약을 몇 개 어기는지 셉니다. """
+    jokers = hand[12]
+    broken = 0
+    for count, rank in constraints:
+        for r in range(rank - 1):
+            c = hand[r]
+            if c == count or (c and c < count <= c + jokers):
+                broken += 1
+                break
+    return broken
+
+
+class CardBelief:
+    def __init__(self, pass_play_likelihood=0.4, max_tries=4, seed=None):
+        self.pass_play_likelihood = pass_play_likelihood
+        # 제약이 있을 때 결정화 하나에 뽑아 보는 후보 수 (직렬판은 거절 샘플링의 최대 시도 수,
+        # 배치판은 가중 재표집의 후보 수). 넘으면 마지막 후보를 그대로 사용
+        self.max_tries = max_tries
+        # 배치 샘플링용 난수. seed가 없으면 random 모듈에서 뽑아 random.seed로 재현 가능하게 함
+        self.rng = None
+        if np is not None:
+            self.rng = np.random.default_rng(seed if seed is not None else random.getrandbits(63))
+        self.num_players = 0
+        self.played = [0] * NUM_RANKS       # 지금까지 낸 카드의 랭크별 장수 (테이블 위 카드 포함)
+        self.sizes = []
+        self.constraints = []               # constraints[p] = {count: 패스했던 가장 높은(약한) 랭크}
+        self._constraint_list = []          # [(플레이어, ((count, rank), ...))] (제약이 있는 플레이어만)
+        self._sample_cache = {}             # (관찰자, 손패) -> sample용 카드/자리 배열 (믿음이 바뀌면 비움)
+
+    def reseed(self, seed):
+        """ 배치 샘플링 난수를 seed로 다시 시드합니다. (병렬 워커·대국마다 재현 가능한 결정화) """
+        if np is not None:
+            self.rng = np.random.default_rng(seed)
+
+    # --------------------------------------------------------------------------
+    # 게임 진행에 맞춘 갱신
+    # --------------------------------------------------------------------------
+    def reset(self, state):
+        """ GameState 스냅샷에서 공개 정보를 다시 읽습니다. 기록해 둔 패스 제약은 버립니다. """
+        self.num_players = state.num_players
+        self.sizes = []
+        self.constraints = [{} for _ in range(state.num_players)]
+        self._constraint_list = []
+        self.sync(state)
+
+    def sync(self, state):
+        """ 낸 카드와 손패 장수를 스냅샷으로 맞추고, 이번 라운드에 패스한 플레이어를 제약에 더합니다.
+            손패 장수가 늘었으면 (새 게임) reset합니다. """
+        sizes = [len(player.hand) for player in state.players]
+        if state.num_players != self.num_players or any(a > b for a, b in zip(sizes, self.sizes)):
+            self.reset(state)
+            return
+        played = FULL_DECK_COUNTS[:]
+        for player in state.players:
+            for card in player.hand:
+                played[card - 1] -= 1
+        self.played = played
+        self.sizes = sizes
+        self._sample_cache.clear()
+        table = state.table_cards['cards']
+        if table:
+            # 라운드 안에서 장수는 같고 랭크는 낮아지기만 하므로 지금 테이블도 이길 수 없었던 것
+            for player_index in state.passed_in_round:
+                self._add_constraint(player_index, state.table_cards['effective_rank'], len(table))
+
+    def matches(self, state):
+        """ 증분으로 따라온 손패 장수가 state와 같은지 (observe를 빠짐없이 받았는지) 확인합니다. """
+        return state.num_players == self.num_players and all(
+            len(player.hand) == size for player, size in zip(state.players, self.sizes))
+
+    def observe(self, state, move):
+        """ state(수를 두기 전)에서 차례인 플레이어가 move를 둔다는 것을 반영합니다. """
+        if state.num_players != self.num_players:
+            self.reset(state)
+        player_index = state.turn_index
+        table = state.table_cards['cards']
+        if move == "pass":
+            # 이미 패스해서 강제로 넘기는 경우는 정보가 없음
+            if table and player_index not in state.passed_in_round:
+                self._add_constraint(player_index, state.table_cards['effective_rank'], len(table))
+            return
+
+        rank, count = move['rank'], move['count']
+        # GameState.play_cards와 같이 같은 랭크 카드를 먼저 내고 모자라는 만큼 조커를 씀
+        if rank == 13:
+            natives = 0
+        else:
+            natives = min(state.players[player_index].hand.count(rank), count)
+            self.played[rank - 1] += natives
+        self.played[12] += count - natives
+        self.sizes[player_index] -= count
+        self._sample_cache.clear()
+
+    def _add_constraint(self, player_index, rank, count):
+        limits = self.constraints[player_index]
+        if limits.get(count, 0) >= rank:
+            return
+        limits[count] = rank
+        self._constraint_list = [(p, tuple(limits.items())) for p, limits in enumerate(self.constraints) if limits]
+        self._sample_cache.clear()
+
+    def remaining(self, hand_counts):
+        """ 손패가 hand_counts인 관찰자가 모르는 카드의 랭크별 장수 """
+        return [full - played - mine for full, played, mine in zip(FULL_DECK_COUNTS, self.played, hand_counts)]
+
+    # --------------------------------------------------------------------------
+    # 결정화 한 개 (직렬 탐색용)
+    # --------------------------------------------------------------------------
+    def determinize_into(self, scratch, perspective=None):
+        """ CompactState 스크래치에서 perspective(기본은 차례인 플레이어)를 뺀 플레이어들의 손패를
+            그들이 가진 카드 묶음 안에서 다시 나눕니다. 낸 카드는 묶음에 들어가지 않습니다. """
+        me = scratch.turn if perspective is None else perspective
+        counts = scratch.counts
+        others = [i for i in range(scratch.num_players) if i != me]
+        pool = []
+        for r in range(NUM_RANKS):
+            n = 0
+            for i in others:
+                n += counts[i][r]
+            if n:
+                pool.extend([r] * n)
+
+        checks = [(p, limits) for p, limits in self._constraint_list if p != me]
+        likelihood = self.pass_play_likelihood
+        for _ in range(self.max_tries):
+            random.shuffle(pool)
+            start = 0
+            for i in others:
+                row = counts[i]
+                for r in range(NUM_RANKS):
+                    row[r] = 0
+                end = start + scratch.sizes[i]
+                for r in pool[start:end]:
+                    row[r] += 1
+                start = end
+            broken = 0
+            for p, limits in checks:
+                broken += violations(counts[p], limits)
+            if not broken or random.random() < likelihood ** broken:
+                break
+        return scratch
+
+    # --------------------------------------------------------------------------
+    # 배치 결정화 (NumPy)
+    # --------------------------------------------------------------------------
+    def sample_hands(self, pools, sizes, fixed=None):
+        """ pools (B, 13) 카드 묶음을 sizes (B, P) 장수대로 나눈 손패 (B, P, 13)를 한 번에 뽑습니다.
+            나눌 필요가 없는 자리는 sizes를 0으로 두고, fixed (B,)의 자리는 제약 검사에서 뺍니다. """
+        pools = np.asarray(pools, dtype=np.int64)
+        sizes = np.asarray(sizes, dtype=np.int64)
+        tries = self.max_tries if self._constraint_list else 1
+        candidates = self._deal(np.repeat(pools, tries, axis=0), np.repeat(sizes, tries, axis=0))
+        return self._pick(candidates, len(pools), tries, fixed)
+
+    def _pick(self, candidates, batch, tries, fixed):
+        """ 행마다 후보 tries개 중 하나를 pass_play_likelihood**(위반 수)에 비례한 확률로 고릅니다.
+            (직렬판의 거절 샘플링 대신 한 번에 끝나는 가중 재표집) """
+        if tries == 1:
+            return candidates
+        fixed = None if fixed is None else np.repeat(np.asarray(fixed), tries)
+        weights = (self.pass_play_likelihood ** self._violations(candidates, fixed)).reshape(batch, tries)
+        cumulative = weights.cumsum(axis=1)
+        pick = (cumulative > self.rng.random(batch)[:, None] * cumulative[:, -1:]).argmax(axis=1)
+        return candidates.reshape(batch, tries, *candidates.shape[1:])[np.arange(batch), pick]
+
+    def _deal(self, pools, sizes):
+        batch, num_players = sizes.shape
+        totals = sizes.sum(axis=1)
+        # 행마다 카드 묶음을 펼쳐 이어 붙이고, 자리 배열은 장수대로 같은 길이로 펼침
+        rows = np.repeat(np.arange(batch), totals)
+        cards = np.repeat(np.tile(np.arange(NUM_RANKS), batch), pools.ravel())
+        owners = np.repeat(np.tile(np.arange(num_players), batch), sizes.ravel())
+        return self._shuffle_deal(rows, cards, owners, batch, num_players)
+
+    def _shuffle_deal(self, rows, cards, owners, batch, num_players):
+        """ 각 행 안에서만 카드 순서를 섞어 자리에 나눠 주고 (행, 자리, 랭크)별 장수를 셉니다. """
+        order = np.argsort(rows + self.rng.random(len(rows)))
+        index = (rows * num_players + owners) * NUM_RANKS + cards[order]
+        return np.bincount(index, minlength=batch * num_players * NUM_RANKS).reshape(
+            batch, num_players, NUM_RANKS)
+
+    def _violations(self, hands, fixed):
+        broken = np.zeros(len(hands), dtype=np.int64)
+        for player_index, limits in self._constraint_list:
+            jokers = hands[:, player_index, 12:13]
+            hit = np.zeros(len(hands), dtype=np.int64)
+            for count, rank in limits:
+                lower = hands[:, player_index, :rank - 1]
+                can_play = (lower == count) | ((lower > 0) & (lower < count) & (count <= lower + jokers))
+                hit += can_play.any(axis=1)
+            if fixed is not None:
+                hit[fixed == player_index] = 0
+            broken += hit
+        return broken
+
+    def determinize_batch(self, scratches, perspectives=None):
+        """ 여러 CompactState 스크래치를 한 번의 배치 샘플링으로 결정화합니다. (determinize_into의 배치판) """
+        if not scratches:
+            return scratches
+        counts = np.array([s.counts for s in scratches], dtype=np.int64)
+        sizes = np.array([s.sizes for s in scratches], dtype=np.int64)
+        rows = np.arange(len(scratches))
+        me = np.array([s.turn for s in scratches] if perspectives is None else perspectives)
+        pools = counts.sum(axis=1) - counts[rows, me]
+        sizes[rows, me] = 0
+        hands = self.sample_hands(pools, sizes, fixed=me)
+        hands[rows, me] = counts[rows, me]
+        for scratch, hand in zip(scratches, hands.tolist()):
+            for row, new in zip(scratch.counts, hand):
+                row[:] = new
+        return scratches
+
+    def sample(self, hand_counts, observer, n):
+        """ 손패가 hand_counts인 observer 입장에서 지금 게임의 결정화 n개 (n, P, 13)를 한 번에 뽑습니다.
+            remaining과 손패 장수로 펼친 카드/자리 배열은 믿음이 바뀔 때까지 캐시해 두고 섞기만 합니다. """
+        key = (observer, tuple(hand_counts))
+        cached = self._sample_cache.get(key)
+        if cached is None:
+            sizes = list(self.sizes)
+            sizes[observer] = 0
+            cards = np.repeat(np.arange(NUM_RANKS), self.remaining(hand_counts))
+            owners = np.repeat(np.arange(len(sizes)), sizes)
+            cached = self._sample_cache[key] = (cards, owners, len(sizes))
+        cards, owners, num_players = cached
+        tries = self.max_tries if self._constraint_list else 1
+        rows = n * tries
+        candidates = self._shuffle_deal(np.repeat(np.arange(rows), len(cards)), np.tile(cards, rows),
+                                        np.tile(owners, rows), rows, num_players)
+        hands = self._pick(candidates, n, tries, np.full(n, observer))
+        hands[:, observer] = hand_counts
+        return hands
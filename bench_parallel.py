@@ -0,0 +1,82 @@
+# bench_parallel.py
+# 병렬 MCTS_Pro_AI(root/leaf)와 직렬 버전의 벤치마크.
+# 한 좌석에 후보 AI를, 나머지 좌석에 직렬 MCTS_Pro_AI를 앉혀 게임을 돌리고
+# 후보의 승률, 수당 생각 시간, 그리고 '벽시계 1초당 승률'을 비교합니다.
+#
+# 예) python bench_parallel.py --players 4 --games 40 --iterations 500 --workers 8 --scale-iterations
+
+import argparse
+import random
+import time
+
+from dalmuti_game import GameState
+from mcts_pro import MCTS_Pro_AI
+
+
+def play_game(candidate, baseline, num_players, candidate_seat):
+    """ 한 판을 진행하고 (후보 승리 여부, 후보의 총 생각 시간, 후보의 수 개수)를 반환합니다. """
+    state = GameState(['mcts_pro'] * num_players)
+    think_time = 0.0
+    moves = 0
+    while not state.game_over:
+        if state.turn_index == candidate_seat:
+            start = time.perf_counter()
+            move = candidate.find_best_move(state)
+            think_time += time.perf_counter() - start
+            moves += 1
+        else:
+            move = baseline.find_best_move(state)
+
+        if move == "pass":
+            state.player_pass(state.turn_index)
+        else:
+            state.play_cards(state.turn_index, move['rank'], move['count'])
+    return state.winner_index == candidate_seat, think_time, moves
+
+
+def run_config(name, candidate, args):
+    baseline = MCTS_Pro_AI(iterations=args.iterations)
+    random.seed(args.seed)
+    wins = 0
+    think_time = 0.0
+    moves = 0
+    for game in range(args.games):
+        won, t, m = play_game(candidate, baseline, args.players, game % args.players)
+        wins += won
+        think_time += t
+        moves += m
+
+    win_rate = wins / args.games
+    sec_per_move = think_time / max(moves, 1)
+    print(f"{name:<28} win rate {win_rate:.3f} (fair share {1 / args.players:.3f}) | "
+          f"{sec_per_move * 1000:8.1f} ms/move | win rate per wall-second {win_rate / max(sec_per_move, 1e-9):8.3f}")
+    return {'name': name, 'win_rate': win_rate, 'sec_per_move': sec_per_move}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel MCTS_Pro_AI against the serial version.")
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scale-iterations', action='store_true',
+                        help="give parallel searches iterations * workers (same ideal wall time as serial)")
+    args = parser.parse_args()
+
+    parallel_iterations = args.iterations * args.workers if args.scale_iterations else args.iterations
+    configs = [
+        ('serial', MCTS_Pro_AI(iterations=args.iterations)),
+        (f'root x{args.workers}', MCTS_Pro_AI(iterations=parallel_iterations, workers=args.workers,
+                                             parallel_mode='root', seed=args.seed)),
+        (f'leaf x{args.workers}', MCTS_Pro_AI(iterations=parallel_iterations, workers=args.workers,
+                                             parallel_mode='leaf', seed=args.seed)),
+    ]
+    print(f"--- {args.players} players, {args.games} games, baseline {args.iterations} iterations ---")
+    for name, candidate in configs:
+        run_config(name, candidate, args)
+        candidate.close()
+
+
+if __name__ == '__main__':
+    main()
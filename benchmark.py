@@ -0,0 +1,188 @@
+# benchmark.py
+# 게임 엔진과 두 MCTS AI의 회귀 측정용 벤치마크.
+# 고정 시드로 만든 국면들에서 각 연산을 반복 실행해 초당 연산 수, p50/p99 지연 시간,
+# tracemalloc 최대 메모리를 재고 JSON으로 저장합니다. 저장한 두 결과를 비교해 기준보다 느려진 항목을 찾습니다.
+#
+# 예) python benchmark.py run --out bench_before.json
+#     python benchmark.py run --out bench_after.json --quick
+#     python benchmark.py compare bench_before.json bench_after.json --threshold 0.10
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from dalmuti_game import GameState
+from mcts_ai import MCTS_AI
+from mcts_pro import MCTS_Pro_AI
+from rollout import RolloutEngine, _legacy_simulate
+from analyze_strategy import state_to_vector
+try:
+    from feature_encoder import FeatureEncoder
+except ImportError:
+    FeatureEncoder = None
+
+PLAYER_COUNTS = [4, 5, 6, 7]
+FORMAT_VERSION = 1
+
+
+def sample_positions(num_players, count, seed):
+    """ 무작위 게임을 진행하며 고른 국면 count개 (게임 시작부터 끝 직전까지 고르게 섞임) """
+    rng = random.Random(seed)
+    random.seed(seed)
+    positions = []
+    while len(positions) < count:
+        state = GameState(['mcts'] * num_players)
+        history = []
+        while not state.game_over:
+            history.append(state)
+            state = state.make_move(rng.choice(state.get_possible_moves()))
+        positions.extend(rng.sample(history, min(len(history), max(1, count // 4))))
+    return positions[:count]
+
+
+def measure(fn, args_list, seed, repeat=1):
+    """ args_list의 각 인자로 fn을 repeat번씩 호출해 호출당 지연 시간 목록과 최대 메모리를 잽니다. """
+    # 1) 시간 측정 (tracemalloc을 켜면 느려지므로 따로)
+    random.seed(seed)
+    latencies = []
+    clock = time.perf_counter
+    for _ in range(repeat):
+        for args in args_list:
+            start = clock()
+            fn(*args)
+            latencies.append(clock() - start)
+
+    # 2) 메모리 측정: 같은 호출들을 한 번 더 돌리며 최대 할당량을 기록
+    random.seed(seed)
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    for args in args_list:
+        fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'ops': len(latencies),
+        'ops_per_sec': len(latencies) / total if total else 0.0,
+        'p50_us': _percentile(latencies, 0.50) * 1e6,
+        'p99_us': _percentile(latencies, 0.99) * 1e6,
+        'peak_kib': (peak - base) / 1024,
+    }
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def build_cases(num_players, seed, quick):
+    """ (이름, 함수, 인자 목록, 반복 수) 목록. 같은 시드면 항상 같은 국면에서 측정합니다. """
+    scale = 1 if quick else 4
+    positions = sample_positions(num_players, 100 * scale, seed)
+    # 가능한 수가 하나뿐인 국면은 탐색 없이 바로 반환하므로 탐색 측정에서 뺌
+    search_positions = [(s,) for s in positions if len(s.get_possible_moves()) > 1][:5 * scale]
+    rollout_engine = RolloutEngine()
+    mcts = MCTS_AI(iterations=200)
+    mcts_pro = MCTS_Pro_AI(iterations=200)
+    moves = [(s, random.Random(seed + i).choice(s.get_possible_moves())) for i, s in enumerate(positions)]
+
+    cases = [
+        ('get_possible_moves', GameState.get_possible_moves, [(s,) for s in positions], 10),
+        ('clone', GameState.clone, [(s,) for s in positions], 10),
+        ('make_move', GameState.make_move, moves, 10),
+        ('playout_make_move', _legacy_simulate, [(s,) for s in positions[:25 * scale]], 1),
+        ('playout_engine', rollout_engine.simulate, [(s,) for s in positions], 5),
+        ('state_to_vector', state_to_vector, [(s,) for s in positions], 10),
+        ('mcts_find_best_move', mcts.find_best_move, search_positions, 1),
+        ('mcts_pro_find_best_move', mcts_pro.find_best_move, search_positions, 1),
+    ]
+    if FeatureEncoder is not None:
+        encoders = [(FeatureEncoder(s),) for s in positions]
+        cases.append(('feature_encoder', FeatureEncoder.encode, encoders, 10))
+    return cases
+
+
+def run(args):
+    results = {}
+    for num_players in args.players:
+        print(f"--- {num_players} players ---")
+        for name, fn, args_list, repeat in build_cases(num_players, args.seed + num_players, args.quick):
+            if args.only and not any(pattern in name for pattern in args.only):
+                continue
+            result = measure(fn, args_list, args.seed, repeat)
+            results[f"{name}/{num_players}p"] = result
+            print(f"  {name:<26} {result['ops_per_sec']:>12,.1f} ops/s | p50 {result['p50_us']:>10.1f} us | "
+                  f"p99 {result['p99_us']:>10.1f} us | peak {result['peak_kib']:>9.1f} KiB")
+
+    report = {
+        'version': FORMAT_VERSION,
+        'meta': {
+            'seed': args.seed,
+            'quick': args.quick,
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f"Saved results to {args.out}")
+    return report
+
+
+def compare(base, new, threshold):
+    """ 두 결과에서 초당 연산 수가 threshold 비율 넘게 줄었거나 p50이 그만큼 늘어난 항목 목록을 반환합니다.
+        (p99는 표본이 적어 흔들리므로 참고용으로만 출력) """
+    regressions = []
+    for name, old in base['results'].items():
+        cur = new['results'].get(name)
+        if cur is None:
+            continue
+        speed = cur['ops_per_sec'] / old['ops_per_sec'] if old['ops_per_sec'] else 1.0
+        median = cur['p50_us'] / old['p50_us'] if old['p50_us'] else 1.0
+        tail = cur['p99_us'] / old['p99_us'] if old['p99_us'] else 1.0
+        flag = speed < 1 - threshold or median > 1 + threshold
+        print(f"{'REGRESSION' if flag else 'ok':<10} {name:<36} ops/s x{speed:5.2f} | p50 x{median:5.2f} | "
+              f"p99 x{tail:5.2f} | peak {old['peak_kib']:8.1f} -> {cur['peak_kib']:8.1f} KiB")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Dalmuti engine and MCTS AIs with fixed seeds.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_parser = sub.add_parser('run', help="run the benchmarks and optionally save JSON results")
+    run_parser.add_argument('--players', type=int, nargs='+', default=PLAYER_COUNTS)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--quick', action='store_true', help="fewer positions per case")
+    run_parser.add_argument('--only', nargs='+', help="run only cases whose name contains one of these")
+    run_parser.add_argument('--out')
+    compare_parser = sub.add_parser('compare', help="compare two saved results")
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="allowed relative slowdown before a case counts as a regression")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run(args)
+    else:
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        regressions = compare(base, new, args.threshold)
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+# columnar_log.py
+# 학습 로그(JSONL)를 고정 폭 정수 열(column)로 저장하는 이진 형식.
+# 한 디렉터리에 작은 헤더(header.json)와 청크별·열별 .npy 파일을 두고,
+# 읽을 때는 청크를 메모리 맵으로 열어 배치 단위로 흘려 보냅니다. (JSON 파싱 없이 학습 데이터를 읽기 위함)
+#
+# 예) python columnar_log.py convert dalmuti_strategy_log.jsonl dalmuti_strategy_log.cols
+#     python columnar_log.py info dalmuti_strategy_log.cols
+
+import argparse
+import json
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from dalmuti_game import MAX_PLAYERS
+
+FORMAT_VERSION = 1
+HEADER_NAME = 'header.json'
+DEFAULT_CHUNK_ROWS = 1 << 16
+
+# state_to_vector 구성: 내 손패 13 + 다른 플레이어 장수 (num_players - 1) + 테이블 2 + 패스 수 1 + 버려진 카드 13
+HAND_SLOTS = 13
+OTHER_SLOTS = MAX_PLAYERS - 1
+STATE_WIDTH = HAND_SLOTS + OTHER_SLOTS + 2 + 1 + 13
+
+# 열 이름 -> (dtype, 행당 폭). 게임 번호만 int16 범위를 넘을 수 있어 int32로 둡니다.
+COLUMNS = {
+    'num_players': ('int8', 1),
+    'game': ('int32', 1),
+    'turn': ('int16', 1),
+    'player': ('int8', 1),
+    'state': ('int8', STATE_WIDTH),
+    'action_rank': ('int8', 1),     # 0이면 패스
+    'action_count': ('int8', 1),
+    'outcome': ('int8', 1),
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("columnar_log requires numpy.")
+
+
+def parse_game_id(game_id):
+    """ "4p_12" 형식의 game_id를 (플레이어 수, 게임 번호)로 나눕니다. """
+    players, index = game_id.split('p_')
+    return int(players), int(index)
+
+
+def pack_state_vector(vector, num_players, out):
+    """ state_to_vector 결과를 MAX_PLAYERS 기준 고정 폭 행(out)에 씁니다. 없는 플레이어 칸은 0으로 채웁니다. """
+    others = num_players - 1
+    out[:HAND_SLOTS] = vector[:HAND_SLOTS]
+    out[HAND_SLOTS:HAND_SLOTS + others] = vector[HAND_SLOTS:HAND_SLOTS + others]
+    out[HAND_SLOTS + others:HAND_SLOTS + OTHER_SLOTS] = 0
+    out[HAND_SLOTS + OTHER_SLOTS:] = vector[HAND_SLOTS + others:]
+    return out
+
+
+def unpack_state_vector(row, num_players):
+    """ pack_state_vector의 역변환. state_to_vector와 같은 길이의 리스트를 돌려줍니다. """
+    others = num_players - 1
+    row = [int(v) for v in row]
+    return row[:HAND_SLOTS + others] + row[HAND_SLOTS + OTHER_SLOTS:]
+
+
+class ColumnarLogWriter:
+    """ 행을 청크 크기만큼 미리 잡아 둔 배열에 모았다가, 차면 열마다 .npy 파일로 내보냅니다. """
+
+    def __init__(self, path, chunk_rows=DEFAULT_CHUNK_ROWS):
+        _require_numpy()
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, HEADER_NAME)):
+            raise FileExistsError(f"{path} already contains a columnar log.")
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.chunks = []            # 청크별 행 수
+        self._buffers = {name: np.zeros((chunk_rows, width) if width > 1 else chunk_rows, dtype=dtype)
+                         for name, (dtype, width) in COLUMNS.items()}
+        self._rows = 0
+
+    def append(self, turn_data):
+        """ analyze_strategy 로그 한 줄(딕셔너리)을 추가합니다. """
+        num_players, game = parse_game_id(turn_data['game_id'])
+        i = self._rows
+        b = self._buffers
+        b['num_players'][i] = num_players
+        b['game'][i] = game
+        b['turn'][i] = turn_data['turn_number']
+        b['player'][i] = turn_data['player_index']
+        pack_state_vector(turn_data['state_vector'], num_players, b['state'][i])
+        action = turn_data['action']
+        if action['action_type'] == 'pass':
+            b['action_rank'][i] = 0
+            b['action_count'][i] = 0
+        else:
+            b['action_rank'][i] = action['rank']
+            b['action_count'][i] = action['count']
+        b['outcome'][i] = turn_data['outcome_win']
+
+        self._rows += 1
+        if self._rows == self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        chunk = len(self.chunks)
+        for name, buf in self._buffers.items():
+            np.save(os.path.join(self.path, _chunk_file(name, chunk)), buf[:self._rows])
+        self.chunks.append(self._rows)
+        self._rows = 0
+        # 청크마다 헤더를 갱신해 두면 중간에 멈춰도 그때까지의 청크는 읽을 수 있음
+        self._write_header()
+
+    def _write_header(self):
+        header = {
+            'version': FORMAT_VERSION,
+            'max_players': MAX_PLAYERS,
+            'columns': {name: {'dtype': dtype, 'width': width} for name, (dtype, width) in COLUMNS.items()},
+            'chunks': self.chunks,
+        }
+        tmp_path = os.path.join(self.path, HEADER_NAME + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(header, f, indent=1)
+        os.replace(tmp_path, os.path.join(self.path, HEADER_NAME))
+
+    def close(self):
+        self.flush()
+        if not self.chunks:
+            self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ColumnarLogReader:
+    """ 청크를 메모리 맵으로 열어 필요한 열만 배치 단위로 읽습니다. """
+
+    def __init__(self, path):
+        _require_numpy()
+        self.path = path
+        with open(os.path.join(path, HEADER_NAME)) as f:
+            self.header = json.load(f)
+        if self.header['version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar log version {self.header['version']}.")
+        self.chunk_rows = self.header['chunks']
+        self.columns = list(self.header['columns'])
+
+    def __len__(self):
+        return sum(self.chunk_rows)
+
+    def chunk(self, index, columns=None):
+        """ index번 청크의 열들을 메모리 맵 배열로 돌려줍니다. """
+        return {name: np.load(os.path.join(self.path, _chunk_file(name, index)), mmap_mode='r')
+                for name in (columns or self.columns)}
+
+    def iter_batches(self, batch_size=4096, columns=None):
+        """ batch_size행씩 열 딕셔너리를 내보냅니다. 청크 경계에 걸친 배치만 복사해서 이어 붙입니다. """
+        columns = columns or self.columns
+        pending = []
+        pending_rows = 0
+        for index in range(len(self.chunk_rows)):
+            arrays = self.chunk(index, columns)
+            rows = self.chunk_rows[index]
+            start = 0
+            if pending:
+                take = min(batch_size - pending_rows, rows)
+                pending.append({name: a[:take] for name, a in arrays.items()})
+                pending_rows += take
+                start = take
+                if pending_rows == batch_size:
+                    yield _concat(pending, columns)
+                    pending, pending_rows = [], 0
+            while rows - start >= batch_size:
+                yield {name: a[start:start + batch_size] for name, a in arrays.items()}
+                start += batch_size
+            if start < rows:
+                pending.append({name: a[start:] for name, a in arrays.items()})
+                pending_rows += rows - start
+        if pending:
+            yield _concat(pending, columns)
+
+    def iter_rows(self):
+        """ JSONL 로그와 같은 형태의 딕셔너리로 한 행씩 돌려줍니다. (검증·디버깅용) """
+        for batch in self.iter_batches():
+            for i in range(len(batch['game'])):
+                num_players = int(batch['num_players'][i])
+                rank = int(batch['action_rank'][i])
+                action = ({"action_type": "pass"} if rank == 0 else
+                          {"action_type": "play", "rank": rank, "count": int(batch['action_count'][i])})
+                yield {
+                    "game_id": f"{num_players}p_{int(batch['game'][i])}",
+                    "turn_number": int(batch['turn'][i]),
+                    "player_index": int(batch['player'][i]),
+                    "state_vector": unpack_state_vector(batch['state'][i], num_players),
+                    "action": action,
+                    "outcome_win": int(batch['outcome'][i]),
+                }
+
+
+def _chunk_file(column, index):
+    return f"{column}.{index:05d}.npy"
+
+
+def _concat(parts, columns):
+    return {name: np.concatenate([part[name] for part in parts]) for name in columns}
+
+
+def convert_jsonl(src_paths, dest, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """ JSONL 로그 파일(들)을 열 형식으로 변환하고 변환한 행 수를 반환합니다. """
+    rows = 0
+    with ColumnarLogWriter(dest, chunk_rows) as writer:
+        for src in src_paths:
+            with open(src) as f:
+                for line in f:
+                    if line.strip():
+                        writer.append(json.loads(line))
+                        rows += 1
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert and inspect columnar Dalmuti training logs.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    convert = sub.add_parser('convert', help="convert JSONL log files into a columnar log directory")
+    convert.add_argument('src', nargs='+')
+    convert.add_argument('dest')
+    convert.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    info = sub.add_parser('info', help="print row and chunk counts of a columnar log")
+    info.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        rows = convert_jsonl(args.src, args.dest, args.chunk_rows)
+        print(f"Converted {rows} rows into {args.dest}")
+    else:
+        reader = ColumnarLogReader(args.path)
+        print(f"{args.path}: {len(reader)} rows in {len(reader.chunk_rows)} chunks, columns {reader.columns}")
+
+
+if __name__ == '__main__':
+    main()
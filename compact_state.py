@@ -0,0 +1,318 @@
+# compact_state.py
+# GameState의 압축 표현. 손패를 13칸짜리 랭크별 장수 배열로, 테이블과 패스 정보를
+# 작은 정수/비트마스크로 들고 있으며 apply/undo로 한 상태를 제자리에서 변경합니다.
+
+from dalmuti_game import GameState, Player
+
+NUM_RANKS = 13
+JOKER = 13
+PASS = 0           # 패스를 나타내는 정수 수(move)
+MAX_MOVES = 40     # 한 상태에서 나올 수 있는 최대 수 개수 (12 + 12*2 + 2 + pass)
+
+# undo 토큰 비트 배치: 이전 스칼라 상태 + 실제로 빠져나간 카드 구성 + 수 코드
+_TURN_SHIFT = 0
+_LEAD_SHIFT = 3
+_TABLE_RANK_SHIFT = 6
+_TABLE_COUNT_SHIFT = 10
+_TABLE_JOKERS_SHIFT = 14
+_PASSED_SHIFT = 16
+_CONSECUTIVE_SHIFT = 24   # 패스 비트마스크는 MAX_PLAYERS(8)비트
+_NATIVE_SHIFT = 32
+_JOKERS_SHIFT = 36
+_MOVE_SHIFT = 38
+
+
+def encode_move(move):
+    """ {'rank': r, 'count': c} 또는 "pass"를 정수 수로 변환합니다. """
+    if move == "pass":
+        return PASS
+    return (move['rank'] << 4) | move['count']
+
+
+def decode_move(code):
+    """ 정수 수를 GameState가 사용하는 수 형식으로 되돌립니다. """
+    if code == PASS:
+        return "pass"
+    return {'rank': code >> 4, 'count': code & 15}
+
+
+class CompactState:
+    __slots__ = ('num_players', 'counts', 'sizes', 'turn', 'lead',
+                 'table_rank', 'table_count', 'table_jokers',
+                 'passed', 'consecutive', 'winner')
+
+    def __init__(self, num_players):
+        self.num_players = num_players
+        self.counts = [[0] * NUM_RANKS for _ in range(num_players)]  # counts[p][rank - 1]
+        self.sizes = [0] * num_players                                # 각 플레이어의 손패 장수
+        self.turn = 0
+        self.lead = 0
+        self.table_rank = 0     # 테이블이 비어 있으면 rank/count 모두 0
+        self.table_count = 0
+        self.table_jokers = 0   # 테이블 카드 중 조커 장수 (GameState로 되돌릴 때만 필요)
+        self.passed = 0         # 이번 라운드에 패스한 플레이어 비트마스크
+        self.consecutive = 0
+        self.winner = -1
+
+    @property
+    def game_over(self):
+        return self.winner >= 0
+
+    # --------------------------------------------------------------------------
+    # GameState <-> CompactState 변환
+    # --------------------------------------------------------------------------
+    @classmethod
+    def from_game_state(cls, state):
+        compact = cls(state.num_players)
+        compact.load(state)
+        return compact
+
+    def load(self, state):
+        """ 같은 인원수의 GameState 내용을 이 객체에 그대로 읽어 들입니다. """
+        for i, player in enumerate(state.players):
+            row = self.counts[i]
+            for r in range(NUM_RANKS):
+                row[r] = 0
+            for card in player.hand:
+                row[card - 1] += 1
+            self.sizes[i] = len(player.hand)
+        self.turn = state.turn_index
+        self.lead = state.round_lead_index
+        table = state.table_cards['cards']
+        if table:
+            self.table_rank = state.table_cards['effective_rank']
+            self.table_count = len(table)
+            self.table_jokers = table.count(JOKER)
+        else:
+            self.table_rank = self.table_count = self.table_jokers = 0
+        self.passed = 0
+        for i in state.passed_in_round:
+            self.passed |= 1 << i
+        self.consecutive = state.consecutive_passes
+        self.winner = state.winner_index if state.game_over else -1
+
+    def to_game_state(self, template=None):
+        """ GameState로 되돌립니다. template이 주어지면 플레이어 이름/스타일을 그대로 가져옵니다. """
+        state = GameState([], is_clone=True)
+        state.num_players = self.num_players
+        state.players = []
+        for i in range(self.num_players):
+            if template is not None:
+                src = template.players[i]
+                player = Player(src.name, is_ai=src.is_ai, style=src.style)
+            else:
+                player = Player(f"AI {i + 1}", is_ai=True)
+            row = self.counts[i]
+            player.hand = [r + 1 for r in range(NUM_RANKS) for _ in range(row[r])]
+            state.players.append(player)
+        state.turn_index = self.turn
+        state.round_lead_index = self.lead
+        if self.table_count:
+            native = self.table_count - self.table_jokers
+            cards = [self.table_rank] * native + [JOKER] * self.table_jokers
+            cards.sort()
+            state.table_cards = {'cards': cards, 'effective_rank': self.table_rank}
+        else:
+            state.table_cards = {'cards': [], 'effective_rank': 0}
+        state.passed_in_round = {i for i in range(self.num_players) if self.passed >> i & 1}
+        state.consecutive_passes = self.consecutive
+        state.game_over = self.winner >= 0
+        state.winner_index = self.winner
+        state.zobrist_hash = state.compute_zobrist_hash()
+        state.game_log = []
+        return state
+
+    def copy(self):
+        other = CompactState(self.num_players)
+        other.copy_from(self)
+        return other
+
+    def copy_from(self, other):
+        """ 새 객체를 만들지 않고 other의 내용을 그대로 덮어씁니다. (롤아웃용 스크래치 상태) """
+        for mine, theirs in zip(self.counts, other.counts):
+            mine[:] = theirs
+        self.sizes[:] = other.sizes
+        self.turn = other.turn
+        self.lead = other.lead
+        self.table_rank = other.table_rank
+        self.table_count = other.table_count
+        self.table_jokers = other.table_jokers
+        self.passed = other.passed
+        self.consecutive = other.consecutive
+        self.winner = other.winner
+
+    # --------------------------------------------------------------------------
+    # 수 생성 (GameState.get_possible_moves와 같은 순서)
+    # --------------------------------------------------------------------------
+    def legal_moves(self, buf):
+        """ buf에 가능한 정수 수들을 채우고 개수를 반환합니다. buf는 MAX_MOVES 이상이어야 합니다. """
+        turn = self.turn
+        if self.passed >> turn & 1:
+            buf[0] = PASS
+            return 1
+
+        hand = self.counts[turn]
+        jokers = hand[12]
+        table_count = self.table_count
+        n = 0
+        if table_count == 0:
+            # 1. 조커 없이 내는 경우
+            for r in range(12):
+                c = hand[r]
+                if c:
+                    buf[n] = ((r + 1) << 4) | c
+                    n += 1
+            # 2. 다른 카드와 조커를 섞어서 내는 경우
+            if jokers:
+                for r in range(12):
+                    c = hand[r]
+                    if c:
+                        for j in range(1, jokers + 1):
+                            buf[n] = ((r + 1) << 4) | (c + j)
+                            n += 1
+                # 3. 조커만 단독으로 내는 경우
+                for c in range(1, jokers + 1):
+                    buf[n] = (JOKER << 4) | c
+                    n += 1
+        else:
+            # 테이블과 장수가 같고 더 낮은 랭크만 가능 (조커 단독은 13이라 불가능)
+            top = self.table_rank - 1
+            for r in range(top):
+                if hand[r] == table_count:
+                    buf[n] = ((r + 1) << 4) | table_count
+                    n += 1
+            if jokers:
+                for r in range(top):
+                    c = hand[r]
+                    if c and c < table_count <= c + jokers:
+                        buf[n] = ((r + 1) << 4) | table_count
+                        n += 1
+
+        if table_count or n:
+            buf[n] = PASS
+            n += 1
+        return n
+
+    def get_possible_moves(self):
+        buf = [0] * MAX_MOVES
+        n = self.legal_moves(buf)
+        return [decode_move(buf[i]) for i in range(n)]
+
+    # --------------------------------------------------------------------------
+    # 제자리 변경: apply / undo
+    # --------------------------------------------------------------------------
+    def _save(self):
+        return (self.turn << _TURN_SHIFT
+                | self.lead << _LEAD_SHIFT
+                | self.table_rank << _TABLE_RANK_SHIFT
+                | self.table_count << _TABLE_COUNT_SHIFT
+                | self.table_jokers << _TABLE_JOKERS_SHIFT
+                | self.passed << _PASSED_SHIFT
+                | self.consecutive << _CONSECUTIVE_SHIFT)
+
+    def apply(self, code):
+        """ 정수 수를 현재 플레이어 기준으로 적용하고, undo에 넘길 정수 토큰을 반환합니다. """
+        token = self._save() | code << _MOVE_SHIFT
+        if code != PASS:
+            rank = code >> 4
+            count = code & 15
+            if rank == JOKER:
+                native = 0
+            else:
+                available = self.counts[self.turn][rank - 1]
+                native = available if available < count else count
+            token |= native << _NATIVE_SHIFT | (count - native) << _JOKERS_SHIFT
+        self.play(code)
+        return token
+
+    def play(self, code):
+        """ undo 토큰 없이 수를 적용합니다. 되돌릴 필요가 없는 롤아웃에서 사용합니다. """
+        player = self.turn
+        if code == PASS:
+            self._pass(player)
+            return
+
+        rank = code >> 4
+        count = code & 15
+        hand = self.counts[player]
+        if rank == JOKER:
+            jokers = count
+        else:
+            available = hand[rank - 1]
+            jokers = count - available if available < count else 0
+            hand[rank - 1] -= count - jokers
+        hand[12] -= jokers
+        self.sizes[player] -= count
+
+        self.table_rank = rank
+        self.table_count = count
+        self.table_jokers = jokers
+        self.consecutive = 0
+        self.lead = player
+
+        if self.sizes[player] == 0:
+            self.winner = player
+            return
+        self._advance()
+
+    def undo(self, token):
+        """ apply가 반환한 토큰으로 직전 상태를 복원합니다. """
+        self.turn = player = token >> _TURN_SHIFT & 7
+        self.lead = token >> _LEAD_SHIFT & 7
+        self.table_rank = token >> _TABLE_RANK_SHIFT & 15
+        self.table_count = token >> _TABLE_COUNT_SHIFT & 15
+        self.table_jokers = token >> _TABLE_JOKERS_SHIFT & 3
+        self.passed = token >> _PASSED_SHIFT & 255
+        self.consecutive = token >> _CONSECUTIVE_SHIFT & 255
+        self.winner = -1
+
+        code = token >> _MOVE_SHIFT
+        if code != PASS:
+            native = token >> _NATIVE_SHIFT & 15
+            jokers = token >> _JOKERS_SHIFT & 3
+            hand = self.counts[player]
+            hand[(code >> 4) - 1] += native
+            hand[12] += jokers
+            self.sizes[player] += native + jokers
+
+    def make_move(self, move):
+        """ GameState.make_move와 같은 인터페이스 (복사본에 수를 적용). """
+        new_state = self.copy()
+        new_state.apply(encode_move(move))
+        return new_state
+
+    def _pass(self, player):
+        self.passed |= 1 << player
+        self.consecutive += 1
+
+        active = 0
+        unpassed = 0
+        for i in range(self.num_players):
+            if self.sizes[i]:
+                active += 1
+                if not self.passed >> i & 1:
+                    unpassed += 1
+
+        if unpassed <= 1 and active > 1:
+            self.table_rank = 0
+            self.table_count = 0
+            self.table_jokers = 0
+            self.consecutive = 0
+            self.passed = 0
+            self.turn = self.lead
+            if not self.sizes[self.turn]:
+                self._advance()
+        else:
+            self._advance()
+
+    def _advance(self):
+        if self.winner >= 0:
+            return
+        n = self.num_players
+        turn = (self.turn + 1) % n
+        while not self.sizes[turn]:
+            turn = (turn + 1) % n
+        self.turn = turn
+
+    def total_cards(self):
+        return sum(self.sizes)
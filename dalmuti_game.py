@@ -4,6 +4,18 @@ import random
 from collections import Counter
 import copy
 
+# ==============================================================================
+# Zobrist 해시 키 (손패 랭크별 장수, 차례, 라운드 선, 패스한 플레이어, 테이블)
+# 게임 진행용 random과 섞이지 않도록 별도의 고정 시드 난수로 만듭니다.
+# ==============================================================================
+MAX_PLAYERS = 8
+_zobrist_random = random.Random(0x5EED_DA1)
+ZOBRIST_HAND = [[[_zobrist_random.getrandbits(64) for _ in range(13)] for _ in range(13)] for _ in range(MAX_PLAYERS)]
+ZOBRIST_TURN = [_zobrist_random.getrandbits(64) for _ in range(MAX_PLAYERS)]
+ZOBRIST_LEAD = [_zobrist_random.getrandbits(64) for _ in range(MAX_PLAYERS)]
+ZOBRIST_PASSED = [_zobrist_random.getrandbits(64) for _ in range(MAX_PLAYERS)]
+ZOBRIST_TABLE = [[_zobrist_random.getrandbits(64) for _ in range(15)] for _ in range(14)]
+
 # ==============================================================================
 # Player 클래스
 # ==============================================================================
@@ -51,6 +63,21 @@ class GameState:
         for p in self.players:
             p.sort_hand()
         self.turn_index = self.round_lead_index = random.randint(0, self.num_players - 1)
+        self.zobrist_hash = self.compute_zobrist_hash()
+
+    def compute_zobrist_hash(self):
+        """ 현재 상태의 Zobrist 해시를 처음부터 계산합니다. (이후에는 수를 둘 때마다 갱신) """
+        h = 0
+        for i, p in enumerate(self.players):
+            counts = Counter(p.hand)
+            keys = ZOBRIST_HAND[i]
+            for r in range(13):
+                h ^= keys[r][counts.get(r + 1, 0)]
+        h ^= ZOBRIST_TURN[self.turn_index] ^ ZOBRIST_LEAD[self.round_lead_index]
+        for i in self.passed_in_round:
+            h ^= ZOBRIST_PASSED[i]
+        h ^= ZOBRIST_TABLE[self.table_cards['effective_rank']][len(self.table_cards['cards'])]
+        return h
 
     def clone(self):
         cloned_state = GameState([], is_clone=True)
@@ -63,9 +90,16 @@ class GameState:
         cloned_state.consecutive_passes = self.consecutive_passes
         cloned_state.game_over = self.game_over
         cloned_state.winner_index = self.winner_index
+        cloned_state.zobrist_hash = self.zobrist_hash
         cloned_state.game_log = []
         return cloned_state
 
+    def signature(self):
+        """ 두 상태가 같은 진행 상황인지 비교하기 위한 값 (손패, 차례, 테이블, 패스 정보) """
+        return (self.turn_index, self.round_lead_index, self.game_over,
+                tuple(self.table_cards['cards']), self.table_cards['effective_rank'],
+                frozenset(self.passed_in_round), tuple(tuple(p.hand) for p in self.players))
+
     def get_current_player(self):
         return self.players[self.turn_index]
 
@@ -130,8 +164,10 @@ class GameState:
 
     def play_cards(self, player_index, rank, count):
         player = self.players[player_index]
+        num_jokers = player.hand.count(13)
         if rank == 13:
             to_remove = {'native': 0, 'jokers': count}
+            native_available = num_jokers
         else:
             native_available = player.hand.count(rank)
             jokers_to_use = count - native_available if native_available < count else 0
@@ -141,6 +177,15 @@ class GameState:
         for _ in range(to_remove['native']): player.hand.remove(rank)
         for _ in range(to_remove['jokers']): player.hand.remove(13)
 
+        # Zobrist: 손패 장수, 테이블, 라운드 선 변경분 반영
+        keys = ZOBRIST_HAND[player_index]
+        if rank != 13:
+            self.zobrist_hash ^= keys[rank - 1][native_available] ^ keys[rank - 1][native_available - to_remove['native']]
+        self.zobrist_hash ^= keys[12][num_jokers] ^ keys[12][num_jokers - to_remove['jokers']]
+        self.zobrist_hash ^= ZOBRIST_TABLE[self.table_cards['effective_rank']][len(self.table_cards['cards'])]
+        self.zobrist_hash ^= ZOBRIST_TABLE[rank][count]
+        self.zobrist_hash ^= ZOBRIST_LEAD[self.round_lead_index] ^ ZOBRIST_LEAD[player_index]
+
         played_list = [rank] * to_remove['native'] + [13] * to_remove['jokers']
         played_list.sort()
         self.table_cards = {'cards': played_list, 'effective_rank': rank}
@@ -154,6 +199,8 @@ class GameState:
         self.advance_turn()
 
     def player_pass(self, player_index):
+        if player_index not in self.passed_in_round:
+            self.zobrist_hash ^= ZOBRIST_PASSED[player_index]
         self.passed_in_round.add(player_index)
         self.consecutive_passes += 1
         
@@ -161,6 +208,10 @@ class GameState:
         unpassed_players = [p for p in active_players_with_cards if self.players.index(p) not in self.passed_in_round]
 
         if len(unpassed_players) <= 1 and len(active_players_with_cards) > 1:
+            for i in self.passed_in_round:
+                self.zobrist_hash ^= ZOBRIST_PASSED[i]
+            self.zobrist_hash ^= ZOBRIST_TABLE[self.table_cards['effective_rank']][len(self.table_cards['cards'])] ^ ZOBRIST_TABLE[0][0]
+            self.zobrist_hash ^= ZOBRIST_TURN[self.turn_index] ^ ZOBRIST_TURN[self.round_lead_index]
             self.table_cards = {'cards': [], 'effective_rank': 0}
             self.consecutive_passes = 0
             self.passed_in_round.clear()
@@ -171,6 +222,8 @@ class GameState:
 
     def advance_turn(self):
         if self.game_over: return
+        self.zobrist_hash ^= ZOBRIST_TURN[self.turn_index]
         self.turn_index = (self.turn_index + 1) % self.num_players
         while not self.players[self.turn_index].hand:
             self.turn_index = (self.turn_index + 1) % self.num_players
+        self.zobrist_hash ^= ZOBRIST_TURN[self.turn_index]
@@ -0,0 +1,126 @@
+# feature_encoder.py
+# analyze_strategy.state_to_vector와 같은 특징 벡터를 턴마다 처음부터 다시 세지 않고 만드는 인코더.
+# 게임 하나에 붙여 두고 play_cards/player_pass를 이 객체를 통해 호출하면
+# 플레이어별 손패 장수, 손패 크기, 버려진 카드 장수를 바뀐 만큼만 갱신하고,
+# encode()는 미리 잡아 둔 NumPy 행에 값을 채워 넣습니다. (결과는 state_to_vector와 값이 완전히 같음)
+# 여러 상태를 한 번에 인코딩하는 encode_states()도 제공합니다.
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUM_RANKS = 13
+FULL_DECK_COUNTS = [i for i in range(1, 13)] + [2]   # 랭크 1~12는 i장, 조커(13)는 2장
+
+
+def vector_length(num_players):
+    """ state_to_vector 길이: 내 손패 13 + 다른 플레이어 장수 + 테이블 2 + 패스 수 1 + 버려진 카드 13 """
+    return NUM_RANKS + (num_players - 1) + 2 + 1 + NUM_RANKS
+
+
+def _others_order(num_players):
+    """ 차례별로 '나를 기준으로 시계 방향' 다른 플레이어 번호 배열 """
+    return np.array([[(turn + 1 + i) % num_players for i in range(num_players - 1)]
+                     for turn in range(num_players)], dtype=np.intp)
+
+
+class FeatureEncoder:
+    def __init__(self, state, dtype='int16'):
+        if np is None:
+            raise ImportError("FeatureEncoder requires numpy.")
+        self.state = state
+        self.num_players = state.num_players
+        self.row = np.zeros(vector_length(self.num_players), dtype=dtype)
+        self._others = _others_order(self.num_players)
+        self._other_end = NUM_RANKS + self.num_players - 1
+        self.resync()
+
+    def resync(self):
+        """ 붙어 있는 상태에서 손패/버려진 카드 장수를 처음부터 다시 셉니다. (인코더를 거치지 않고 상태를 바꾼 경우) """
+        self.counts = np.zeros((self.num_players, NUM_RANKS), dtype=np.int16)
+        for i, p in enumerate(self.state.players):
+            for card in p.hand:
+                self.counts[i, card - 1] += 1
+        self.sizes = self.counts.sum(axis=1)
+        self.discard = np.array(FULL_DECK_COUNTS, dtype=np.int16) - self.counts.sum(axis=0)
+
+    # --------------------------------------------------------------------------
+    # 게임 진행 (상태를 바꾸면서 장수 벡터도 함께 갱신)
+    # --------------------------------------------------------------------------
+    def play_cards(self, player_index, rank, count):
+        # GameState.play_cards와 같은 규칙: 같은 랭크 카드를 먼저 쓰고 모자라는 만큼 조커를 씀
+        row = self.counts[player_index]
+        natives = 0 if rank == 13 else min(int(row[rank - 1]), count)
+        jokers = count - natives
+        self.state.play_cards(player_index, rank, count)
+        if natives:
+            row[rank - 1] -= natives
+            self.discard[rank - 1] += natives
+        if jokers:
+            row[12] -= jokers
+            self.discard[12] += jokers
+        self.sizes[player_index] -= count
+
+    def player_pass(self, player_index):
+        self.state.player_pass(player_index)
+
+    def make_move(self, move):
+        """ 붙어 있는 상태에 move("pass" 또는 {'rank', 'count'})를 제자리에서 적용합니다. """
+        if move == "pass":
+            self.player_pass(self.state.turn_index)
+        else:
+            self.play_cards(self.state.turn_index, move['rank'], move['count'])
+
+    # --------------------------------------------------------------------------
+    # 인코딩
+    # --------------------------------------------------------------------------
+    def encode(self, out=None):
+        """ 현재 차례 플레이어 관점의 특징 벡터를 out(없으면 내부 행)에 써서 돌려줍니다.
+            내부 행은 다음 호출 때 덮어쓰이므로 보관하려면 복사하거나 out을 넘기세요. """
+        out = self.row if out is None else out
+        state = self.state
+        turn = state.turn_index
+        end = self._other_end
+        out[:NUM_RANKS] = self.counts[turn]
+        out[NUM_RANKS:end] = self.sizes[self._others[turn]]
+        out[end] = state.table_cards.get('effective_rank', 0)
+        out[end + 1] = len(state.table_cards.get('cards', []))
+        out[end + 2] = len(state.passed_in_round)
+        out[end + 3:] = self.discard
+        return out
+
+
+def encode_states(states, out=None, dtype='int16'):
+    """ 플레이어 수가 같은 여러 GameState를 한 번에 인코딩해 (상태 수, 벡터 길이) 배열로 돌려줍니다. """
+    if np is None:
+        raise ImportError("encode_states requires numpy.")
+    num_states = len(states)
+    if not num_states:
+        return np.zeros((0, 0), dtype=dtype) if out is None else out
+    num_players = states[0].num_players
+    if any(s.num_players != num_players for s in states):
+        raise ValueError("encode_states needs states with the same number of players.")
+    width = vector_length(num_players)
+    if out is None:
+        out = np.empty((num_states, width), dtype=dtype)
+
+    # 모든 손패를 (상태, 플레이어, 랭크) 칸 번호로 이어 붙여 bincount 한 번으로 장수를 셈
+    cells = []
+    for s_index, s in enumerate(states):
+        for p_index, p in enumerate(s.players):
+            base = (s_index * num_players + p_index) * NUM_RANKS - 1
+            cells.extend(base + card for card in p.hand)
+    counts = np.bincount(np.asarray(cells, dtype=np.intp),
+                         minlength=num_states * num_players * NUM_RANKS).reshape(num_states, num_players, NUM_RANKS)
+
+    turns = np.array([s.turn_index for s in states], dtype=np.intp)
+    rows = np.arange(num_states)
+    end = NUM_RANKS + num_players - 1
+    out[:, :NUM_RANKS] = counts[rows, turns]
+    out[:, NUM_RANKS:end] = counts.sum(axis=2)[rows[:, None], _others_order(num_players)[turns]]
+    out[:, end] = [s.table_cards.get('effective_rank', 0) for s in states]
+    out[:, end + 1] = [len(s.table_cards.get('cards', [])) for s in states]
+    out[:, end + 2] = [len(s.passed_in_round) for s in states]
+    out[:, end + 3:] = np.array(FULL_DECK_COUNTS) - counts.sum(axis=1)
+    return out
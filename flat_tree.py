@@ -0,0 +1,208 @@
+# flat_tree.py
+# 구조체 배열(struct-of-arrays) 형태의 MCTS 트리 엔진.
+# 노드마다 객체를 만드는 대신 방문/승리/부모/첫 자식/다음 형제/수를 array 버퍼에 나란히 저장하고,
+# 버퍼가 차면 두 배로 늘립니다. 노드는 GameState를 들고 있지 않고, 반복마다 하나의 CompactState를
+# 루트에서부터 수를 따라 진행시켜 상태를 재구성합니다. (MCTS_AI와 같은 완전 정보, 루트 플레이어 관점)
+# MCTS_AI(tree='flat')로 쓰면 MCTS_AI의 예산과 롤아웃 엔진으로 이 엔진이 탐색합니다.
+# MCTS_Pro_AI는 노드마다 실제 GameState를 두고 리프에서 결정화하며 트리 재사용·전치 테이블·병렬 탐색을 함께 쓰므로
+# 이 엔진에 연결하지 않았습니다 (정보집합 트리를 통계만으로 들고 있는 쪽은 ismcts.py / mode='ismcts').
+
+import math
+from array import array
+
+from compact_state import CompactState, MAX_MOVES, decode_move
+from rollout import RolloutEngine
+from search_budget import SearchBudget
+
+NO_NODE = -1
+FREED = -2      # 재활용 대기 노드의 parent 표시
+
+
+class FlatTree:
+    def __init__(self, capacity=1024, max_nodes=None):
+        self.max_nodes = max_nodes
+        self.visits = array('l', [0]) * capacity
+        self.wins = array('d', [0.0]) * capacity
+        self.parent = array('l', [NO_NODE]) * capacity
+        self.first_child = array('l', [NO_NODE]) * capacity
+        self.next_sibling = array('l', [NO_NODE]) * capacity
+        self.num_children = array('B', [0]) * capacity
+        self.move = array('B', [0]) * capacity
+        self.size = 0           # 한 번이라도 사용된 노드 수 (버퍼 끝)
+        self.free = []          # 재활용 가능한 노드 번호
+        self.recycled = 0
+
+    def __len__(self):
+        return self.size - len(self.free)
+
+    def _grow(self):
+        for buf in (self.visits, self.wins, self.parent, self.first_child,
+                    self.next_sibling, self.num_children, self.move):
+            buf.extend(buf)
+
+    def new_node(self, parent, move):
+        if self.free:
+            node = self.free.pop()
+        else:
+            if self.size == len(self.visits):
+                self._grow()
+            node = self.size
+            self.size += 1
+        self.visits[node] = 0
+        self.wins[node] = 0.0
+        self.parent[node] = parent
+        self.first_child[node] = NO_NODE
+        self.num_children[node] = 0
+        self.move[node] = move
+        if parent != NO_NODE:
+            self.next_sibling[node] = self.first_child[parent]
+            self.first_child[parent] = node
+            self.num_children[parent] += 1
+        else:
+            self.next_sibling[node] = NO_NODE
+        return node
+
+    def child_visits(self, node=0):
+        visits = self.visits
+        next_sibling = self.next_sibling
+        child = self.first_child[node]
+        while child != NO_NODE:
+            yield visits[child]
+            child = next_sibling[child]
+
+    def best_child(self, node=0):
+        """ 가장 많이 방문한 자식 """
+        best = NO_NODE
+        best_visits = -1
+        child = self.first_child[node]
+        while child != NO_NODE:
+            if self.visits[child] > best_visits:
+                best, best_visits = child, self.visits[child]
+            child = self.next_sibling[child]
+        return best
+
+    def needs_recycling(self):
+        return self.max_nodes is not None and len(self) >= self.max_nodes
+
+    def recycle(self, target):
+        """ 방문 수가 가장 적은 (자식이 있는) 노드들의 하위 트리를 잘라 target개 이상의 노드를 비웁니다.
+            잘린 노드 자신의 통계는 남고, 다시 방문하면 처음부터 확장됩니다. """
+        parent = self.parent
+        candidates = [n for n in range(1, self.size) if parent[n] != FREED and self.num_children[n]]
+        candidates.sort(key=self.visits.__getitem__)
+        freed = 0
+        for node in candidates:
+            if freed >= target:
+                break
+            if parent[node] == FREED or not self.num_children[node]:
+                continue   # 앞에서 잘린 하위 트리에 속해 있었음
+            stack = [self.first_child[node]]
+            while stack:
+                child = stack.pop()
+                while child != NO_NODE:
+                    if self.num_children[child]:
+                        stack.append(self.first_child[child])
+                    parent[child] = FREED
+                    self.free.append(child)
+                    freed += 1
+                    child = self.next_sibling[child]
+            self.first_child[node] = NO_NODE
+            self.num_children[node] = 0
+        self.recycled += freed
+        return freed
+
+    def memory_bytes(self):
+        return sum(buf.itemsize * len(buf) for buf in (self.visits, self.wins, self.parent, self.first_child,
+                                                       self.next_sibling, self.num_children, self.move))
+
+
+class FlatMCTS_AI:
+    def __init__(self, iterations=1000, time_budget_ms=None, max_nodes=None, exploration=1.41, rollout_engine=None):
+        self.iterations = iterations
+        self.time_budget_ms = time_budget_ms
+        self.max_nodes = max_nodes          # 노드 수 상한. 넘으면 방문이 적은 하위 트리를 재활용
+        self.exploration = exploration
+        self.rollout_engine = rollout_engine if rollout_engine is not None else RolloutEngine()
+        self.last_search_stats = None
+        self._legal = [0] * MAX_MOVES
+
+    def find_best_move(self, initial_state):
+        move, _ = self.search(initial_state)
+        return move
+
+    def search(self, initial_state):
+        """ 최선의 수와 탐색 통계(반복 횟수, 걸린 시간 ms, 멈춘 이유, 노드 수, 트리 메모리)를 함께 반환합니다. """
+        budget = SearchBudget(self.iterations, self.time_budget_ms)
+        root_state = CompactState.from_game_state(initial_state)
+        tree = FlatTree(max_nodes=self.max_nodes)
+        tree.new_node(NO_NODE, 0)
+
+        n = root_state.legal_moves(self._legal)
+        if n == 1:
+            budget.stop_reason = 'single_move'
+            move = decode_move(self._legal[0])
+        else:
+            self._run(tree, root_state, budget)
+            move = decode_move(tree.move[tree.best_child(0)])
+
+        self.last_search_stats = budget.stats()
+        self.last_search_stats.update(nodes=len(tree), recycled=tree.recycled, tree_bytes=tree.memory_bytes())
+        return move, self.last_search_stats
+
+    def _run(self, tree, root_state, budget):
+        scratch = CompactState(root_state.num_players)
+        legal = self._legal
+        root_player_index = root_state.turn
+        exploration = self.exploration
+        visits = tree.visits
+        wins = tree.wins
+        parent = tree.parent
+        first_child = tree.first_child
+        next_sibling = tree.next_sibling
+        num_children = tree.num_children
+        moves = tree.move
+        log = math.log
+        sqrt = math.sqrt
+
+        while budget.keep_going(tree):
+            if tree.needs_recycling():
+                tree.recycle(max(1, self.max_nodes // 8))
+            # 버퍼가 커지면 array 객체가 같은 것이므로 지역 변수 참조는 그대로 유효
+
+            scratch.copy_from(root_state)
+            node = 0
+            while scratch.winner < 0:
+                n = scratch.legal_moves(legal)
+                k = num_children[node]
+                if k < n:
+                    # Expansion: MCTS_Node.expand처럼 수 목록의 뒤에서부터 하나씩 확장
+                    move = legal[n - 1 - k]
+                    node = tree.new_node(node, move)
+                    scratch.play(move)
+                    break
+
+                # Selection: 자식들을 한 번 훑어 UCB1 최댓값 (정렬 없음)
+                log_total = log(visits[node])
+                best = NO_NODE
+                best_score = -1.0
+                child = first_child[node]
+                while child != NO_NODE:
+                    v = visits[child]
+                    if v == 0:
+                        best = child
+                        break
+                    score = wins[child] / v + exploration * sqrt(log_total / v)
+                    if score > best_score:
+                        best, best_score = child, score
+                    child = next_sibling[child]
+                node = best
+                scratch.play(moves[node])
+
+            result = self.rollout_engine.value(scratch, root_player_index)
+
+            # Backpropagation: 부모 배열을 따라 반복문으로 전파
+            while node != NO_NODE:
+                visits[node] += 1
+                wins[node] += result
+                node = parent[node]
+            budget.done += 1
@@ -0,0 +1,180 @@
+# ismcts.py
+# 단일 관찰자 정보집합 MCTS (Single-Observer Information Set MCTS).
+# MCTS_Pro_AI는 실제 상대 손패가 담긴 상태로 트리를 만들고 리프에서만 결정화하지만,
+# 여기서는 반복마다 루트에서 결정화(상대 손패를 새로 나눔)를 한 번 하고
+# 그 결정화에서 가능한 수들로만 트리를 내려갑니다. 노드는 GameState 없이 통계만 가집니다.
+# MCTS_Pro_AI(mode='ismcts')로도 쓸 수 있습니다 (그 AI의 롤아웃 엔진과 belief를 그대로 사용).
+
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from compact_state import CompactState, MAX_MOVES, decode_move
+from rollout import RolloutEngine
+from search_budget import SearchBudget
+
+BELIEF_SAMPLE_BLOCK = 64    # belief가 있으면 루트 결정화를 이만큼씩 한 번에 뽑아 두고 반복마다 하나씩 씀
+
+
+class ISMCTS_Node:
+    __slots__ = ('parent', 'move', 'player_just_moved', 'children', 'visits', 'wins', 'avails')
+
+    def __init__(self, parent=None, move=None, player_just_moved=None):
+        self.parent = parent
+        self.move = move                            # 정수 수 (compact_state.encode_move 형식)
+        self.player_just_moved = player_just_moved  # 이 노드로 오는 수를 둔 플레이어 (승리 기준)
+        self.children = {}                          # 수 -> 자식 노드
+        self.visits = 0
+        self.wins = 0
+        self.avails = 1                             # 이 노드의 수가 가능했던 횟수 (availability)
+
+    def child_visits(self):
+        """ 루트 자식 방문 수 (SearchBudget의 조기 종료 판단용) """
+        return [child.visits for child in self.children.values()]
+
+    def select_child(self, legal, n, exploration):
+        """ 이번 결정화에서 가능한 자식들 중 availability 기반 UCB1이 가장 높은 자식을 고릅니다. """
+        best = None
+        best_score = -1.0
+        children = self.children
+        for i in range(n):
+            child = children[legal[i]]
+            score = child.wins / child.visits + exploration * math.sqrt(math.log(child.avails) / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        for i in range(n):
+            children[legal[i]].avails += 1
+        return best
+
+    def add_child(self, move, player_just_moved):
+        child = self.children[move] = ISMCTS_Node(self, move, player_just_moved)
+        return child
+
+
+class ISMCTS_AI:
+    def __init__(self, iterations=1000, time_budget_ms=None, exploration=0.7, max_plies=None,
+                 rollout_engine=None, belief=None):
+        self.iterations = iterations
+        self.time_budget_ms = time_budget_ms
+        self.exploration = exploration
+        self.max_plies = max_plies      # 롤아웃 안전장치 (None이면 끝까지)
+        # 플레이아웃 정책/cutoff는 rollout_engine을 따름 (cutoff에 걸리면 evaluator로 플레이어별 승률을 추정)
+        self.rollout_engine = rollout_engine if rollout_engine is not None else RolloutEngine()
+        # belief.CardBelief를 주면 루트 결정화에 낸 카드와 패스 제약을 반영 (NumPy가 있으면 묶음으로 뽑음)
+        self.belief = belief
+        self.last_search_stats = None
+        self._legal = [0] * MAX_MOVES
+
+    def find_best_move(self, initial_state):
+        move, _ = self.search(initial_state)
+        return move
+
+    def search(self, initial_state):
+        """ 최선의 수와 탐색 통계(반복 횟수, 걸린 시간 ms, 멈춘 이유, 노드 수)를 함께 반환합니다. """
+        budget = SearchBudget(self.iterations, self.time_budget_ms)
+        if self.belief is not None and not self.belief.matches(initial_state):
+            self.belief.sync(initial_state)
+        observer = initial_state.turn_index
+        root_state = CompactState.from_game_state(initial_state)
+        root_node = ISMCTS_Node()
+
+        n = root_state.legal_moves(self._legal)
+        if n == 1:
+            budget.stop_reason = 'single_move'
+            move = decode_move(self._legal[0])
+        else:
+            nodes = self._run(root_node, root_state, observer, budget)
+            best_child = max(root_node.children.values(), key=lambda c: c.visits)
+            move = decode_move(best_child.move)
+
+        self.last_search_stats = budget.stats()
+        if n != 1:
+            self.last_search_stats['nodes'] = nodes
+        return move, self.last_search_stats
+
+    def _run(self, root_node, root_state, observer, budget):
+        scratch = CompactState(root_state.num_players)
+        legal = self._legal
+        engine = self.rollout_engine
+        players = range(root_state.num_players)
+        limit = self.max_plies
+        if engine.cutoff is not None and (limit is None or engine.cutoff < limit):
+            limit = engine.cutoff
+        nodes = 1
+        sample_block = self.belief is not None and np is not None
+        hand = list(root_state.counts[observer])
+        samples = []
+
+        while budget.keep_going(root_node):
+            # 1. 결정화: 관찰자가 모르는 상대 손패를 이번 반복용으로 새로 나눔
+            scratch.copy_from(root_state)
+            if sample_block:
+                if not samples:
+                    samples = self.belief.sample(hand, observer, BELIEF_SAMPLE_BLOCK).tolist()
+                for row, new in zip(scratch.counts, samples.pop()):
+                    row[:] = new
+            elif self.belief is not None:
+                self.belief.determinize_into(scratch, observer)
+            else:
+                self.determinize(scratch, observer)
+
+            # 2. Selection: 이번 결정화에서 가능한 수가 모두 자식으로 있으면 UCB로 내려감
+            node = root_node
+            while scratch.winner < 0:
+                n = scratch.legal_moves(legal)
+                untried = [legal[i] for i in range(n) if legal[i] not in node.children]
+                if untried:
+                    # 3. Expansion
+                    move = random.choice(untried)
+                    player = scratch.turn
+                    scratch.play(move)
+                    node = node.add_child(move, player)
+                    nodes += 1
+                    break
+                node = node.select_child(legal, n, self.exploration)
+                scratch.play(node.move)
+
+            # 4. Simulation (cutoff에 걸리면 정적 평가로 플레이어별 승률을 추정)
+            winner_index = engine.run(scratch, limit)
+            if winner_index < 0 and engine.cutoff is not None and limit == engine.cutoff:
+                engine.cutoffs += 1
+                values = [engine.evaluator(scratch, p) for p in players]
+            else:
+                values = [1 if p == winner_index else 0 for p in players]
+
+            # 5. Backpropagation: 각 노드는 그 수를 둔 플레이어 관점으로 승리를 셈
+            while node.parent is not None:
+                node.visits += 1
+                node.wins += values[node.player_just_moved]
+                node = node.parent
+            node.visits += 1
+            budget.done += 1
+
+        return nodes
+
+    @staticmethod
+    def determinize(state, observer):
+        """ 관찰자 외 플레이어들의 손패를 모두 모아 섞은 뒤, 각자의 장수대로 다시 나눕니다.
+            (관찰자는 자기 손패와 이미 나온 카드를 알고 있으므로 남은 카드 구성은 알 수 있음) """
+        pool = []
+        for i in range(state.num_players):
+            if i != observer:
+                row = state.counts[i]
+                for r in range(13):
+                    if row[r]:
+                        pool.extend([r + 1] * row[r])
+                        row[r] = 0
+        random.shuffle(pool)
+
+        index = 0
+        for i in range(state.num_players):
+            if i != observer:
+                row = state.counts[i]
+                for card in pool[index:index + state.sizes[i]]:
+                    row[card - 1] += 1
+                index += state.sizes[i]
+        return state
@@ -0,0 +1,216 @@
+# loadtest.py
+# server.py 부하 테스트. 가상 클라이언트 여러 개가 동시에 AI끼리의 게임을 만들고
+# 게임이 끝날 때까지 ai-move를 요청하면서, 초당 처리한 수와 요청 지연 시간 분위수(p50/p95/p99/max)를 잽니다.
+# 503(서버가 바쁨)을 받으면 Retry-After만큼 기다렸다 다시 요청하고, 그 횟수도 따로 셉니다.
+# 파이썬 규칙은 빈 테이블에서도 패스를 허용하므로 짧은 예산의 AI가 선에서 계속 패스하며 끝나지 않는 게임이 생길 수 있습니다.
+# max_plies를 넘긴 게임은 중단하고 stalled로 셉니다.
+#
+# 예) python server.py --port 8000 --workers 4 &
+#     python loadtest.py --port 8000 --clients 32 --games 64 --time-budget-ms 50
+#     python loadtest.py --start-server --workers 2 --transport ws
+
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+from server import OP_CLOSE, OP_TEXT, encode_frame, read_frame
+
+
+class HTTPClient:
+    """ keep-alive 연결 하나로 JSON 요청을 차례대로 보내는 최소 HTTP/1.1 클라이언트 """
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.writer.write((f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                           f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n").encode() + payload)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+        data = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        return status, headers, json.loads(data) if data else {}
+
+    async def call(self, op, **fields):
+        if op == 'create':
+            return await self.request('POST', '/api/games', fields)
+        if op == 'ai_move':
+            return await self.request('POST', f"/api/games/{fields.pop('game_id')}/ai-move", fields)
+        raise ValueError(op)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class WebSocketClient:
+    """ 웹소켓 하나로 op 요청을 보내는 클라이언트 (요청마다 응답을 기다림) """
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+        self.ids = itertools.count(1)
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.writer.write((f"GET /ws HTTP/1.1\r\nHost: {self.host}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                           f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        await self.writer.drain()
+        while (await self.reader.readline()) not in (b'\r\n', b''):
+            pass
+
+    async def call(self, op, **fields):
+        if self.writer is None:
+            await self.connect()
+        request_id = next(self.ids)
+        self.writer.write(encode_frame(OP_TEXT, json.dumps({'id': request_id, 'op': op, **fields}).encode(), mask=True))
+        await self.writer.drain()
+        while True:
+            opcode, _, payload = await read_frame(self.reader)
+            if opcode != OP_TEXT:
+                continue
+            reply = json.loads(payload)
+            if reply.get('id') == request_id:
+                status = 200 if reply.get('ok') else reply.get('status', 500)
+                return status, {'retry-after': '1'} if status == 503 else {}, reply
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.write(encode_frame(OP_CLOSE, b'', mask=True))
+            self.writer.close()
+
+
+async def run_client(client, games, players, time_budget_ms, max_plies, latencies, counters):
+    """ 게임 대기열(games)에서 하나씩 꺼내 AI끼리 끝까지 둡니다. """
+    try:
+        while games:
+            games.pop()
+            status, _, reply = await client.call('create', players=players)
+            if status != 200:
+                counters['errors'] += 1
+                continue
+            game_id = reply['game_id']
+            game_over, plies = False, 0
+            while not game_over:
+                if plies >= max_plies:
+                    counters['stalled'] += 1
+                    break
+                start = time.perf_counter()
+                status, headers, reply = await client.call('ai_move', game_id=game_id, time_budget_ms=time_budget_ms)
+                if status == 503:
+                    counters['rejected'] += 1
+                    await asyncio.sleep(float(headers.get('retry-after', 1)))
+                    continue
+                if status != 200:
+                    counters['errors'] += 1
+                    break
+                latencies.append(time.perf_counter() - start)
+                counters['moves'] += 1
+                plies += 1
+                game_over = reply['state']['game_over']
+            counters['games'] += game_over
+    finally:
+        await client.close()
+
+
+def percentile(ordered, q):
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else float('nan')
+
+
+async def run_load(host, port, clients, games, players, time_budget_ms, transport, max_plies=1000):
+    queue = list(range(games))
+    latencies = []
+    counters = {'moves': 0, 'games': 0, 'rejected': 0, 'errors': 0, 'stalled': 0}
+    client_class = WebSocketClient if transport == 'ws' else HTTPClient
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(client_class(host, port), queue, players, time_budget_ms, max_plies, latencies, counters)
+                           for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    report = {
+        'transport': transport, 'clients': clients, 'time_budget_ms': time_budget_ms, 'elapsed': elapsed,
+        **counters,
+        'moves_per_sec': counters['moves'] / elapsed if elapsed > 0 else 0.0,
+        'latency_ms': {name: percentile(ordered, q) * 1000
+                       for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99), ('max', 1.0))},
+    }
+    print(f"{counters['games']} games, {counters['moves']} AI moves in {elapsed:.1f}s over {transport} "
+          f"with {clients} clients | {report['moves_per_sec']:.1f} moves/s | "
+          f"{counters['rejected']} rejected (503), {counters['errors']} errors, {counters['stalled']} stalled")
+    print("latency ms: " + " | ".join(f"{name} {value:.1f}" for name, value in report['latency_ms'].items()))
+    return report
+
+
+async def wait_for_port(host, port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test server.py: AI moves/sec and tail latency.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--clients', type=int, default=16, help="concurrent virtual clients")
+    parser.add_argument('--games', type=int, default=32, help="total games to play")
+    parser.add_argument('--players', nargs='+', default=['mcts_pro'] * 4, help="seat styles (all must be AIs)")
+    parser.add_argument('--time-budget-ms', type=float, default=50)
+    parser.add_argument('--max-plies', type=int, default=1000, help="abandon a game as stalled after this many AI moves")
+    parser.add_argument('--transport', choices=['http', 'ws'], default='http')
+    parser.add_argument('--start-server', action='store_true', help="launch server.py for the duration of the test")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="with --start-server")
+    parser.add_argument('--max-pending', type=int, default=None, help="with --start-server")
+    parser.add_argument('--out', help="write the report as JSON")
+    args = parser.parse_args()
+
+    server = None
+    if args.start_server:
+        command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py'),
+                   '--host', args.host, '--port', str(args.port), '--workers', str(args.workers)]
+        if args.max_pending is not None:
+            command += ['--max-pending', str(args.max_pending)]
+        server = subprocess.Popen(command)
+    try:
+        if server is not None:
+            asyncio.run(wait_for_port(args.host, args.port))
+        report = asyncio.run(run_load(args.host, args.port, args.clients, args.games, args.players,
+                                      args.time_budget_ms, args.transport, args.max_plies))
+    except KeyboardInterrupt:
+        print("Interrupted.")
+        return
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -56,8 +56,41 @@ class MCTS_AI {
      * MCTS 알고리즘을 실행하여 최선의 수를 찾습니다.
      * @param {number} iterations - AI가 생각하는 깊이(시뮬레이션 반복 횟수)
      */
-    constructor({ iterations = 1000 }) {
+    constructor({ iterations = 1000, reuseTree = false }) {
         this.iterations = iterations;
+        // reuseTree: 이전 탐색 트리를 보관했다가 observe()로 실제 진행된 수만큼 옮겨 재사용
+        this.reuseTree = reuseTree;
+        this.trees = new Map(); // 플레이어 번호 -> 그 플레이어 관점의 트리 루트
+    }
+
+    /**
+     * 실제로 둔 수(자신과 상대 모두)를 알려줍니다.
+     * 보관 중인 트리의 루트를 그 수의 자식으로 옮기고 나머지 가지는 버립니다.
+     * @param {object|string} move - 방금 진행된 행동
+     */
+    observe(move) {
+        const sameMove = (a, b) => (a === "pass" || b === "pass") ? a === b : (a.rank === b.rank && a.count === b.count);
+        for (const [playerIndex, root] of this.trees) {
+            const child = root.children.find(c => sameMove(c.move, move));
+            if (child) {
+                child.parent = null;
+                this.trees.set(playerIndex, child);
+            } else {
+                this.trees.delete(playerIndex);
+            }
+        }
+    }
+
+    /**
+     * 재사용할 트리가 현재 상태와 일치하면 그 루트를, 아니면 새 루트를 돌려줍니다.
+     */
+    _rootFor(initialState, NodeClass) {
+        let rootNode = this.reuseTree ? this.trees.get(initialState.turnIndex) : undefined;
+        if (!rootNode || rootNode.gameState.signature() !== initialState.signature()) {
+            rootNode = new NodeClass(initialState);
+        }
+        if (this.reuseTree) this.trees.set(initialState.turnIndex, rootNode);
+        return rootNode;
     }
 
     find_best_move(initialState) {
@@ -77,7 +110,7 @@ class MCTS_AI {
         }
 
         // --- 기존 MCTS 로직 ---
-        const rootNode = new MCTS_Node(initialState);
+        const rootNode = this._rootFor(initialState, MCTS_Node);
         const rootPlayerIndex = initialState.turnIndex;
 
         for (let i = 0; i < this.iterations; i++) {
@@ -1,95 +1,331 @@
-# mcts_ai.py
-
-import math
-import random
-from collections import defaultdict
-
-# MCTS가 탐색하는 트리의 각 지점(노드)을 나타내는 클래스
-class MCTS_Node:
-    def __init__(self, game_state, parent=None, move=None):
-        self.game_state = game_state
-        self.parent = parent
-        self.move = move  # 이 노드로 오게 된 '행동' (예: {'rank': 5, 'count': 3})
-        
-        self.children = []
-        self.wins = 0
-        self.visits = 0
-        
-        # 이 노드에서 아직 탐색해보지 않은 수들
-        self.unexplored_moves = self.game_state.get_possible_moves()
-
-    def select_child(self):
-        """ UCB1 공식을 사용해 가장 유망한 자식 노드를 선택합니다. (Selection 단계) """
-        # UCB1: (자신의 승률) + c * sqrt(log(부모의 방문 횟수) / (자신의 방문 횟수))
-        # 승률이 높은 '익숙한 길'과, 아직 덜 가본 '새로운 길' 사이의 균형을 맞추는 역할
-        log_total_visits = math.log(self.visits)
-        
-        def ucb_score(child):
-            if child.visits == 0:
-                return float('inf') # 아직 방문 안 한 노드를 최우선으로 탐색
-            return (child.wins / child.visits) + 1.41 * math.sqrt(log_total_visits / child.visits)
-
-        return sorted(self.children, key=ucb_score, reverse=True)[0]
-
-    def expand(self):
-        """ 아직 시도 안 한 수 중 하나를 골라 자식 노드를 만들고 트리를 확장합니다. (Expansion 단계) """
-        move = self.unexplored_moves.pop()
-        next_state = self.game_state.make_move(move)
-        child_node = MCTS_Node(next_state, parent=self, move=move)
-        self.children.append(child_node)
-        return child_node
-
-    def update(self, result):
-        """ 시뮬레이션 결과를 자신과 모든 부모 노드들에게 거슬러 올라가며 전파합니다. (Backpropagation 단계) """
-        self.visits += 1
-        self.wins += result
-        if self.parent:
-            self.parent.update(result)
-
-# MCTS 알고리즘의 전체 흐름을 제어하는 메인 클래스
-class MCTS_AI:
-    def __init__(self, iterations=1000):
-        self.iterations = iterations # AI의 '생각하는 깊이'. 숫자가 클수록 똑똑하지만 느려짐.
-
-    def find_best_move(self, initial_state):
-        """ 주어진 상태에서 최선의 수를 찾습니다. """
-        root_node = MCTS_Node(game_state=initial_state)
-        
-        # 주어진 횟수만큼 시뮬레이션 반복
-        for _ in range(self.iterations):
-            node = root_node
-            
-            # 1. Selection: 가장 유망한 경로를 따라 내려감
-            while not node.unexplored_moves and node.children:
-                node = node.select_child()
-            
-            # 2. Expansion: 새로운 수를 시도하며 트리 확장
-            if node.unexplored_moves:
-                node = node.expand()
-            
-            # 3. Simulation: 확장된 노드부터 게임 끝까지 무작위로 플레이
-            winner_index = self._simulate(node.game_state)
-            
-            # 4. Backpropagation: 시뮬레이션 결과를 트리에 업데이트
-            # 현재 MCTS AI의 승리 여부를 판단
-            result = 1 if winner_index == initial_state.turn_index else 0
-            node.update(result)
-
-        # 모든 시뮬레이션 후, 가장 많이 방문한(가장 안정적이고 승률이 높다고 판단된) 수를 선택
-        best_child = sorted(root_node.children, key=lambda c: c.visits, reverse=True)[0]
-        return best_child.move
-
-    def _simulate(self, game_state):
-        """ 현재 상태에서 게임이 끝날 때까지 무작위로 플레이하고 승자를 반환합니다. (Simulation 단계) """
-        current_state = game_state
-        while not current_state.game_over:
-            possible_moves = current_state.get_possible_moves()
-            # 낼 수 있는 패가 없으면 무조건 패스
-            if not possible_moves:
-                move = "pass"
-            else:
-                move = random.choice(possible_moves)
-            
-            current_state = current_state.make_move(move)
-        
-        return current_state.winner_index
\ No newline at end of file
+# mcts_ai.py
+
+import math
+import random
+from collections import defaultdict
+
+from rollout import RolloutEngine
+from endgame import EndgameSolver
+from flat_tree import FlatMCTS_AI
+from search_budget import SearchBudget
+from search_stats import NULL_RECORDER
+from transposition import NodeStats, path_stats
+try:
+    from batched_rollout import MIN_EFFICIENT_BATCH, BatchedRollout, np
+except ImportError:
+    MIN_EFFICIENT_BATCH, BatchedRollout, np = None, None, None
+
+# MCTS가 탐색하는 트리의 각 지점(노드)을 나타내는 클래스
+class MCTS_Node:
+    def __init__(self, game_state, parent=None, move=None, table=None, perspective=None):
+        self.game_state = game_state
+        self.parent = parent
+        self.move = move  # 이 노드로 오게 된 '행동' (예: {'rank': 5, 'count': 3})
+        
+        self.children = []
+        # 전치 테이블(table)이 있으면 같은 상태·같은 관점(perspective: 승리 기준 플레이어)의 통계를 공유
+        self.table = table
+        self.perspective = perspective
+        self.stats = table.lookup(table.key(game_state, perspective)) if table is not None else NodeStats()
+        
+        # 이 노드에서 아직 탐색해보지 않은 수들
+        self.unexplored_moves = self.game_state.get_possible_moves()
+
+    # 방문/승리 수는 stats 객체에 보관 (전치 테이블을 쓰면 같은 상태의 노드끼리 공유)
+    @property
+    def visits(self):
+        return self.stats.visits
+
+    @visits.setter
+    def visits(self, value):
+        self.stats.visits = value
+
+    @property
+    def wins(self):
+        return self.stats.wins
+
+    @wins.setter
+    def wins(self, value):
+        self.stats.wins = value
+
+    def select_child(self):
+        """ UCB1 공식을 사용해 가장 유망한 자식 노드를 선택합니다. (Selection 단계) """
+        # UCB1: (자신의 승률) + c * sqrt(log(부모의 방문 횟수) / (자신의 방문 횟수))
+        # 승률이 높은 '익숙한 길'과, 아직 덜 가본 '새로운 길' 사이의 균형을 맞추는 역할
+        log_total_visits = math.log(self.visits)
+        
+        def ucb_score(child):
+            if child.visits == 0:
+                return float('inf') # 아직 방문 안 한 노드를 최우선으로 탐색
+            return (child.wins / child.visits) + 1.41 * math.sqrt(log_total_visits / child.visits)
+
+        return sorted(self.children, key=ucb_score, reverse=True)[0]
+
+    def expand(self):
+        """ 아직 시도 안 한 수 중 하나를 골라 자식 노드를 만들고 트리를 확장합니다. (Expansion 단계) """
+        move = self.unexplored_moves.pop()
+        next_state = self.game_state.make_move(move)
+        child_node = MCTS_Node(next_state, parent=self, move=move, table=self.table, perspective=self.perspective)
+        self.children.append(child_node)
+        return child_node
+
+    def update(self, result):
+        """ 시뮬레이션 결과를 자신과 모든 부모 노드들에게 거슬러 올라가며 전파합니다. (Backpropagation 단계) """
+        if self.table is not None:
+            # 전치 테이블로 통계를 공유하면 한 경로에 같은 통계가 두 번 나올 수 있으므로 한 번씩만 셈
+            for stats in path_stats(self):
+                stats.visits += 1
+                stats.wins += result
+            return
+        self.visits += 1
+        self.wins += result
+        if self.parent:
+            self.parent.update(result)
+
+    def add_virtual_loss(self):
+        """ 배치 평가를 기다리는 경로에 방문 횟수만 먼저 올려, 다음 리프 선택이 같은 경로로 몰리지 않게 합니다. """
+        if self.table is not None:
+            for stats in path_stats(self):
+                stats.visits += 1
+            return
+        self.visits += 1
+        if self.parent:
+            self.parent.add_virtual_loss()
+
+    def update_wins(self, result):
+        """ add_virtual_loss로 방문 수를 이미 올린 경로에 결과만 전파합니다. """
+        if self.table is not None:
+            for stats in path_stats(self):
+                stats.wins += result
+            return
+        self.wins += result
+        if self.parent:
+            self.parent.update_wins(result)
+
+# MCTS 알고리즘의 전체 흐름을 제어하는 메인 클래스
+class MCTS_AI:
+    def __init__(self, iterations=1000, leaf_batch=1, reuse_tree=False, time_budget_ms=None,
+                 transposition_table=None, stats=None, endgame_threshold=None, endgame_solver=None,
+                 rollout_engine=None, tree='nodes', max_nodes=None):
+        self.iterations = iterations # AI의 '생각하는 깊이'. 숫자가 클수록 똑똑하지만 느려짐.
+        # time_budget_ms를 주면 그 시간(ms) 안에서 반복 (iterations=None이면 시간 예산만 사용)
+        self.time_budget_ms = time_budget_ms
+        self.last_search_stats = None
+        # 한 개의 스크래치 상태를 재사용하는 플레이아웃 엔진
+        # (rollout.make_rollout_engine으로 만든 엔진을 넘기면 플레이아웃 정책/cutoff를 AI마다 고를 수 있음)
+        self.rollout_engine = rollout_engine if rollout_engine is not None else RolloutEngine()
+        # leaf_batch > 1이면 리프 여러 개를 가상 손실(virtual loss)로 모아 NumPy 배치 롤아웃 한 번으로 평가
+        # (배치가 batched_rollout.MIN_EFFICIENT_BATCH보다 작거나 플레이아웃 정책/cutoff나 종반 풀이기를 쓰면
+        #  모은 리프를 직렬 엔진으로 하나씩 평가. 작은 배치의 NumPy 롤아웃은 직렬보다 몇 배 느림)
+        self.leaf_batch = leaf_batch if BatchedRollout is not None and np is not None else 1
+        self.batched_rollout = BatchedRollout() if self.leaf_batch > 1 else None
+        # reuse_tree=True이면 이전 탐색 트리를 보관했다가 observe()로 실제 진행된 수만큼 루트를 옮겨 재사용
+        self.reuse_tree = reuse_tree
+        self._trees = {} # 플레이어 번호 -> 그 플레이어 관점으로 쌓인 트리의 루트
+        # transposition.TranspositionTable을 주면 서로 다른 경로로 도달한 같은 상태가 통계를 공유
+        self.transposition_table = transposition_table
+        # search_stats.SearchStats를 주면 단계별 시간, 트리 깊이, 플레이아웃 길이 등을 기록 (주지 않으면 계측 비용 없음)
+        self.stats = stats
+        # 리프의 남은 카드 총수가 endgame_threshold 미만이면 플레이아웃 대신 종반 풀이기의 정확한 승패를 사용
+        # (endgame.EndgameSolver를 넘기면 여러 AI가 풀린 국면 캐시를 공유. paranoid 0/1 값이라 플레이아웃 승률과 섞이면
+        #  상대 차례 리프를 비관적으로 봄 — endgame.py 머리말 참고, 작은 값 권장)
+        self.endgame_threshold = endgame_threshold
+        self.endgame_solver = None
+        if endgame_threshold is not None:
+            self.endgame_solver = endgame_solver if endgame_solver is not None else EndgameSolver()
+        # tree='flat'이면 노드 객체 대신 flat_tree.FlatTree(구조체 배열, 노드에 GameState 없음)로 같은 탐색을 수행
+        # (max_nodes: 노드 수 상한. 넘으면 방문이 적은 하위 트리를 재활용)
+        if tree not in ('nodes', 'flat'):
+            raise ValueError(f"Unknown tree: {tree}")
+        if tree == 'flat' and (self.leaf_batch > 1 or reuse_tree or transposition_table is not None
+                               or endgame_threshold is not None):
+            raise ValueError("tree='flat' does not support leaf_batch, reuse_tree, "
+                             "transposition_table or endgame_threshold")
+        self.tree = tree
+        self.max_nodes = max_nodes
+
+    def observe(self, move):
+        """ 실제로 둔 수(자신과 상대 모두)를 알려줍니다. 보관 중인 트리의 루트를 그 수의 자식으로 옮기고 나머지 가지는 버립니다. """
+        for player_index, root in list(self._trees.items()):
+            child = next((c for c in root.children if c.move == move), None)
+            if child is None:
+                del self._trees[player_index]
+            else:
+                child.parent = None
+                self._trees[player_index] = child
+
+    def reset(self):
+        """ 보관 중인 트리를 모두 버립니다. (새 게임 시작 시) """
+        self._trees.clear()
+
+    def _root_for(self, initial_state):
+        """ 재사용할 수 있는 트리가 있고 현재 상태와 일치하면 그 루트를, 아니면 새 루트를 돌려줍니다. """
+        root_node = self._trees.get(initial_state.turn_index) if self.reuse_tree else None
+        if root_node is None or root_node.game_state.signature() != initial_state.signature():
+            root_node = MCTS_Node(game_state=initial_state, table=self.transposition_table,
+                                  perspective=initial_state.turn_index)
+        if self.reuse_tree:
+            self._trees[initial_state.turn_index] = root_node
+        return root_node
+
+    def find_best_move(self, initial_state):
+        """ 주어진 상태에서 최선의 수를 찾습니다. """
+        move, _ = self.search(initial_state)
+        return move
+
+    def search(self, initial_state):
+        """ 최선의 수와 탐색 통계(반복 횟수, 걸린 시간 ms, 멈춘 이유)를 함께 반환합니다. """
+        if self.tree == 'flat':
+            return self._search_flat(initial_state)
+        budget = SearchBudget(self.iterations, self.time_budget_ms)
+        root_node = self._root_for(initial_state)
+        if self.stats is not None:
+            self.stats.begin_search()
+
+        # 가능한 수가 하나뿐이면 (예: 이미 패스해서 "pass"만 가능) 탐색하지 않음
+        move = budget.only_move(root_node)
+        if move is None:
+            if self.leaf_batch > 1:
+                self._run_batched(root_node, initial_state, budget)
+            else:
+                self._run(root_node, initial_state, budget)
+
+            # 모든 시뮬레이션 후, 가장 많이 방문한(가장 안정적이고 승률이 높다고 판단된) 수를 선택
+            best_child = sorted(root_node.children, key=lambda c: c.visits, reverse=True)[0]
+            move = best_child.move
+
+        self.last_search_stats = budget.stats()
+        if self.transposition_table is not None:
+            self.last_search_stats['transposition'] = self.transposition_table.stats()
+        if self.endgame_solver is not None:
+            self.last_search_stats['endgame'] = self.endgame_solver.stats()
+        if self.stats is not None:
+            root_children = [(c.move, c.visits, c.wins) for c in root_node.children]
+            self.last_search_stats['instrumentation'] = self.stats.end_search(
+                type(self).__name__, initial_state.turn_index, root_children, self.last_search_stats)
+        return move, self.last_search_stats
+
+    def _search_flat(self, initial_state):
+        """ tree='flat' 탐색. 이 AI의 예산·롤아웃 엔진을 그대로 쓰는 flat_tree.FlatMCTS_AI에 맡깁니다. """
+        if self.stats is not None:
+            self.stats.begin_search()
+        flat = FlatMCTS_AI(self.iterations, self.time_budget_ms, max_nodes=self.max_nodes,
+                           rollout_engine=self.rollout_engine)
+        move, self.last_search_stats = flat.search(initial_state)
+        if self.stats is not None:
+            self.last_search_stats['instrumentation'] = self.stats.end_search(
+                type(self).__name__, initial_state.turn_index, [], self.last_search_stats)
+        return move, self.last_search_stats
+
+    def _run(self, root_node, initial_state, budget):
+        # stats를 주면 단계별 시간과 트리/플레이아웃 통계를 기록 (주지 않으면 기록기 호출은 아무 일도 하지 않음)
+        recorder = self.stats.recorder() if self.stats is not None else NULL_RECORDER
+
+        # 예산(반복 횟수/시간)이 허락하는 동안 시뮬레이션 반복
+        while budget.keep_going(root_node):
+            recorder.start()
+            node = root_node
+            depth = 0
+            
+            # 1. Selection: 가장 유망한 경로를 따라 내려감
+            while not node.unexplored_moves and node.children:
+                node = node.select_child()
+                depth += 1
+            recorder.phase('selection')
+            
+            # 2. Expansion: 새로운 수를 시도하며 트리 확장
+            expanded = 0
+            if node.unexplored_moves:
+                node = node.expand()
+                depth += 1
+                expanded = 1
+            recorder.phase('expansion')
+            
+            # 3. Simulation: 확장된 노드부터 게임 끝까지 무작위로 플레이 (종반이면 정확히 풀이)
+            # 현재 MCTS AI의 승리 여부 (cutoff로 잘린 플레이아웃이면 정적 평가의 추정 승률)
+            result, plies, truncated, cutoff, solved = self._leaf_outcome(node.game_state, initial_state.turn_index)
+            recorder.phase('playout')
+            
+            # 4. Backpropagation: 시뮬레이션 결과를 트리에 업데이트
+            node.update(result)
+            recorder.phase('backprop')
+            recorder.iteration(depth, plies, truncated, expanded, cutoff, solved)
+            budget.done += 1
+
+        recorder.finish()
+
+    def _run_batched(self, root_node, initial_state, budget):
+        """ 리프를 leaf_batch개씩 모아 한 번의 배치 롤아웃으로 평가합니다. """
+        recorder = self.stats.recorder() if self.stats is not None else NULL_RECORDER
+        root_player_index = initial_state.turn_index
+        while budget.keep_going(root_node):
+            recorder.start()
+            leaves = []
+            paths = []      # 리프마다 (깊이, 새로 확장했는지)
+            for _ in range(budget.batch_size(self.leaf_batch)):
+                node = root_node
+                depth = 0
+                while not node.unexplored_moves and node.children:
+                    node = node.select_child()
+                    depth += 1
+                recorder.phase('selection')
+                expanded = 0
+                if node.unexplored_moves:
+                    node = node.expand()
+                    depth += 1
+                    expanded = 1
+                node.add_virtual_loss()
+                recorder.phase('expansion')
+                leaves.append(node)
+                paths.append((depth, expanded))
+
+            if self._plain_rollouts(len(leaves)):
+                winners = self.batched_rollout.simulate_states([leaf.game_state for leaf in leaves])
+                outcomes = [(1 if winner_index == root_player_index else 0, plies, winner_index < 0, False, False)
+                            for winner_index, plies in zip(winners, self.batched_rollout.last_plies.tolist())]
+            else:
+                # 작은 배치는 직렬 플레이아웃이 더 빠르고, 배치 롤아웃은 균등 무작위 정책만 지원하므로
+                # 정책/cutoff/종반 풀이기가 있으면 리프마다 평가
+                outcomes = [self._leaf_outcome(leaf.game_state, root_player_index) for leaf in leaves]
+            recorder.phase('playout')
+
+            for leaf, outcome in zip(leaves, outcomes):
+                leaf.update_wins(outcome[0])
+            recorder.phase('backprop')
+            for (depth, expanded), (_, plies, truncated, cutoff, solved) in zip(paths, outcomes):
+                recorder.iteration(depth, plies, truncated, expanded, cutoff, solved)
+            budget.done += len(leaves)
+        recorder.finish()
+
+    def _plain_rollouts(self, batch_size):
+        """ 리프 평가가 균등 무작위 플레이아웃뿐이고 배치가 충분히 커서 NumPy 배치 롤아웃이 더 빠른지 """
+        engine = self.rollout_engine
+        return (batch_size >= MIN_EFFICIENT_BATCH and engine.policy is None and engine.cutoff is None
+                and self.endgame_solver is None)
+
+    def _leaf_outcome(self, game_state, root_player_index):
+        """ 리프 하나의 root 플레이어 승리 값과 계측용 정보 (값, 플레이아웃 수, truncated, cutoff, 종반 풀이 여부).
+            종반이면 풀이기로 정확히 구하고, 아니면 플레이아웃으로 구합니다. """
+        if self.endgame_solver is not None and self._in_endgame(game_state):
+            return self._solve_endgame(game_state, root_player_index), 0, False, False, True
+        engine = self.rollout_engine
+        plies_before = engine.plies
+        cutoffs_before = engine.cutoffs
+        value = self._simulate(game_state, root_player_index)
+        # cutoff에서 정적 평가로 끝낸 것과 안전장치에 걸려 승자 없이 끝난 것을 구분
+        cutoff = engine.cutoffs != cutoffs_before
+        return value, engine.plies - plies_before, engine.last_winner < 0 and not cutoff, cutoff, False
+
+    def _in_endgame(self, game_state):
+        return sum(len(p.hand) for p in game_state.players) < self.endgame_threshold
+
+    def _solve_endgame(self, game_state, root_player_index):
+        """ 종반 풀이기로 root 플레이어의 승패(1/0)를 정확히 구합니다. (플레이아웃 엔진의 스크래치 상태를 빌려 씀) """
+        scratch = self.rollout_engine.scratch(game_state.num_players)
+        scratch.load(game_state)
+        return self.endgame_solver.value(scratch, root_player_index)
+
+    def _simulate(self, game_state, root_player_index):
+        """ 현재 상태에서 게임이 끝날 때까지 플레이하고 root 플레이어의 승리 값(0~1)을 반환합니다. (Simulation 단계) """
+        # 매 수마다 상태를 복제하지 않도록 전용 플레이아웃 엔진에서 한 판을 끝까지 진행
+        return self.rollout_engine.simulate_value(game_state, root_player_index)
@@ -1,18 +1,54 @@
 # mcts_pro.py
 import math
+import pickle
 import random
 import copy
+from concurrent.futures import ProcessPoolExecutor
+
+from compact_state import CompactState, encode_move, decode_move
+from endgame import EndgameSolver, averaged_value
+from ismcts import ISMCTS_AI
+from rollout import RolloutEngine
+from search_budget import SearchBudget
+from search_stats import NULL_RECORDER, SearchStats
+from transposition import NodeStats, path_stats
+try:
+    from batched_rollout import MIN_EFFICIENT_BATCH, BatchedRollout, np
+except ImportError:
+    MIN_EFFICIENT_BATCH, BatchedRollout, np = None, None, None
+
+# 전체 덱의 랭크별 장수 (1~12는 랭크만큼, 조커 2장)
+FULL_DECK_COUNTS = [r for r in range(1, 13)] + [2]
+LEAVES_PER_WORKER = 32  # leaf 병렬 모드에서 한 번에 워커 하나에게 보내는 리프 수
 
 class MCTS_Pro_Node:
-    def __init__(self, game_state, parent=None, move=None):
+    def __init__(self, game_state, parent=None, move=None, table=None, perspective=None):
         self.game_state = game_state
         self.parent = parent
         self.move = move
         self.children = []
-        self.wins = 0
-        self.visits = 0
+        self.table = table
+        self.perspective = perspective
+        self.stats = table.lookup(table.key(game_state, perspective)) if table is not None else NodeStats()
         self.unexplored_moves = self.game_state.get_possible_moves()
 
+    # 방문/승리 수는 stats 객체에 보관 (전치 테이블을 쓰면 같은 상태의 노드끼리 공유)
+    @property
+    def visits(self):
+        return self.stats.visits
+
+    @visits.setter
+    def visits(self, value):
+        self.stats.visits = value
+
+    @property
+    def wins(self):
+        return self.stats.wins
+
+    @wins.setter
+    def wins(self, value):
+        self.stats.wins = value
+
     def select_child(self):
         log_total_visits = math.log(self.visits)
         def ucb_score(child):
@@ -24,19 +60,122 @@ class MCTS_Pro_Node:
     def expand(self):
         move = self.unexplored_moves.pop()
         next_state = self.game_state.make_move(move)
-        child_node = MCTS_Pro_Node(next_state, self, move)
+        child_node = MCTS_Pro_Node(next_state, self, move, self.table, self.perspective)
         self.children.append(child_node)
         return child_node
 
     def update(self, result):
+        if self.table is not None:
+            # 전치 테이블로 통계를 공유하면 한 경로에 같은 통계가 두 번 나올 수 있으므로 한 번씩만 셈
+            for stats in path_stats(self):
+                stats.visits += 1
+                stats.wins += result
+            return
         self.visits += 1
         self.wins += result
         if self.parent:
             self.parent.update(result)
 
+    def add_virtual_loss(self):
+        if self.table is not None:
+            for stats in path_stats(self):
+                stats.visits += 1
+            return
+        self.visits += 1
+        if self.parent:
+            self.parent.add_virtual_loss()
+
+    def update_wins(self, result):
+        if self.table is not None:
+            for stats in path_stats(self):
+                stats.wins += result
+            return
+        self.wins += result
+        if self.parent:
+            self.parent.update_wins(result)
+
 class MCTS_Pro_AI:
-    def __init__(self, iterations=1000):
+    def __init__(self, iterations=1000, leaf_batch=1, workers=1, parallel_mode='root', seed=None,
+                 reuse_tree=False, time_budget_ms=None, transposition_table=None, stats=None,
+                 endgame_threshold=None, endgame_solver=None, endgame_samples=8, rollout_engine=None,
+                 belief=None, mode='determinized'):
         self.iterations = iterations
+        # time_budget_ms를 주면 그 시간 안에서 반복 (iterations=None이면 시간 예산만 사용)
+        self.time_budget_ms = time_budget_ms
+        self.last_search_stats = None
+        # rollout.make_rollout_engine으로 플레이아웃 정책과 cutoff/정적 평가를 AI마다 고를 수 있음
+        self.rollout_engine = rollout_engine if rollout_engine is not None else RolloutEngine()
+        # leaf_batch > 1: 결정화된 리프 여러 개를 가상 손실로 모아 NumPy 배치 롤아웃으로 평가
+        # (배치가 batched_rollout.MIN_EFFICIENT_BATCH보다 작거나 플레이아웃 정책/cutoff나 종반 풀이기를 쓰면
+        #  모은 리프를 직렬 엔진으로 하나씩 평가. 작은 배치의 NumPy 롤아웃은 직렬보다 몇 배 느림)
+        self.leaf_batch = leaf_batch if BatchedRollout is not None and np is not None else 1
+        self.batched_rollout = BatchedRollout() if self.leaf_batch > 1 else None
+
+        # workers > 1: 여러 프로세스로 탐색
+        #   'root' - 워커마다 독립 트리를 돌리고 루트 자식 통계를 합침
+        #   'leaf' - 하나의 트리에서 가상 손실로 고른 리프들의 롤아웃을 워커들이 나눠 수행
+        if parallel_mode not in ('root', 'leaf'):
+            raise ValueError(f"Unknown parallel_mode: {parallel_mode}")
+        self.workers = workers
+        self.parallel_mode = parallel_mode
+        self.seed = seed
+        self._search_calls = 0
+        self._pool = None
+        self._pool_key = None
+
+        # reuse_tree=True: 이전 탐색 트리를 observe()로 실제 진행된 수만큼 옮겨 다음 탐색에 재사용
+        # (root 병렬 모드는 워커마다 트리가 따로 있으므로 재사용하지 않음)
+        self.reuse_tree = reuse_tree
+        self._trees = {}
+        # transposition.TranspositionTable: 전치 상태끼리 노드 통계 공유
+        self.transposition_table = transposition_table
+        # search_stats.SearchStats: 단계별 시간과 트리/플레이아웃 통계 기록 (배치·leaf 병렬은 배치 단위, root 병렬은 워커 기록을 합침)
+        self.stats = stats
+        # 리프의 남은 카드 총수가 endgame_threshold 미만이면 플레이아웃 대신
+        # 결정화 endgame_samples개를 종반 풀이기로 정확히 풀어 평균한 승률을 사용
+        # (paranoid 값이라 플레이아웃 승률보다 극단적 — endgame.py 머리말 참고, 작은 값 권장)
+        self.endgame_threshold = endgame_threshold
+        self.endgame_samples = endgame_samples
+        self.endgame_solver = None
+        if endgame_threshold is not None:
+            self.endgame_solver = endgame_solver if endgame_solver is not None else EndgameSolver()
+        # belief.CardBelief: 낸 카드와 패스 제약을 반영해 결정화 (observe(move, state)로 게임 진행을 알려줌)
+        self.belief = belief
+
+        # mode='ismcts': 실제 상태로 트리를 만들고 리프에서 결정화하는 대신, 반복마다 루트에서 결정화하고
+        # 통계만 가진 정보집합 트리를 내려가는 단일 관찰자 ISMCTS (ismcts.ISMCTS_AI)로 탐색
+        if mode not in ('determinized', 'ismcts'):
+            raise ValueError(f"Unknown mode: {mode}")
+        if mode == 'ismcts' and (workers > 1 or self.leaf_batch > 1 or reuse_tree
+                                 or transposition_table is not None or endgame_threshold is not None):
+            raise ValueError("mode='ismcts' does not support workers, leaf_batch, reuse_tree, "
+                             "transposition_table or endgame_threshold")
+        self.mode = mode
+
+    def observe(self, move, state=None):
+        """ 실제로 둔 수(자신과 상대 모두)를 알려줍니다. 보관 중인 트리의 루트를 그 수의 자식으로 옮기고 나머지는 버립니다.
+            state(수를 두기 전 상태)를 함께 주면 belief도 갱신합니다. """
+        if self.belief is not None and state is not None:
+            self.belief.observe(state, move)
+        for player_index, root in list(self._trees.items()):
+            child = next((c for c in root.children if c.move == move), None)
+            if child is None:
+                del self._trees[player_index]
+            else:
+                child.parent = None
+                self._trees[player_index] = child
+
+    def reset(self):
+        self._trees.clear()
+
+    def _root_for(self, initial_state):
+        root_node = self._trees.get(initial_state.turn_index) if self.reuse_tree else None
+        if root_node is None or root_node.game_state.signature() != initial_state.signature():
+            root_node = MCTS_Pro_Node(initial_state, table=self.transposition_table,
+                                      perspective=initial_state.turn_index)
+        if self.reuse_tree:
+            self._trees[initial_state.turn_index] = root_node
+        return root_node
 
     def _create_determinized_state(self, current_state):
         determinized_state = current_state.clone()
@@ -73,36 +212,340 @@ class MCTS_Pro_AI:
                 player.sort_hand()
                 card_pool_index += hand_size
         
+        determinized_state.zobrist_hash = determinized_state.compute_zobrist_hash()
         return determinized_state
 
+    def _determinize_into(self, scratch, current_state, perspective=None):
+        """ _create_determinized_state와 같은 결정화를 GameState 복제 없이 CompactState 스크래치에 수행합니다.
+            perspective(손패를 아는 플레이어, 기본은 current_state의 차례)를 뺀 손패를 다시 나눕니다.
+            트리 리프에서는 탐색을 시작한 루트 플레이어를 넘깁니다 (리프의 차례인 플레이어는 상대일 수 있음).
+            belief가 있으면 낸 카드를 뺀 묶음에서 패스 제약을 반영해 나눕니다. """
+        scratch.load(current_state)
+        if self.belief is not None:
+            return self.belief.determinize_into(scratch, perspective)
+        root_player_index = scratch.turn if perspective is None else perspective
+
+        unknown_counts = FULL_DECK_COUNTS[:]
+        for r, count in enumerate(scratch.counts[root_player_index]):
+            unknown_counts[r] -= count
+        if scratch.table_count:
+            unknown_counts[scratch.table_rank - 1] -= scratch.table_count - scratch.table_jokers
+            unknown_counts[12] -= scratch.table_jokers
+
+        unknown_card_pool = [r + 1 for r in range(13) for _ in range(unknown_counts[r])]
+        random.shuffle(unknown_card_pool)
+
+        card_pool_index = 0
+        for i in range(scratch.num_players):
+            if i != root_player_index:
+                row = scratch.counts[i]
+                for r in range(13):
+                    row[r] = 0
+                hand_size = scratch.sizes[i]
+                for card in unknown_card_pool[card_pool_index : card_pool_index + hand_size]:
+                    row[card - 1] += 1
+                card_pool_index += hand_size
+        return scratch
+
     def find_best_move(self, initial_state):
-        root_node = MCTS_Pro_Node(initial_state)
+        move, _ = self.search(initial_state)
+        return move
+
+    def search(self, initial_state):
+        """ 최선의 수와 탐색 통계(반복 횟수, 걸린 시간 ms, 멈춘 이유)를 함께 반환합니다. """
+        budget = SearchBudget(self.iterations, self.time_budget_ms)
+        if self.stats is not None:
+            self.stats.begin_search()
+        if self.belief is not None and not self.belief.matches(initial_state):
+            self.belief.sync(initial_state)
+        if self.mode == 'ismcts':
+            return self._search_ismcts(initial_state)
+        root_node = None
+        if self.workers > 1 and self.parallel_mode == 'root':
+            move = budget.only_move(MCTS_Pro_Node(initial_state))
+            if move is None:
+                move = self._find_best_move_root_parallel(initial_state, budget)
+        else:
+            root_node = self._root_for(initial_state)
+            move = budget.only_move(root_node)
+            if move is None:
+                self._search(root_node, initial_state, budget)
+                move = self._best_move(root_node)
+        self.last_search_stats = budget.stats()
+        if self.transposition_table is not None:
+            self.last_search_stats['transposition'] = self.transposition_table.stats()
+        if self.endgame_solver is not None:
+            self.last_search_stats['endgame'] = self.endgame_solver.stats()
+        if self.stats is not None:
+            root_children = [(c.move, c.visits, c.wins) for c in root_node.children] if root_node else []
+            self.last_search_stats['instrumentation'] = self.stats.end_search(
+                type(self).__name__, initial_state.turn_index, root_children, self.last_search_stats)
+        return move, self.last_search_stats
+
+    def _search_ismcts(self, initial_state):
+        """ mode='ismcts' 탐색. 이 AI의 예산·롤아웃 엔진·belief를 그대로 씁니다. """
+        ismcts = ISMCTS_AI(self.iterations, self.time_budget_ms, max_plies=100,
+                           rollout_engine=self.rollout_engine, belief=self.belief)
+        move, self.last_search_stats = ismcts.search(initial_state)
+        if self.stats is not None:
+            self.last_search_stats['instrumentation'] = self.stats.end_search(
+                type(self).__name__, initial_state.turn_index, [], self.last_search_stats)
+        return move, self.last_search_stats
+
+    def _search(self, root_node, initial_state, budget):
+        if self.leaf_batch > 1 or self.workers > 1:
+            return self._search_batched(root_node, initial_state, budget)
+
+        # stats를 주지 않았으면 기록기 호출은 모두 아무 일도 하지 않음
+        recorder = self.stats.recorder() if self.stats is not None else NULL_RECORDER
+        engine = self.rollout_engine
         root_player_index = initial_state.turn_index
 
-        for _ in range(self.iterations):
+        while budget.keep_going(root_node):
+            recorder.start()
             node = root_node
-            
+            depth = 0
             while not node.unexplored_moves and node.children:
                 node = node.select_child()
-            
+                depth += 1
+            recorder.phase('selection')
+
+            expanded = 0
             if node.unexplored_moves:
                 node = node.expand()
+                depth += 1
+                expanded = 1
+            recorder.phase('expansion')
 
-            determinized_state = self._create_determinized_state(node.game_state)
+            # 결정화와 플레이아웃 모두 재사용 스크래치 상태 위에서 진행 (100수 안전장치 유지)
+            scratch = engine.scratch(initial_state.num_players)
+            self._determinize_into(scratch, node.game_state, root_player_index)
+            recorder.phase('determinization')
 
-            sim_state = determinized_state
-            safety_break = 0
-            while not sim_state.game_over and safety_break < 100:
-                moves = sim_state.get_possible_moves()
-                random_move = random.choice(moves)
-                sim_state = sim_state.make_move(random_move)
-                safety_break += 1
+            plies_before = engine.plies
+            cutoffs_before = engine.cutoffs
+            if self.endgame_solver is not None and scratch.total_cards() < self.endgame_threshold:
+                result = self._solve_endgame(scratch, node.game_state, root_player_index)
+                truncated = cutoff = False
+                solved = True
+            else:
+                result = engine.value(scratch, root_player_index, max_plies=100)
+                # cutoff에서 정적 평가로 끝낸 것과 100수 안전장치에 걸린 것을 구분
+                cutoff = engine.cutoffs != cutoffs_before
+                truncated = engine.last_winner < 0 and not cutoff
+                solved = False
+            recorder.phase('playout')
 
-            result = 1 if sim_state.winner_index == root_player_index else 0
             node.update(result)
+            recorder.phase('backprop')
+            recorder.iteration(depth, engine.plies - plies_before, truncated, expanded, cutoff, solved)
+            budget.done += 1
+
+        recorder.finish()
+        return root_node
+
+    def _solve_endgame(self, scratch, game_state, root_player_index):
+        """ 결정화마다 종반을 정확히 풀어 평균한 root 플레이어의 승률 (expectimax의 기댓값 근사) """
+        return averaged_value(self.endgame_solver,
+                              lambda: self._determinize_into(scratch, game_state, root_player_index),
+                              root_player_index, self.endgame_samples)
 
+    def _best_move(self, root_node):
         if not root_node.children:
             return "pass"
             
         best_child = sorted(root_node.children, key=lambda c: c.visits, reverse=True)[0]
         return best_child.move
+
+    def _search_batched(self, root_node, initial_state, budget):
+        """ 리프를 가상 손실로 모아 한꺼번에 평가합니다. (NumPy 배치 또는 워커 프로세스 leaf 병렬) """
+        recorder = self.stats.recorder() if self.stats is not None else NULL_RECORDER
+        root_player_index = initial_state.turn_index
+        batch_size = self.leaf_batch if self.leaf_batch > 1 else self.workers * LEAVES_PER_WORKER
+
+        while budget.keep_going(root_node):
+            recorder.start()
+            leaves = []
+            paths = []      # 리프마다 (깊이, 새로 확장했는지)
+            determinized = []
+            for _ in range(budget.batch_size(batch_size)):
+                node = root_node
+                depth = 0
+                while not node.unexplored_moves and node.children:
+                    node = node.select_child()
+                    depth += 1
+                recorder.phase('selection')
+                expanded = 0
+                if node.unexplored_moves:
+                    node = node.expand()
+                    depth += 1
+                    expanded = 1
+                node.add_virtual_loss()
+                recorder.phase('expansion')
+                leaves.append(node)
+                paths.append((depth, expanded))
+                if self.belief is not None:
+                    determinized.append(CompactState.from_game_state(node.game_state))
+                else:
+                    determinized.append(self._determinize_into(CompactState(initial_state.num_players),
+                                                               node.game_state, root_player_index))
+            if self.belief is not None:
+                self.belief.determinize_batch(determinized, [root_player_index] * len(determinized))
+            recorder.phase('determinization')
+
+            outcomes = self._evaluate_leaves(determinized, root_player_index)
+            recorder.phase('playout')
+            for leaf, outcome in zip(leaves, outcomes):
+                leaf.update_wins(outcome[0])
+            recorder.phase('backprop')
+            for (depth, expanded), (_, plies, truncated, cutoff, solved) in zip(paths, outcomes):
+                recorder.iteration(depth, plies, truncated, expanded, cutoff, solved)
+            budget.done += len(leaves)
+
+        recorder.finish()
+        return root_node
+
+    def _evaluate_leaves(self, determinized, root_player_index):
+        """ 결정화된 리프들의 (root 플레이어 승리 값, 플레이아웃 수, truncated, cutoff, 종반 풀이 여부) 목록 """
+        if self.workers <= 1:
+            if self._plain_rollouts(len(determinized)):
+                winners = self.batched_rollout.simulate_states(determinized, max_plies=100)
+                return [(1 if winner_index == root_player_index else 0, plies, winner_index < 0, False, False)
+                        for winner_index, plies in zip(winners, self.batched_rollout.last_plies.tolist())]
+            # 작은 배치는 직렬 플레이아웃이 더 빠르고, 배치 롤아웃은 균등 무작위 정책만 지원하므로
+            # 정책/cutoff/종반 풀이기가 있으면 리프마다 평가
+            return [self._leaf_outcome(scratch, root_player_index) for scratch in determinized]
+
+        # leaf 병렬: 리프들을 워커 수만큼 나눠 각 프로세스에서 이 AI와 같은 방식으로 평가
+        chunk = -(-len(determinized) // self.workers)
+        chunks = [determinized[i:i + chunk] for i in range(0, len(determinized), chunk)]
+        seeds = self._next_worker_seeds(len(chunks))
+        values = []
+        for part in self._get_pool().map(_leaf_worker, chunks, [root_player_index] * len(chunks), seeds):
+            values.extend(part)
+        return values
+
+    def _plain_rollouts(self, batch_size):
+        """ 리프 평가가 균등 무작위 플레이아웃뿐이고 배치가 충분히 커서 NumPy 배치 롤아웃이 더 빠른지 """
+        engine = self.rollout_engine
+        return (batch_size >= MIN_EFFICIENT_BATCH and engine.policy is None and engine.cutoff is None
+                and self.endgame_solver is None)
+
+    def _leaf_outcome(self, scratch, root_player_index):
+        """ 결정화된 리프 하나(CompactState, 제자리에서 진행됨)의 root 플레이어 승리 값과 계측용 정보
+            (값, 플레이아웃 수, truncated, cutoff, 종반 풀이 여부).
+            남은 카드가 endgame_threshold 미만이면 종반 풀이기로, 아니면 롤아웃 엔진(정책/cutoff 포함)으로 구합니다. """
+        if self.endgame_solver is not None and scratch.total_cards() < self.endgame_threshold:
+            return self.endgame_solver.value(scratch, root_player_index), 0, False, False, True
+        engine = self.rollout_engine
+        plies_before = engine.plies
+        cutoffs_before = engine.cutoffs
+        value = engine.value(scratch, root_player_index, max_plies=100)
+        cutoff = engine.cutoffs != cutoffs_before
+        return value, engine.plies - plies_before, engine.last_winner < 0 and not cutoff, cutoff, False
+
+    def _find_best_move_root_parallel(self, initial_state, budget):
+        """ root 병렬: 워커마다 독립된 트리를 탐색하고 루트 자식들의 방문/승리 수를 합칩니다. """
+        per_worker = -(-self.iterations // self.workers) if self.iterations is not None else None
+        seeds = self._next_worker_seeds(self.workers)
+        merged = {}
+        stop_reasons = []
+        instrument = self.stats is not None
+        for stats, done, stop_reason, recorded in self._get_pool().map(_root_worker, [initial_state] * self.workers,
+                                                                       [per_worker] * self.workers,
+                                                                       [self.time_budget_ms] * self.workers,
+                                                                       [self.belief] * self.workers, seeds,
+                                                                       [instrument] * self.workers):
+            budget.done += done
+            stop_reasons.append(stop_reason)
+            if recorded is not None:
+                # 워커 트리의 계측 기록을 이 탐색에 합침 (단계별 시간은 워커 시간의 합)
+                self.stats.merge_search(recorded)
+            for code, visits, wins in stats:
+                total = merged.setdefault(code, [0, 0])
+                total[0] += visits
+                total[1] += wins
+
+        budget.stop_reason = max(set(stop_reasons), key=stop_reasons.count)
+        if not merged:
+            return "pass"
+        best_code = max(merged, key=lambda code: merged[code][0])
+        return decode_move(best_code)
+
+    def _next_worker_seeds(self, count):
+        """ 워커별 난수 시드. seed가 주어지면 호출 순서까지 고정되어 결과를 재현할 수 있습니다. """
+        self._search_calls += 1
+        if self.seed is None:
+            return [random.getrandbits(63) for _ in range(count)]
+        return [(self.seed * 1_000_003 + self._search_calls) * 64 + w for w in range(count)]
+
+    def _worker_config(self):
+        """ 워커 프로세스에서 이 AI와 같은 알고리즘을 돌리기 위한 설정 (프로세스 풀 initializer 인자).
+            롤아웃 엔진·종반 풀이기·전치 테이블 객체는 난수 상태와 캐시 내용까지 복사되지 않도록 설정만 넘깁니다.
+            belief는 수마다 바뀌므로 root 병렬 탐색을 부를 때마다 따로 보냅니다. """
+        engine = self.rollout_engine
+        solver = self.endgame_solver
+        table = self.transposition_table
+        return (self.leaf_batch, (engine.policy, engine.cutoff, engine.evaluator),
+                self.endgame_threshold, self.endgame_samples,
+                None if solver is None else (type(solver), solver.max_entries),
+                None if table is None else (type(table), table.max_entries))
+
+    def _get_pool(self):
+        # 설정이 바뀌었으면 (예: rollout_engine 교체) 워커의 AI도 새로 만들어야 하므로 풀을 다시 띄움
+        config = self._worker_config()
+        key = pickle.dumps(config)
+        if self._pool is not None and self._pool_key != key:
+            self.close()
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(config,))
+            self._pool_key = key
+        return self._pool
+
+    def close(self):
+        """ 병렬 탐색용 워커 프로세스를 종료합니다. """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+# ==============================================================================
+# 병렬 탐색 워커 (프로세스 풀에서 실행되므로 모듈 최상위 함수)
+# ==============================================================================
+_worker_ai = None
+
+def _init_worker(config):
+    """ 워커 프로세스 시작 시 부모 AI의 설정(MCTS_Pro_AI._worker_config)으로 워커용 AI를 만듭니다.
+        롤아웃 엔진은 워커의 random을 쓰므로 호출마다 받는 시드로 재현됩니다. """
+    global _worker_ai
+    leaf_batch, (policy, cutoff, evaluator), endgame_threshold, endgame_samples, solver, table = config
+    _worker_ai = MCTS_Pro_AI(
+        leaf_batch=leaf_batch,
+        rollout_engine=RolloutEngine(policy=policy, cutoff=cutoff, evaluator=evaluator),
+        endgame_threshold=endgame_threshold, endgame_samples=endgame_samples,
+        endgame_solver=None if solver is None else solver[0](solver[1]),
+        transposition_table=None if table is None else table[0](table[1]))
+
+def _root_worker(initial_state, iterations, time_budget_ms, belief, seed, instrument=False):
+    random.seed(seed)
+    ai = _worker_ai
+    # 부모가 계측 중이면 워커 탐색도 기록해 돌려보냄
+    ai.stats = SearchStats() if instrument else None
+    if ai.stats is not None:
+        ai.stats.begin_search()
+    # 워커마다 다른 결정화를 뽑도록 부모의 belief 사본을 워커 시드로 다시 시드
+    if belief is not None:
+        belief.reseed(seed)
+    ai.belief = belief
+    if ai.batched_rollout is not None:
+        ai.batched_rollout.rng = np.random.default_rng(seed)
+    budget = SearchBudget(iterations, time_budget_ms)
+    root_node = ai._search(MCTS_Pro_Node(initial_state, table=ai.transposition_table,
+                                         perspective=initial_state.turn_index), initial_state, budget)
+    stats = [(encode_move(child.move), child.visits, child.wins) for child in root_node.children]
+    recorded = ai.stats.take_search() if ai.stats is not None else None
+    return stats, budget.done, budget.stop_reason, recorded
+
+def _leaf_worker(states, root_player_index, seed):
+    random.seed(seed)
+    return [_worker_ai._leaf_outcome(state, root_player_index) for state in states]
@@ -0,0 +1,151 @@
+# mcts_puct.py
+# MCTS_Pro_AI의 PUCT 변형. 노드를 펼칠 때 정책 신경망(policy_net.PolicyValueNet)의 수 확률을 사전 확률로 붙이고,
+# UCB1 대신 PUCT 점수 Q + c * P * sqrt(N) / (1 + n)로 자식을 고릅니다.
+# 리프는 leaf_batch개씩 가상 손실로 모아 신경망을 한 번만 호출해 평가하고,
+# use_value=True이면 플레이아웃 대신 가치 머리의 승률로 리프를 평가합니다.
+# 각 노드의 승리 수는 그 노드로 오는 수를 둔 플레이어 관점으로 셉니다.
+
+import math
+
+from mcts_pro import MCTS_Pro_AI
+from policy_net import PolicyValueNet, game_state_features, move_to_slot
+from search_budget import SearchBudget
+
+
+class PUCT_Node:
+    __slots__ = ('game_state', 'parent', 'move', 'prior', 'player_just_moved', 'children', 'visits', 'wins')
+
+    def __init__(self, game_state, parent=None, move=None, prior=1.0, player_just_moved=None):
+        self.game_state = game_state        # 처음 방문할 때 부모 상태에서 만듦 (펼치기만 한 자식은 None)
+        self.parent = parent
+        self.move = move
+        self.prior = prior
+        self.player_just_moved = player_just_moved
+        self.children = []                  # 비어 있으면 아직 펼치지 않은 리프 (또는 끝난 게임)
+        self.visits = 0
+        self.wins = 0.0
+
+    def expand(self, moves, priors):
+        player = self.game_state.turn_index
+        self.children = [PUCT_Node(None, self, move, float(prior), player) for move, prior in zip(moves, priors)]
+
+    def select_child(self, c_puct, first_play_value):
+        sqrt_visits = math.sqrt(self.visits)
+        best = None
+        best_score = -1.0
+        for child in self.children:
+            q = child.wins / child.visits if child.visits else first_play_value
+            score = q + c_puct * child.prior * sqrt_visits / (1 + child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        if best.game_state is None:
+            best.game_state = self.game_state.make_move(best.move)
+        return best
+
+
+class MCTS_PUCT_AI(MCTS_Pro_AI):
+    def __init__(self, net=None, iterations=200, time_budget_ms=None, c_puct=0.5, leaf_batch=8,
+                 use_value=False, rollout_engine=None, prior_mix=0.25, belief=None):
+        # belief(belief.CardBelief)를 주면 플레이아웃 리프의 결정화에 MCTS_Pro_AI와 똑같이 씀
+        super().__init__(iterations=iterations, time_budget_ms=time_budget_ms, rollout_engine=rollout_engine,
+                         belief=belief)
+        # net이 None이면 모든 수에 같은 사전 확률을 주고 플레이아웃으로만 평가 (신경망 없는 PUCT)
+        self.net = PolicyValueNet.load(net) if isinstance(net, str) else net
+        self.c_puct = c_puct
+        self.puct_leaf_batch = leaf_batch
+        self.use_value = use_value and self.net is not None
+        # 사전 확률에 균등 분포를 섞는 비율 (작은 기록으로 학습한 신경망이 거의 0으로 본 수도 탐색하게)
+        self.prior_mix = prior_mix
+
+    def search(self, initial_state):
+        """ 최선의 수와 탐색 통계(반복 횟수, 걸린 시간 ms, 멈춘 이유, 신경망 호출 수)를 함께 반환합니다. """
+        budget = SearchBudget(self.iterations, self.time_budget_ms)
+        if self.belief is not None and not self.belief.matches(initial_state):
+            self.belief.sync(initial_state)
+        moves = initial_state.get_possible_moves()
+        self.net_calls = 0
+        if len(moves) == 1:
+            budget.stop_reason = 'single_move'
+            move = moves[0]
+        else:
+            root_node = PUCT_Node(initial_state)
+            self._search_puct(root_node, initial_state, budget)
+            move = max(root_node.children, key=lambda c: c.visits).move
+        self.last_search_stats = budget.stats()
+        self.last_search_stats['net_calls'] = self.net_calls
+        return move, self.last_search_stats
+
+    def _search_puct(self, root_node, initial_state, budget):
+        first_play_value = 1.0 / initial_state.num_players
+        # 루트를 먼저 펼쳐 둠 (그렇지 않으면 첫 배치의 리프가 모두 펼치지 않은 루트 하나로 모임)
+        self._expand([root_node])
+        while budget.keep_going(root_node):
+            leaves = []
+            for _ in range(budget.batch_size(self.puct_leaf_batch)):
+                node = root_node
+                while node.children:
+                    node = node.select_child(self.c_puct, first_play_value)
+                # 가상 손실: 평가 전에 방문 수만 먼저 올려 같은 배치의 다음 선택이 다른 경로로 가게 함
+                path = node
+                while path is not None:
+                    path.visits += 1
+                    path = path.parent
+                leaves.append(node)
+
+            for node, values in zip(leaves, self._evaluate(leaves, initial_state.turn_index)):
+                while node.parent is not None:
+                    node.wins += values(node.player_just_moved)
+                    node = node.parent
+            budget.done += len(leaves)
+
+    def _expand(self, leaves):
+        """ 아직 펼치지 않은 리프들에 사전 확률을 붙여 펼치고, 신경망 가치 머리의 값을 {id(리프): 승률}로 돌려줍니다.
+            신경망은 한 번만 부릅니다. """
+        pending = []
+        seen = set()
+        for leaf in leaves:
+            if not leaf.game_state.game_over and not leaf.children and id(leaf) not in seen:
+                seen.add(id(leaf))
+                pending.append(leaf)
+
+        net_values = {}
+        if pending:
+            if self.net is not None:
+                logits, values = self.net.predict(game_state_features([leaf.game_state for leaf in pending]))
+                self.net_calls += 1
+            for i, leaf in enumerate(pending):
+                moves = leaf.game_state.get_possible_moves()
+                if self.net is not None:
+                    priors = PolicyValueNet.move_priors(logits[i], [move_to_slot(m) for m in moves])
+                    priors = (1.0 - self.prior_mix) * priors + self.prior_mix / len(moves)
+                    net_values[id(leaf)] = float(values[i])
+                else:
+                    priors = [1.0 / len(moves)] * len(moves)
+                leaf.expand(moves, priors)
+        return net_values
+
+    def _evaluate(self, leaves, root_player_index):
+        """ 리프들을 펼치고 각 리프의 '플레이어 번호 -> 승리 값' 함수를 돌려줍니다. 신경망은 배치당 한 번만 부릅니다.
+            플레이아웃 리프는 root 플레이어 관점으로 결정화합니다. """
+        net_values = self._expand(leaves)
+        results = []
+        for leaf in leaves:
+            state = leaf.game_state
+            if state.game_over:
+                winner = state.winner_index
+            elif self.use_value:
+                results.append(_shared_value(state.turn_index, net_values.get(id(leaf), 0.0), state.num_players))
+                continue
+            else:
+                # MCTS_Pro_AI와 같은 결정화 플레이아웃 (100수 안전장치)
+                scratch = self.rollout_engine.scratch(state.num_players)
+                self._determinize_into(scratch, state, root_player_index)
+                winner = self.rollout_engine.run(scratch, max_plies=100)
+            results.append(lambda player, winner=winner: 1.0 if player == winner else 0.0)
+        return results
+
+
+def _shared_value(to_move, value, num_players):
+    """ 가치 머리는 차례인 플레이어의 승률만 주므로, 나머지 승률은 다른 플레이어들이 똑같이 나눈다고 봅니다. """
+    others = (1.0 - value) / (num_players - 1)
+    return lambda player: value if player == to_move else others
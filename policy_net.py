@@ -0,0 +1,245 @@
+# policy_net.py
+# 기록된 자가 대국 데이터(state_vector, action, outcome_win)로 학습하는 작은 NumPy 정책/가치 신경망.
+# 은닉층 하나짜리 MLP가 같은 특징에서 수 확률(정책 머리)과 차례인 플레이어의 승률(가치 머리)을 함께 냅니다.
+# 입력은 columnar_log와 같은 MAX_PLAYERS 기준 고정 폭 상태 벡터이고, 수는 batched_rollout.move_slot 번호를 씁니다.
+# 정책 손실의 softmax는 추론(move_priors)과 같이 그 상태의 합법 수로만 계산합니다. 전체 칸으로 학습하면
+# 패스밖에 없는 턴(기록의 큰 몫)이 모든 상태에서 패스 로짓을 끌어올려 사전 확률이 패스로 쏠립니다.
+#
+# 예) python analyze_strategy.py generate --out-dir gen --players 4 --games 300 --iterations 500
+#     python columnar_log.py convert gen/4p_*.jsonl log.cols
+#     python policy_net.py train log.cols policy_net.npz --epochs 30
+#     python arena.py puct:200:net=policy_net.npz pro:1000 --players 4
+
+import argparse
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from batched_rollout import NUM_MOVE_SLOTS, MAX_COUNT, BatchedRollout, move_slot
+from columnar_log import HAND_SLOTS, OTHER_SLOTS, STATE_WIDTH, ColumnarLogReader
+from feature_encoder import encode_states
+
+INPUT_WIDTH = STATE_WIDTH + 1   # 고정 폭 상태 벡터 + 플레이어 수
+# 상태 벡터 칸별 정규화 값: 내 손패, 다른 플레이어 장수, 테이블 rank/count, 패스 수, 버려진 카드
+_SCALE = [12.0] * HAND_SLOTS + [20.0] * OTHER_SLOTS + [13.0, float(MAX_COUNT), 7.0] + [12.0] * 13
+
+
+def move_to_slot(move):
+    """ "pass" 또는 {'rank', 'count'}를 정책 머리의 출력 번호로 바꿉니다. """
+    if move == "pass":
+        return 0
+    return move_slot(move['rank'], move['count'])
+
+
+def pad_state_vectors(vectors, num_players):
+    """ state_to_vector 형식(길이 28 + 플레이어 수) 배열을 MAX_PLAYERS 기준 고정 폭으로 늘립니다. """
+    others = num_players - 1
+    padded = np.zeros((len(vectors), STATE_WIDTH), dtype=vectors.dtype)
+    padded[:, :HAND_SLOTS + others] = vectors[:, :HAND_SLOTS + others]
+    padded[:, HAND_SLOTS + OTHER_SLOTS:] = vectors[:, HAND_SLOTS + others:]
+    return padded
+
+
+def make_features(states, num_players):
+    """ 고정 폭 상태 배열 (N, STATE_WIDTH)와 플레이어 수(정수 또는 (N,) 배열)로 신경망 입력을 만듭니다. """
+    features = np.empty((len(states), INPUT_WIDTH), dtype=np.float32)
+    features[:, :STATE_WIDTH] = states / np.asarray(_SCALE, dtype=np.float32)
+    features[:, STATE_WIDTH] = np.asarray(num_players, dtype=np.float32) / 8.0
+    return features
+
+
+def game_state_features(game_states):
+    """ 플레이어 수가 같은 GameState 목록을 한 번에 신경망 입력으로 바꿉니다. """
+    num_players = game_states[0].num_players
+    return make_features(pad_state_vectors(encode_states(game_states), num_players), num_players)
+
+
+class PolicyValueNet:
+    def __init__(self, hidden=64, seed=0):
+        if np is None:
+            raise ImportError("PolicyValueNet requires numpy.")
+        rng = np.random.default_rng(seed)
+        self.hidden = hidden
+        self.params = {
+            'w1': (rng.standard_normal((INPUT_WIDTH, hidden)) * np.sqrt(2.0 / INPUT_WIDTH)).astype(np.float32),
+            'b1': np.zeros(hidden, dtype=np.float32),
+            'wp': (rng.standard_normal((hidden, NUM_MOVE_SLOTS)) * np.sqrt(1.0 / hidden)).astype(np.float32),
+            'bp': np.zeros(NUM_MOVE_SLOTS, dtype=np.float32),
+            'wv': (rng.standard_normal((hidden, 1)) * np.sqrt(1.0 / hidden)).astype(np.float32),
+            'bv': np.zeros(1, dtype=np.float32),
+        }
+        self._adam = None
+        self.steps = 0
+
+    # --------------------------------------------------------------------------
+    # 추론 (배치)
+    # --------------------------------------------------------------------------
+    def _forward(self, x):
+        p = self.params
+        h = np.maximum(x @ p['w1'] + p['b1'], 0.0)
+        logits = h @ p['wp'] + p['bp']
+        value = 1.0 / (1.0 + np.exp(-(h @ p['wv'] + p['bv'])[:, 0]))
+        return h, logits, value
+
+    def predict(self, features):
+        """ (N, INPUT_WIDTH) 입력에 대해 (정책 로짓 (N, NUM_MOVE_SLOTS), 승률 (N,))을 한 번의 행렬 곱으로 계산합니다. """
+        _, logits, value = self._forward(features)
+        return logits, value
+
+    @staticmethod
+    def move_priors(logits, slots):
+        """ 한 상태의 로짓에서 가능한 수(slots)만 골라 softmax한 사전 확률 """
+        legal = logits[slots]
+        legal = np.exp(legal - legal.max())
+        return legal / legal.sum()
+
+    # --------------------------------------------------------------------------
+    # 학습 (Adam, 정책은 합법 수 안에서의 교차 엔트로피, 가치는 시그모이드 출력의 이진 교차 엔트로피)
+    # --------------------------------------------------------------------------
+    def train_batch(self, features, action_slots, outcomes, lr=1e-3, value_weight=1.0, legal=None):
+        """ 미니배치 하나로 한 번 갱신하고 (정책 손실, 가치 손실)을 반환합니다.
+            legal((N, NUM_MOVE_SLOTS) bool)을 주면 그 칸만으로 softmax합니다. """
+        p = self.params
+        n = len(features)
+        h, logits, value = self._forward(features)
+
+        if legal is not None:
+            logits = np.where(legal, logits, -np.inf)
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        rows = np.arange(n)
+        policy_loss = float(-np.log(probs[rows, action_slots] + 1e-12).mean())
+        eps = 1e-7
+        value_loss = float(-(outcomes * np.log(value + eps) + (1 - outcomes) * np.log(1 - value + eps)).mean())
+
+        d_logits = probs
+        d_logits[rows, action_slots] -= 1.0
+        d_logits /= n
+        d_value = (value - outcomes)[:, None] * (value_weight / n)
+        d_h = d_logits @ p['wp'].T + d_value @ p['wv'].T
+        d_h *= h > 0
+        grads = {
+            'w1': features.T @ d_h, 'b1': d_h.sum(axis=0),
+            'wp': h.T @ d_logits, 'bp': d_logits.sum(axis=0),
+            'wv': h.T @ d_value, 'bv': d_value.sum(axis=0),
+        }
+        self._adam_step(grads, lr)
+        return policy_loss, value_loss
+
+    def _adam_step(self, grads, lr, beta1=0.9, beta2=0.999, eps=1e-8):
+        if self._adam is None:
+            self._adam = {k: (np.zeros_like(v), np.zeros_like(v)) for k, v in self.params.items()}
+        self.steps += 1
+        correction = np.sqrt(1 - beta2 ** self.steps) / (1 - beta1 ** self.steps)
+        for name, grad in grads.items():
+            m, v = self._adam[name]
+            m *= beta1
+            m += (1 - beta1) * grad
+            v *= beta2
+            v += (1 - beta2) * grad * grad
+            self.params[name] -= (lr * correction * m / (np.sqrt(v) + eps)).astype(np.float32)
+
+    # --------------------------------------------------------------------------
+    # 저장/불러오기
+    # --------------------------------------------------------------------------
+    def save(self, path):
+        np.savez(path, hidden=self.hidden, **self.params)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        net = cls(hidden=int(data['hidden']))
+        for name in net.params:
+            net.params[name] = data[name].astype(np.float32)
+        return net
+
+
+_RULES = None
+
+
+def legal_slots(states):
+    """ 고정 폭 상태 배열 (N, STATE_WIDTH)에서 차례인 플레이어의 합법 수 마스크 (N, NUM_MOVE_SLOTS)를 만듭니다.
+        상태 벡터에는 '이번 라운드에 이미 패스함'이 없으므로 아직 패스하지 않은 것으로 봅니다. """
+    global _RULES
+    if _RULES is None:
+        _RULES = BatchedRollout()
+    table = HAND_SLOTS + OTHER_SLOTS
+    return _RULES.legal_mask(states[:, :HAND_SLOTS], np.zeros(len(states), dtype=bool),
+                             states[:, table].astype(np.int64), states[:, table + 1].astype(np.int64))
+
+
+def batch_targets(batch):
+    """ ColumnarLogReader 배치에서 (입력, 수 번호, 결과, 합법 수 마스크)를 만듭니다. """
+    features = make_features(batch['state'], batch['num_players'])
+    ranks = batch['action_rank'].astype(np.intp)
+    counts = batch['action_count'].astype(np.intp)
+    slots = np.where(ranks == 0, 0, 1 + (ranks - 1) * MAX_COUNT + (counts - 1))
+    legal = legal_slots(batch['state'])
+    # 이미 패스한 플레이어의 패스처럼 벡터로 알 수 없는 경우에도 기록된 수는 항상 후보에 넣음
+    legal[np.arange(len(slots)), slots] = True
+    return features, slots, batch['outcome'].astype(np.float32), legal
+
+
+def train(net, log_path, epochs=1, batch_size=512, lr=1e-3, value_weight=1.0, holdout=0.05, seed=0):
+    """ 열 형식 로그(columnar_log)로 net을 학습합니다. 마지막 holdout 비율의 행은 검증용으로 남깁니다.
+        정수 열만 메모리에 올리고 신경망 입력은 미니배치마다 만듭니다. """
+    reader = ColumnarLogReader(log_path)
+    columns = ['state', 'num_players', 'action_rank', 'action_count', 'outcome']
+    chunks = [reader.chunk(i, columns) for i in range(len(reader.chunk_rows))]
+    data = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in columns}
+    total = len(data['outcome'])
+    split = int(total * (1 - holdout))
+    rng = np.random.default_rng(seed)
+
+    history = []
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        order = rng.permutation(split)
+        losses = []
+        for i in range(0, split, batch_size):
+            idx = order[i:i + batch_size]
+            features, slots, outcomes, legal = batch_targets({name: column[idx] for name, column in data.items()})
+            losses.append(net.train_batch(features, slots, outcomes, lr, value_weight, legal))
+        policy_loss, value_loss = np.mean(losses, axis=0)
+        record = {'epoch': epoch + 1, 'policy_loss': float(policy_loss), 'value_loss': float(value_loss),
+                  'seconds': time.perf_counter() - start}
+        if split < total:
+            features, slots, outcomes, legal = batch_targets({name: column[split:] for name, column in data.items()})
+            logits, value = net.predict(features)
+            # 탐색과 같은 기준: 합법 수 중에서 가장 높은 수, 그리고 수가 하나뿐인 턴을 뺀 정확도
+            hits = np.where(legal, logits, -np.inf).argmax(axis=1) == slots
+            choice = legal.sum(axis=1) > 1
+            record['holdout_move_accuracy'] = float(hits.mean())
+            record['holdout_choice_accuracy'] = float(hits[choice].mean()) if choice.any() else None
+            record['holdout_value_mse'] = float(((value - outcomes) ** 2).mean())
+        history.append(record)
+        print(record)
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the NumPy policy/value network on a columnar log.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    train_parser = sub.add_parser('train')
+    train_parser.add_argument('log')
+    train_parser.add_argument('out')
+    train_parser.add_argument('--epochs', type=int, default=5)
+    train_parser.add_argument('--batch-size', type=int, default=512)
+    train_parser.add_argument('--lr', type=float, default=1e-3)
+    train_parser.add_argument('--hidden', type=int, default=64)
+    train_parser.add_argument('--value-weight', type=float, default=1.0)
+    train_parser.add_argument('--init', help="continue training from a saved model")
+    args = parser.parse_args()
+
+    net = PolicyValueNet.load(args.init) if args.init else PolicyValueNet(hidden=args.hidden)
+    train(net, args.log, args.epochs, args.batch_size, args.lr, args.value_weight)
+    net.save(args.out)
+    print(f"Saved model to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
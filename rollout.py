@@ -0,0 +1,255 @@
+# rollout.py
+# MCTS 시뮬레이션(플레이아웃) 전용 엔진.
+# 하나의 CompactState 스크래치 상태와 미리 할당한 수 버퍼 위에서 게임 한 판을 끝까지 진행하므로
+# 매 수마다 GameState 복제나 수 딕셔너리를 만들지 않습니다.
+
+# policy를 주면 균등 무작위 대신 그 정책으로 수를 고르고, cutoff를 주면 그 수만큼만 진행한 뒤
+# evaluator(정적 평가 함수)로 승률을 추정합니다. (value()/simulate_value() 사용 시)
+
+import math
+import random
+import time
+
+from compact_state import CompactState, MAX_MOVES, PASS, JOKER
+
+
+class RolloutEngine:
+    def __init__(self, rng=None, policy=None, cutoff=None, evaluator=None):
+        self._random = (rng or random).random
+        self._buf = [0] * MAX_MOVES
+        self._scratch = None
+        self.policy = policy            # None이면 가능한 수 중 균등 무작위
+        self.cutoff = cutoff            # 이 수만큼 진행해도 끝나지 않으면 evaluator로 점수를 냄
+        if cutoff is not None and evaluator is None:
+            evaluator = StaticEvaluator()
+        self.evaluator = evaluator
+        self.last_winner = -1           # 직전 플레이아웃의 승자 (-1이면 끝까지 가지 않음)
+
+        # 처리량 측정용 누적 통계
+        self.rollouts = 0
+        self.plies = 0
+        self.elapsed = 0.0
+        self.cutoffs = 0                # cutoff에 걸려 정적 평가로 끝낸 플레이아웃 수
+
+    def scratch(self, num_players):
+        """ 인원수에 맞는 재사용 스크래치 상태를 돌려줍니다. """
+        if self._scratch is None or self._scratch.num_players != num_players:
+            self._scratch = CompactState(num_players)
+        return self._scratch
+
+    def simulate(self, state, max_plies=None):
+        """ state(GameState 또는 CompactState)에서 무작위로 끝까지 플레이하고 승자를 반환합니다.
+            max_plies 안에 끝나지 않으면 -1을 반환합니다. 원본 state는 바뀌지 않습니다. """
+        scratch = self.scratch(state.num_players)
+        if isinstance(state, CompactState):
+            scratch.copy_from(state)
+        else:
+            scratch.load(state)
+        return self.run(scratch, max_plies)
+
+    def run(self, scratch, max_plies=None):
+        """ scratch 상태를 제자리에서 끝까지 진행합니다. (scratch는 결과 상태로 바뀜) """
+        start = time.perf_counter()
+        buf = self._buf
+        rand = self._random
+        legal_moves = scratch.legal_moves
+        play = scratch.play
+        limit = -1 if max_plies is None else max_plies
+
+        policy = self.policy
+        plies = 0
+        if policy is None:
+            while scratch.winner < 0 and plies != limit:
+                n = legal_moves(buf)
+                play(buf[int(rand() * n)])
+                plies += 1
+        else:
+            while scratch.winner < 0 and plies != limit:
+                n = legal_moves(buf)
+                play(policy(scratch, buf, n, rand))
+                plies += 1
+
+        self.rollouts += 1
+        self.plies += plies
+        self.elapsed += time.perf_counter() - start
+        self.last_winner = scratch.winner
+        return scratch.winner
+
+    def value(self, scratch, player, max_plies=None):
+        """ scratch를 제자리에서 진행해 player의 승리 값(0~1)을 반환합니다.
+            cutoff 안에 끝나지 않으면 evaluator의 추정 승률을, max_plies 안전장치에 걸리면 0을 반환합니다. """
+        cutoff = self.cutoff
+        if cutoff is not None and (max_plies is None or cutoff < max_plies):
+            winner = self.run(scratch, cutoff)
+            if winner < 0:
+                self.cutoffs += 1
+                return self.evaluator(scratch, player)
+        else:
+            winner = self.run(scratch, max_plies)
+        return 1 if winner == player else 0
+
+    def simulate_value(self, state, player, max_plies=None):
+        """ simulate와 같지만 승자 대신 player의 승리 값(0~1)을 반환합니다. 원본 state는 바뀌지 않습니다. """
+        scratch = self.scratch(state.num_players)
+        if isinstance(state, CompactState):
+            scratch.copy_from(state)
+        else:
+            scratch.load(state)
+        return self.value(scratch, player, max_plies)
+
+    def rollouts_per_sec(self):
+        return self.rollouts / self.elapsed if self.elapsed else 0.0
+
+    def stats(self):
+        return {
+            'rollouts': self.rollouts,
+            'plies': self.plies,
+            'elapsed': self.elapsed,
+            'rollouts_per_sec': self.rollouts_per_sec(),
+            'cutoffs': self.cutoffs,
+        }
+
+
+# ==============================================================================
+# 플레이아웃 정책: policy(state, buf, n, rand) -> 둘 수 (buf[:n]은 state.legal_moves 결과)
+# ==============================================================================
+def _jokers_used(hand, code):
+    """ 수 code를 내면 쓰게 되는 조커 장수 (CompactState.play와 같은 규칙) """
+    rank = code >> 4
+    count = code & 15
+    if rank == JOKER:
+        return count
+    return count - hand[rank - 1] if hand[rank - 1] < count else 0
+
+
+class WeakestFirstPolicy:
+    """ 가장 약한 세트부터 냅니다. 달무티는 랭크 숫자가 클수록 약하므로 숫자가 가장 큰 랭크를,
+        같은 랭크면 조커를 가장 적게 쓰는 수를 고릅니다. 조커만 내는 수는 다른 수가 없을 때만,
+        패스는 낼 카드가 없을 때만 고릅니다. """
+
+    def __call__(self, state, buf, n, rand):
+        hand = state.counts[state.turn]
+        best = PASS
+        best_key = None
+        for i in range(n):
+            code = buf[i]
+            if code == PASS:
+                continue
+            rank = code >> 4
+            # 조커 단독은 가장 뒤로, 나머지는 랭크 숫자가 클수록·조커를 적게 쓸수록 우선
+            key = (rank != JOKER, rank, -_jokers_used(hand, code))
+            if best_key is None or key > best_key:
+                best, best_key = code, key
+        return best
+
+
+class HoldJokersPolicy:
+    """ 조커를 쓰지 않는 수 중에서 무작위로 고르고, 그런 수가 없을 때만 조커를 씁니다. 패스는 마지막 수단입니다. """
+
+    def __call__(self, state, buf, n, rand):
+        hand = state.counts[state.turn]
+        plain = []
+        with_jokers = []
+        for i in range(n):
+            code = buf[i]
+            if code == PASS:
+                continue
+            (with_jokers if _jokers_used(hand, code) else plain).append(code)
+        candidates = plain or with_jokers
+        if not candidates:
+            return PASS
+        return candidates[int(rand() * len(candidates))]
+
+
+class EpsilonGreedyPolicy:
+    """ epsilon 확률로 균등 무작위, 나머지는 base 정책(기본: WeakestFirstPolicy)을 따릅니다. """
+
+    def __init__(self, epsilon=0.1, base=None):
+        self.epsilon = epsilon
+        self.base = base if base is not None else WeakestFirstPolicy()
+
+    def __call__(self, state, buf, n, rand):
+        if rand() < self.epsilon:
+            return buf[int(rand() * n)]
+        return self.base(state, buf, n, rand)
+
+
+ROLLOUT_POLICIES = {
+    'uniform': lambda: None,
+    'weakest_first': WeakestFirstPolicy,
+    'hold_jokers': HoldJokersPolicy,
+    'epsilon_greedy': EpsilonGreedyPolicy,
+}
+
+
+def make_rollout_engine(policy='uniform', cutoff=None, evaluator=None, rng=None):
+    """ 정책 이름과 cutoff로 RolloutEngine을 만듭니다. (AI의 rollout_engine 인자로 넘길 때 사용) """
+    if policy not in ROLLOUT_POLICIES:
+        raise ValueError(f"Unknown rollout policy: {policy}")
+    return RolloutEngine(rng=rng, policy=ROLLOUT_POLICIES[policy](), cutoff=cutoff, evaluator=evaluator)
+
+
+# ==============================================================================
+# 정적 평가: 잘린 플레이아웃의 끝 상태에서 각 플레이어의 승률 추정
+# ==============================================================================
+class StaticEvaluator:
+    """ 남은 카드 수(적을수록 좋음), 가진 조커 수, 높은 카드(랭크 1~high_rank) 수의 가중합을
+        플레이어별 점수로 삼고, softmax로 승률을 추정합니다. """
+
+    def __init__(self, card_weight=1.0, joker_weight=2.0, high_card_weight=0.5, high_rank=3, temperature=2.0):
+        self.card_weight = card_weight
+        self.joker_weight = joker_weight
+        self.high_card_weight = high_card_weight
+        self.high_rank = high_rank
+        self.temperature = temperature
+
+    def score(self, state, player):
+        hand = state.counts[player]
+        return (self.joker_weight * hand[12]
+                + self.high_card_weight * sum(hand[:self.high_rank])
+                - self.card_weight * state.sizes[player])
+
+    def __call__(self, state, player):
+        if state.winner >= 0:
+            return 1 if state.winner == player else 0
+        scores = [self.score(state, i) / self.temperature for i in range(state.num_players)]
+        top = max(scores)
+        weights = [math.exp(x - top) for x in scores]
+        return weights[player] / sum(weights)
+
+
+def _legacy_simulate(game_state):
+    """ 비교용: 기존 make_move 기반 플레이아웃 """
+    current_state = game_state
+    while not current_state.game_over:
+        current_state = current_state.make_move(random.choice(current_state.get_possible_moves()))
+    return current_state.winner_index
+
+
+if __name__ == '__main__':
+    from dalmuti_game import GameState
+
+    ROLLOUTS = 200
+    for num_players in (4, 5, 6, 7):
+        random.seed(num_players)
+        states = [GameState(['mcts'] * num_players) for _ in range(ROLLOUTS)]
+
+        start = time.perf_counter()
+        for s in states:
+            _legacy_simulate(s)
+        legacy_rate = ROLLOUTS / (time.perf_counter() - start)
+
+        engine = RolloutEngine()
+        for s in states:
+            engine.simulate(s)
+        rate = engine.rollouts_per_sec()
+        print(f"{num_players} players: make_move {legacy_rate:8.1f} rollouts/s | "
+              f"RolloutEngine {rate:8.1f} rollouts/s ({rate / legacy_rate:.1f}x)")
+
+        # 정책별 플레이아웃 길이와 속도
+        for name in ROLLOUT_POLICIES:
+            engine = make_rollout_engine(name)
+            for s in states:
+                engine.simulate(s)
+            print(f"    {name:<15} {engine.plies / engine.rollouts:6.1f} plies/rollout | "
+                  f"{engine.rollouts_per_sec():8.1f} rollouts/s")
@@ -58,8 +58,19 @@ document.addEventListener('DOMContentLoaded', () => {
     const aiStyles = ['mcts_pro', 'mcts'];
     let selectedAiStyles = [0, 0, 0, 0, 0, 0, 0];
     let gameState = null;
+    let aiAgents = new Map(); // AI 플레이어 번호 -> 게임 내내 유지되는 MCTS 객체 (탐색 트리 재사용)
     let selectedCards = { indices: [], base_rank: null };
 
+    // --- 서버 AI 모드 (server.py) ---
+    // ?server=1로 열면 MCTS AI의 수를 브라우저 대신 server.py의 AI 프로세스 풀에서 계산해 화면이 멈추지 않습니다.
+    // &budget=ms로 수마다 생각 시간을, &server_url=http://host:port로 다른 서버를 지정할 수 있습니다.
+    // 서버가 바쁘거나(503) 연결이 안 되면 그 수만 브라우저 AI로 계산합니다.
+    const urlParams = new URLSearchParams(window.location.search);
+    const SERVER_AI = urlParams.get('server') === '1';
+    const SERVER_URL = urlParams.get('server_url') || '';
+    const SERVER_TIME_BUDGET_MS = parseInt(urlParams.get('budget') || '1000', 10);
+    let serverGameId = null;
+
     const CARD_RANK_COLORS = [
         null, '#e63946', '#f4a261', '#e9c46a', '#a8dadc', '#457b9d', '#1d3557',
         '#a2d2ff', '#6a4c93', '#ff8282', '#ffbe0b', '#f72585', '#8338ec', '#505050'
@@ -154,6 +165,12 @@ document.addEventListener('DOMContentLoaded', () => {
         log(message) { this.gameLog.push(message); }
         getCurrentPlayer() { return this.players[this.turnIndex]; }
 
+        // 두 상태가 같은 진행 상황인지 비교하기 위한 문자열 (MCTS 트리 재사용 확인용)
+        signature() {
+            return JSON.stringify([this.turnIndex, this.roundLeadIndex, this.gameOver, this.tableCards,
+                [...this.passedInRound].sort(), this.players.map(p => p.hand)]);
+        }
+
         clone() {
             const clonedState = new GameState([], {}, true);
             clonedState.numPlayers = this.numPlayers;
@@ -445,6 +462,7 @@ document.addEventListener('DOMContentLoaded', () => {
         // --- 핵심 수정: 자동 패스 로직을 AI 플레이어에게만 적용합니다. ---
         if (currentPlayer.isAi && gameState.passedInRound.has(gameState.turnIndex)) {
             gameState.log(`${currentPlayer.name} auto-passes.`);
+            notifyAgents("pass");
             gameState.player_pass(gameState.turnIndex);
             updateUI();
             setTimeout(processNextTurn, 500); // 다음 턴으로 부드럽게 넘어감
@@ -460,6 +478,55 @@ document.addEventListener('DOMContentLoaded', () => {
         // 당신의 턴일 경우, 이 함수는 아무것도 하지 않고 당신의 입력을 기다립니다.
     }
     
+    // 실제로 진행된 수를 모든 MCTS AI에게 알려 보관 중인 트리를 옮기게 합니다.
+    function notifyAgents(move) {
+        aiAgents.forEach(agent => agent.observe(move));
+    }
+
+    function createAiAgents() {
+        aiAgents = new Map();
+        gameState.players.forEach((p, i) => {
+            if (p.style === 'mcts') aiAgents.set(i, new MCTS_AI({ iterations: 1000, reuseTree: true }));
+            else if (p.style === 'mcts_pro') aiAgents.set(i, new MCTS_Pro_AI({ iterations: 1000, reuseTree: true }));
+        });
+    }
+
+    // 서버가 쓰는 dalmuti_game.GameState 형식으로 현재 상태를 바꿉니다.
+    function toServerState(state) {
+        return {
+            players: state.players.map(p => ({ name: p.name, style: p.style, is_ai: p.isAi, hand: p.hand.slice() })),
+            turn_index: state.turnIndex,
+            round_lead_index: state.roundLeadIndex,
+            table_cards: { cards: state.tableCards.cards.slice(), effective_rank: state.tableCards.effectiveRank },
+            passed_in_round: [...state.passedInRound],
+            consecutive_passes: state.consecutivePasses,
+            game_over: state.gameOver,
+            winner_index: state.winnerIndex,
+        };
+    }
+
+    async function postJson(path, body) {
+        const response = await fetch(SERVER_URL + path, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(body),
+        });
+        const data = await response.json();
+        if (!response.ok) throw new Error(`${response.status}: ${data.error}`);
+        return data;
+    }
+
+    // 브라우저의 상태를 그대로 보내 서버 AI의 수를 받습니다. (게임은 첫 요청 때 서버에 만들어짐)
+    async function requestServerMove() {
+        const serverState = toServerState(gameState);
+        if (!serverGameId) {
+            serverGameId = (await postJson('/api/games', { state: serverState })).game_id;
+        }
+        const reply = await postJson(`/api/games/${serverGameId}/ai-move`,
+            { state: serverState, time_budget_ms: SERVER_TIME_BUDGET_MS });
+        return reply.move;
+    }
+
     function updateLogsOnly() {
         logContent.innerHTML = gameState.gameLog.slice().reverse().map(line => `<p>${line}</p>`).join('');
     }
@@ -474,14 +541,28 @@ document.addEventListener('DOMContentLoaded', () => {
         const style = player.style;
         let best_play;
 
+        if (SERVER_AI && aiAgents.has(playerIndex)) {
+            const requestedState = gameState;
+            requestServerMove()
+                .catch(error => {
+                    console.warn(`Server AI unavailable (${error.message}), thinking locally.`);
+                    return requestedState === gameState ? aiAgents.get(playerIndex).find_best_move(gameState) : null;
+                })
+                .then(move => {
+                    // 기다리는 동안 새 게임이 시작됐으면 버림
+                    if (requestedState === gameState && move !== null) applyAiMove(move);
+                });
+            return;
+        }
+
         if (style === 'mcts') {
-            const mcts = new MCTS_AI({ iterations: 1000 });
+            const mcts = aiAgents.get(playerIndex);
             best_play = mcts.find_best_move(gameState);
         }
         // --- 핵심 수정: 'mcts_pro' 스타일일 때 새로운 AI를 호출 ---
         else if (style === 'mcts_pro') {
             console.log(`${player.name} (MCTS-Pro) is thinking...`);
-            const mcts_pro = new MCTS_Pro_AI({ iterations: 1000 }); // Pro 버전 호출
+            const mcts_pro = aiAgents.get(playerIndex); // Pro 버전 호출 (게임 내내 같은 객체로 트리 재사용)
             best_play = mcts_pro.find_best_move(gameState);
         }
         else {
@@ -536,7 +617,11 @@ document.addEventListener('DOMContentLoaded', () => {
                 best_play = possible_plays[0];
             }
         }
-        
+        applyAiMove(best_play);
+    }
+
+    function applyAiMove(best_play) {
+        notifyAgents(best_play === "pass" ? "pass" : { rank: best_play.rank, count: best_play.count });
         if (best_play === "pass") {
             gameState.player_pass(gameState.turnIndex);
         } else {
@@ -614,6 +699,7 @@ document.addEventListener('DOMContentLoaded', () => {
             const jokersToRemove = selectedRanks.filter(r => r === 13).length;
             const nativeToRemove = selectedRanks.filter(r => r === rankToPlay).length;
             
+            notifyAgents({ rank: rankToPlay, count: countToPlay });
             gameState.play_cards(playerIndex, rankToPlay, countToPlay, { native: nativeToRemove, jokers: jokersToRemove });
             // --- 수정 종료 ---
 
@@ -627,6 +713,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     passBtn.addEventListener('click', () => {
         const playerIndex = gameState.players.findIndex(p => !p.isAi);
+        notifyAgents("pass");
         gameState.player_pass(playerIndex);
         selectedCards = { indices: [], base_rank: null };
         updateUI();
@@ -643,6 +730,8 @@ document.addEventListener('DOMContentLoaded', () => {
             forceHumanStart: forceStartCheckbox.checked
         };
         gameState = new GameState(finalPlayerStyles, gameOptions);
+        serverGameId = null;
+        createAiAgents();
         setupScreen.classList.remove('active');
         mainGameScreen.classList.add('active');
         updateUI();
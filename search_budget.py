@@ -0,0 +1,84 @@
+# search_budget.py
+# MCTS 탐색을 언제 멈출지 결정하는 예산 객체.
+# 고정 반복 횟수(iterations)와 시간 예산(time_budget_ms) 중 먼저 닿는 쪽에서 멈추고,
+# 가장 많이 방문한 루트 자식이 남은 예산 안에 더 이상 역전될 수 없으면 일찍 멈춥니다.
+
+import time
+
+DECIDED_CHECK_INTERVAL = 16  # 역전 가능성 검사 주기 (반복 횟수)
+
+
+class SearchBudget:
+    def __init__(self, iterations=None, time_budget_ms=None):
+        if iterations is None and time_budget_ms is None:
+            raise ValueError("SearchBudget needs iterations, time_budget_ms, or both.")
+        self.iterations = iterations
+        self.time_budget_ms = time_budget_ms
+        self.start = time.perf_counter()
+        self.deadline = self.start + time_budget_ms / 1000 if time_budget_ms is not None else None
+        self.done = 0
+        self.stop_reason = None
+        self._next_decided_check = DECIDED_CHECK_INTERVAL
+
+    def remaining(self, now=None):
+        """ 남은 반복 횟수 추정치. 시간 예산은 지금까지의 반복 속도로 환산합니다. """
+        remaining = float('inf')
+        if self.iterations is not None:
+            remaining = self.iterations - self.done
+        if self.deadline is not None:
+            now = time.perf_counter() if now is None else now
+            elapsed = now - self.start
+            if self.done and elapsed > 0:
+                remaining = min(remaining, (self.deadline - now) * self.done / elapsed)
+        return remaining
+
+    def keep_going(self, root_node):
+        """ 반복을 계속해도 되면 True. 멈출 때는 stop_reason을 기록합니다. (최소 한 번은 반복) """
+        if not self.done:
+            return True
+        if self.iterations is not None and self.done >= self.iterations:
+            self.stop_reason = 'iterations'
+            return False
+        now = time.perf_counter()
+        if self.deadline is not None and now >= self.deadline:
+            self.stop_reason = 'deadline'
+            return False
+        if self.done >= self._next_decided_check:
+            self._next_decided_check = self.done + DECIDED_CHECK_INTERVAL
+            if self._decided(root_node, now):
+                self.stop_reason = 'decided'
+                return False
+        return True
+
+    def batch_size(self, limit):
+        """ 다음 배치에서 모을 리프 수 (남은 반복 횟수를 넘지 않게) """
+        if self.iterations is None:
+            return limit
+        return max(1, min(limit, self.iterations - self.done))
+
+    def only_move(self, root_node):
+        """ 루트에서 가능한 수가 하나뿐이면 그 수를, 아니면 None을 반환합니다. (예: 이미 패스해서 ["pass"]만 가능) """
+        moves = list(root_node.unexplored_moves) + [child.move for child in root_node.children]
+        if len(moves) == 1:
+            self.stop_reason = 'single_move'
+            return moves[0]
+        return None
+
+    def _decided(self, root_node, now):
+        # 객체 트리는 root_node.children, 배열 트리(flat_tree.FlatTree)는 child_visits()로 루트 자식 방문 수를 얻음
+        child_visits = getattr(root_node, 'child_visits', None)
+        visit_counts = child_visits() if child_visits is not None else (c.visits for c in root_node.children)
+        best = second = 0
+        for visits in visit_counts:
+            if visits > best:
+                best, second = visits, best
+            elif visits > second:
+                second = visits
+        return best - second > self.remaining(now)
+
+    def stats(self):
+        return {
+            'iterations': self.done,
+            'elapsed_ms': (time.perf_counter() - self.start) * 1000,
+            'stop_reason': self.stop_reason,
+        }
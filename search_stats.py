@@ -0,0 +1,242 @@
+# search_stats.py
+# MCTS 탐색 계측(선택 사항). AI에 stats=SearchStats()를 넘기면 탐색 단계별 누적 시간
+# (selection / expansion / determinization / playout / backprop), 만든 노드 수, 트리 깊이,
+# 플레이아웃 길이, 안전장치(max_plies)에 걸려 승자 없이 끝난 플레이아웃 수, 루트 자식 방문 분포를 모읍니다.
+# as_dict()로 reset() 이후의 누적 통계를 얻고, events_path를 주면 탐색 한 번마다 그 탐색만의 통계
+# (플레이아웃 길이 분포 포함)를 JSONL 이벤트 한 줄로 남깁니다. add_hook(fn)으로 등록한 함수도 같은 이벤트 딕셔너리를 받습니다.
+#
+# 탐색 루프는 하나만 두고, 계측할 때는 recorder()가 주는 IterationRecorder를, 아니면 아무것도 하지 않는
+# NULL_RECORDER를 씁니다. 롤아웃 안전장치(max_plies)에 걸린 플레이아웃(truncated)과
+# rollout cutoff에서 정적 평가로 끝낸 플레이아웃(cutoff)은 따로 셉니다. 종반 풀이기로 값을 구한 리프는
+# 플레이아웃이 아니므로 endgame_leaves로 세고 플레이아웃 길이 통계에는 넣지 않습니다.
+# 리프를 모아 평가하는 배치/leaf 병렬 탐색도 같은 기록기를 쓰고, root 병렬 탐색은 워커마다 모은 기록을
+# merge_search()로 합칩니다 (이때 단계별 시간은 워커들의 시간을 더한 값이라 벽시계 시간보다 큽니다).
+
+import json
+import time
+
+PHASES = ('selection', 'expansion', 'determinization', 'playout', 'backprop')
+PLAYOUT_BUCKET = 10     # 플레이아웃 길이 분포의 구간 폭 (수)
+
+
+class SearchStats:
+    def __init__(self, events_path=None):
+        self.events_path = events_path
+        self.hooks = []
+        self._events_file = None
+        self.reset()
+
+    def reset(self):
+        """ 누적 통계를 모두 지웁니다. (이벤트 파일과 훅은 그대로) """
+        self.searches = 0
+        self.iterations = 0
+        self.phase_time = dict.fromkeys(PHASES, 0.0)
+        self.nodes_created = 0
+        self.max_depth = 0
+        self.depth_sum = 0
+        self.playouts = 0
+        self.playout_plies = 0
+        self.max_playout_plies = 0
+        self.playout_histogram = {}     # 구간 시작 수 -> 플레이아웃 수
+        self.truncated_playouts = 0
+        self.cutoff_playouts = 0
+        self.endgame_leaves = 0
+        self.last_root_children = []
+        self._current = None
+
+    def add_hook(self, fn):
+        """ 탐색이 끝날 때마다 fn(event)를 호출합니다. """
+        self.hooks.append(fn)
+
+    # --------------------------------------------------------------------------
+    # AI 쪽에서 호출하는 기록 함수
+    # --------------------------------------------------------------------------
+    def begin_search(self):
+        self._current = {
+            'phase_time': dict.fromkeys(PHASES, 0.0),
+            'nodes_created': 0, 'max_depth': 0, 'depth_sum': 0,
+            'playouts': 0, 'playout_plies': 0, 'max_playout_plies': 0, 'truncated_playouts': 0,
+            'cutoff_playouts': 0, 'endgame_leaves': 0, 'playout_histogram': {},
+        }
+
+    def take_search(self):
+        """ 진행 중인 탐색의 기록을 누적하지 않고 꺼냅니다. (root 병렬 워커가 부모에게 돌려줄 때) """
+        current, self._current = self._current, None
+        return current
+
+    def merge_search(self, other):
+        """ take_search()로 꺼낸 다른 탐색의 기록을 진행 중인 탐색에 더합니다. """
+        current = self._current
+        for key, value in other.items():
+            if key == 'phase_time':
+                for phase, seconds in value.items():
+                    current['phase_time'][phase] += seconds
+            elif key == 'playout_histogram':
+                histogram = current['playout_histogram']
+                for bucket, count in value.items():
+                    histogram[bucket] = histogram.get(bucket, 0) + count
+            elif key.startswith('max_'):
+                current[key] = max(current[key], value)
+            else:
+                current[key] += value
+
+    def recorder(self):
+        """ 탐색 한 번 동안 쓸 기록기 (begin_search 뒤에 만들어 탐색 루프에 넘김) """
+        return IterationRecorder(self)
+
+    def record_phases(self, selection, expansion, determinization, playout, backprop):
+        """ 탐색 루프가 지역 변수로 모은 단계별 시간(초)을 한 번에 더합니다. """
+        phase_time = self._current['phase_time']
+        phase_time['selection'] += selection
+        phase_time['expansion'] += expansion
+        phase_time['determinization'] += determinization
+        phase_time['playout'] += playout
+        phase_time['backprop'] += backprop
+
+    def record_iteration(self, depth, plies, truncated, expanded, cutoff=False, solved=False):
+        current = self._current
+        current['nodes_created'] += expanded
+        current['depth_sum'] += depth
+        if depth > current['max_depth']:
+            current['max_depth'] = depth
+        if solved:
+            current['endgame_leaves'] += 1
+            return
+        current['playouts'] += 1
+        current['playout_plies'] += plies
+        if plies > current['max_playout_plies']:
+            current['max_playout_plies'] = plies
+        current['truncated_playouts'] += truncated
+        current['cutoff_playouts'] += cutoff
+        bucket = plies // PLAYOUT_BUCKET * PLAYOUT_BUCKET
+        histogram = current['playout_histogram']
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    def end_search(self, ai_name, player_index, root_children, budget_stats):
+        """ 탐색 한 번의 기록을 누적하고 이벤트 딕셔너리를 만들어 훅/JSONL로 내보냅니다.
+            root_children은 (수, 방문 수, 승리 수) 목록입니다. """
+        if self._current is None:
+            # 계측 루프를 거치지 않은 탐색 (수가 하나뿐이었거나 다른 AI에 맡긴 탐색)
+            self.begin_search()
+        current, self._current = self._current, None
+
+        self.searches += 1
+        self.iterations += budget_stats['iterations']
+        for phase, seconds in current['phase_time'].items():
+            self.phase_time[phase] += seconds
+        self.nodes_created += current['nodes_created']
+        self.max_depth = max(self.max_depth, current['max_depth'])
+        self.depth_sum += current['depth_sum']
+        self.playouts += current['playouts']
+        self.playout_plies += current['playout_plies']
+        self.max_playout_plies = max(self.max_playout_plies, current['max_playout_plies'])
+        self.truncated_playouts += current['truncated_playouts']
+        self.cutoff_playouts += current['cutoff_playouts']
+        self.endgame_leaves += current['endgame_leaves']
+        for bucket, count in current['playout_histogram'].items():
+            self.playout_histogram[bucket] = self.playout_histogram.get(bucket, 0) + count
+        self.last_root_children = [{'move': move, 'visits': visits, 'wins': wins}
+                                   for move, visits, wins in root_children]
+
+        playouts = current['playouts']
+        leaves = playouts + current['endgame_leaves']
+        event = {
+            'event': 'search',
+            'ai': ai_name,
+            'player': player_index,
+            'iterations': budget_stats['iterations'],
+            'elapsed_ms': budget_stats['elapsed_ms'],
+            'stop_reason': budget_stats['stop_reason'],
+            'phase_ms': {phase: seconds * 1000 for phase, seconds in current['phase_time'].items()},
+            'nodes_created': current['nodes_created'],
+            'max_depth': current['max_depth'],
+            'avg_depth': current['depth_sum'] / leaves if leaves else 0.0,
+            'playouts': playouts,
+            'avg_playout_plies': current['playout_plies'] / playouts if playouts else 0.0,
+            'max_playout_plies': current['max_playout_plies'],
+            'playout_histogram': dict(sorted(current['playout_histogram'].items())),
+            'truncated_playouts': current['truncated_playouts'],
+            'cutoff_playouts': current['cutoff_playouts'],
+            'endgame_leaves': current['endgame_leaves'],
+            'root_children': self.last_root_children,
+        }
+        for hook in self.hooks:
+            hook(event)
+        if self.events_path is not None:
+            if self._events_file is None:
+                self._events_file = open(self.events_path, 'a')
+            self._events_file.write(json.dumps(event) + '\n')
+            self._events_file.flush()
+        return event
+
+    # --------------------------------------------------------------------------
+    # 내보내기
+    # --------------------------------------------------------------------------
+    def as_dict(self):
+        leaves = self.playouts + self.endgame_leaves
+        return {
+            'searches': self.searches,
+            'iterations': self.iterations,
+            'phase_ms': {phase: seconds * 1000 for phase, seconds in self.phase_time.items()},
+            'nodes_created': self.nodes_created,
+            'max_depth': self.max_depth,
+            'avg_depth': self.depth_sum / leaves if leaves else 0.0,
+            'playouts': self.playouts,
+            'avg_playout_plies': self.playout_plies / self.playouts if self.playouts else 0.0,
+            'max_playout_plies': self.max_playout_plies,
+            'playout_histogram': dict(sorted(self.playout_histogram.items())),
+            'truncated_playouts': self.truncated_playouts,
+            'cutoff_playouts': self.cutoff_playouts,
+            'endgame_leaves': self.endgame_leaves,
+            'last_root_children': self.last_root_children,
+        }
+
+    def close(self):
+        if self._events_file is not None:
+            self._events_file.close()
+            self._events_file = None
+
+
+class IterationRecorder:
+    """ 탐색 루프가 단계가 끝날 때마다 phase(이름)를 부르면 직전 표시 이후 시간을 그 단계에 더합니다.
+        finish()에서 모은 시간을 SearchStats에 한 번에 넘깁니다. """
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.clock = time.perf_counter
+        self.phase_time = dict.fromkeys(PHASES, 0.0)
+        self._last = 0.0
+
+    def start(self):
+        self._last = self.clock()
+
+    def phase(self, name):
+        now = self.clock()
+        self.phase_time[name] += now - self._last
+        self._last = now
+
+    def iteration(self, depth, plies, truncated, expanded, cutoff=False, solved=False):
+        self.stats.record_iteration(depth, plies, truncated, expanded, cutoff, solved)
+
+    def finish(self):
+        self.stats.record_phases(**self.phase_time)
+
+
+class NullRecorder:
+    """ 계측하지 않는 탐색에서 쓰는 기록기. 모든 호출이 아무 일도 하지 않습니다. """
+    __slots__ = ()
+
+    def start(self):
+        pass
+
+    def phase(self, name):
+        pass
+
+    def iteration(self, depth, plies, truncated, expanded, cutoff=False, solved=False):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_RECORDER = NullRecorder()
@@ -0,0 +1,642 @@
+# server.py
+# 브라우저 프런트엔드(index.html/script.js)와 Python AI를 잇는 asyncio HTTP/WebSocket 게임 서버 (외부 의존성 없음).
+#  - 게임 여러 개를 동시에 들고 있고, AI 수 계산은 크기가 정해진 프로세스 풀에서 돌려 이벤트 루프를 막지 않습니다.
+#  - 요청마다 생각 시간 예산(time_budget_ms)을 받아 [MIN_TIME_BUDGET_MS, --max-time-ms]로 자르고,
+#    풀에 쌓인 요청이 --max-pending개면 새 AI 요청은 바로 503 + Retry-After로 돌려보냅니다 (백프레셔).
+#  - 같은 게임에 대한 요청은 게임별 잠금으로 차례대로 처리합니다.
+#
+# HTTP API (JSON)
+#   POST   /api/games                {"players": ["You", "mcts_pro", "mcts"], "state"?: {...}}  -> {"game_id", "state"}
+#   GET    /api/games/<id>                                                                   -> {"state"}
+#   POST   /api/games/<id>/move      {"move": "pass" | {"rank", "count"}}                    -> {"state"}
+#   POST   /api/games/<id>/ai-move   {"time_budget_ms"?, "state"?}                           -> {"move", "stats", "state"}
+#   DELETE /api/games/<id>
+#   GET    /api/stats                                      (AI 풀 대기열, 처리/거절 수, 지연 시간 분위수)
+#   ai-move에 "state"를 주면 그 상태로 바꾼 뒤 계산합니다 (브라우저가 자기 상태를 기준으로 쓰는 경우).
+# WebSocket /ws
+#   {"id": 1, "op": "create" | "get" | "move" | "ai_move" | "subscribe", "game_id"?, ...}에
+#   {"id": 1, "ok": true, ...} 또는 {"id": 1, "ok": false, "status", "error"}로 답하고,
+#   subscribe한 게임에 수가 둘 때마다 {"event": "move", "game_id", "move", "state"}를 보냅니다.
+# 그 밖의 GET은 저장소의 정적 파일(index.html 등)을 돌려줍니다.
+#
+# 예) python server.py --port 8000 --workers 4   (브라우저에서 http://localhost:8000/?server=1)
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+import random
+import signal
+import struct
+import time
+import traceback
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from dalmuti_game import MAX_PLAYERS, GameState, Player
+from mcts_ai import MCTS_AI
+from mcts_pro import MCTS_Pro_AI
+
+AI_STYLES = {'mcts': MCTS_AI, 'mcts_pro': MCTS_Pro_AI}
+AI_ITERATIONS = 1000                 # 시간 예산보다 먼저 닿으면 여기서 멈춤 (브라우저 AI와 같은 값)
+DEFAULT_TIME_BUDGET_MS = 1000
+MIN_TIME_BUDGET_MS = 10
+QUEUE_GRACE_S = 10.0                 # 풀 대기 시간 여유. 예산 + 이만큼 안에 답이 없으면 504
+LATENCY_WINDOW = 10000               # /api/stats 분위수 계산에 쓰는 최근 요청 수
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+STATIC_ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_FILES = {'index.html', 'script.js', 'style.css', 'mcts.js', 'mcts_pro.js'}
+FULL_DECK_COUNTS = [r for r in range(1, 13)] + [2]
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+# ==============================================================================
+# GameState <-> JSON
+# ==============================================================================
+def state_to_json(state):
+    return {
+        'players': [{'name': p.name, 'style': p.style, 'is_ai': p.is_ai, 'hand': list(p.hand)} for p in state.players],
+        'turn_index': state.turn_index,
+        'round_lead_index': state.round_lead_index,
+        'table_cards': {'cards': list(state.table_cards['cards']),
+                        'effective_rank': state.table_cards['effective_rank']},
+        'passed_in_round': sorted(state.passed_in_round),
+        'consecutive_passes': state.consecutive_passes,
+        'game_over': state.game_over,
+        'winner_index': state.winner_index,
+    }
+
+
+def state_from_json(data):
+    """ 클라이언트가 보낸 상태를 검사해 GameState로 만듭니다. 잘못된 값이면 HTTPError(400) """
+    try:
+        players = data['players']
+        num_players = len(players)
+        if not 2 <= num_players <= MAX_PLAYERS:
+            raise ValueError(f"players must have 2..{MAX_PLAYERS} entries")
+        state = GameState([], is_clone=True)
+        state.num_players = num_players
+        state.players = []
+        counts = [0] * 13
+        for p in players:
+            player = Player(str(p.get('name', '')), is_ai=bool(p.get('is_ai', True)), style=str(p.get('style', '')))
+            player.hand = sorted(int(card) for card in p['hand'])
+            for card in player.hand:
+                if not 1 <= card <= 13:
+                    raise ValueError(f"invalid card {card}")
+                counts[card - 1] += 1
+            state.players.append(player)
+        table = data.get('table_cards') or {'cards': [], 'effective_rank': 0}
+        state.table_cards = {'cards': sorted(int(c) for c in table['cards']),
+                             'effective_rank': int(table['effective_rank']) if table['cards'] else 0}
+        table_cards, effective_rank = state.table_cards['cards'], state.table_cards['effective_rank']
+        # 테이블은 한 랭크(조커만 내면 13)와 조커로만 이루어지고, 한 번에 낼 수 있는 장수는 12 + 조커 2장까지
+        if table_cards and not 1 <= effective_rank <= 13:
+            raise ValueError(f"invalid effective_rank {effective_rank}")
+        if len(table_cards) > FULL_DECK_COUNTS[11] + FULL_DECK_COUNTS[12]:
+            raise ValueError("too many cards on the table")
+        for card in table_cards:
+            if card not in (effective_rank, 13):
+                raise ValueError(f"table card {card} does not match effective_rank {effective_rank}")
+            counts[card - 1] += 1
+        if any(c > full for c, full in zip(counts, FULL_DECK_COUNTS)):
+            raise ValueError("more cards than in the deck")
+        state.turn_index = int(data['turn_index'])
+        state.round_lead_index = int(data.get('round_lead_index', state.turn_index))
+        state.passed_in_round = {int(i) for i in data.get('passed_in_round', [])}
+        if not all(0 <= i < num_players for i in [state.turn_index, state.round_lead_index, *state.passed_in_round]):
+            raise ValueError("player index out of range")
+        state.consecutive_passes = int(data.get('consecutive_passes', 0))
+        if not 0 <= state.consecutive_passes < num_players:
+            raise ValueError("consecutive_passes out of range")
+        state.game_over = bool(data.get('game_over', False))
+        state.winner_index = int(data.get('winner_index', -1))
+        # 누군가 손패를 다 내면 바로 게임이 끝나므로, 진행 중인 게임은 모두 카드가 있어야 함
+        # (빈 손패만 남으면 advance_turn이 끝나지 않음)
+        if state.game_over:
+            if not 0 <= state.winner_index < num_players or state.players[state.winner_index].hand:
+                raise ValueError("game_over needs a winner_index whose hand is empty")
+        elif not all(player.hand for player in state.players):
+            raise ValueError("every player must hold cards while the game is not over")
+        state.game_log = []
+        state.zobrist_hash = state.compute_zobrist_hash()
+        return state
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        raise HTTPError(400, f"invalid state: {e}")
+
+
+def parse_move(move):
+    if move == "pass":
+        return "pass"
+    try:
+        return {'rank': int(move['rank']), 'count': int(move['count'])}
+    except (KeyError, TypeError, ValueError):
+        raise HTTPError(400, "move must be \"pass\" or {\"rank\", \"count\"}")
+
+
+# ==============================================================================
+# AI 프로세스 풀 (워커에서 실행되므로 모듈 최상위 함수)
+# ==============================================================================
+_worker_ais = {}
+
+def _ai_move_worker(state, style, time_budget_ms, seed):
+    random.seed(seed)
+    ai = _worker_ais.get(style)
+    if ai is None:
+        ai = _worker_ais[style] = AI_STYLES[style](iterations=AI_ITERATIONS)
+    ai.time_budget_ms = time_budget_ms
+    return ai.search(state)
+
+
+def _call_soon(loop, callback):
+    """ 풀의 관리 스레드에서 이벤트 루프로 콜백을 넘깁니다. (종료 중이라 루프가 닫혔으면 무시) """
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        pass
+
+
+class AIPool:
+    """ 크기가 정해진 프로세스 풀과 대기열 상한. 상한을 넘는 요청은 기다리지 않고 바로 거절합니다. """
+
+    def __init__(self, workers, max_pending, max_time_budget_ms):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_time_budget_ms = max_time_budget_ms
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def clamp_budget(self, time_budget_ms):
+        if time_budget_ms is None:
+            time_budget_ms = DEFAULT_TIME_BUDGET_MS
+        try:
+            time_budget_ms = float(time_budget_ms)
+        except (TypeError, ValueError):
+            raise HTTPError(400, "time_budget_ms must be a number")
+        return min(max(time_budget_ms, MIN_TIME_BUDGET_MS), self.max_time_budget_ms)
+
+    async def best_move(self, state, style, time_budget_ms):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPError(503, "AI pool is busy, retry later", {'Retry-After': '1'})
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            job = self.executor.submit(_ai_move_worker, state, style, time_budget_ms, random.getrandbits(63))
+        except RuntimeError:
+            # 종료 신호로 풀을 이미 닫음
+            raise HTTPError(503, "server is shutting down")
+        # pending은 풀의 작업이 실제로 끝날 때 줄임. 시간 초과로 먼저 504를 답해도 워커가 계산 중인 동안은
+        # 대기열에 남아 있는 것으로 셈 (아직 시작하지 않은 작업은 취소되면서 바로 빠짐)
+        self.pending += 1
+        job.add_done_callback(lambda _: _call_soon(loop, self._job_done))
+        try:
+            move, stats = await asyncio.wait_for(asyncio.wrap_future(job),
+                                                 timeout=time_budget_ms / 1000 + QUEUE_GRACE_S)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise HTTPError(504, "AI move timed out")
+        elapsed = time.perf_counter() - start
+        self.completed += 1
+        self.latencies.append(elapsed)
+        return move, dict(stats, server_ms=elapsed * 1000)
+
+    def _job_done(self):
+        self.pending -= 1
+
+    def stats(self):
+        ordered = sorted(self.latencies)
+
+        def percentile(q):
+            return ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000 if ordered else None
+
+        return {'workers': self.workers, 'pending': self.pending, 'max_pending': self.max_pending,
+                'completed': self.completed, 'rejected': self.rejected, 'timed_out': self.timed_out,
+                'latency_ms': {'p50': percentile(0.5), 'p95': percentile(0.95), 'p99': percentile(0.99),
+                               'max': ordered[-1] * 1000 if ordered else None}}
+
+    def close(self, wait=False):
+        """ 새 작업을 받지 않고 아직 시작하지 않은 작업을 취소합니다. wait=True면 계산 중인 워커가 끝날 때까지
+            (요청 예산 안에서) 기다렸다가 프로세스를 정리합니다. """
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# ==============================================================================
+# 게임 목록
+# ==============================================================================
+class Game:
+    def __init__(self, game_id, state):
+        self.id = game_id
+        self.state = state
+        self.lock = asyncio.Lock()
+        self.subscribers = set()
+        self.last_active = time.monotonic()
+
+
+class GameServer:
+    def __init__(self, pool, max_games=1000):
+        self.pool = pool
+        self.max_games = max_games
+        self.games = {}
+
+    def _get(self, game_id):
+        game = self.games.get(game_id)
+        if game is None:
+            raise HTTPError(404, f"no such game: {game_id}")
+        game.last_active = time.monotonic()
+        return game
+
+    def _evict_idle(self):
+        """ 게임 수가 상한에 닿으면 끝난 게임, 그다음 가장 오래 쓰지 않은 게임부터 지웁니다. """
+        while len(self.games) >= self.max_games:
+            victim = min(self.games.values(), key=lambda g: (not g.state.game_over, g.last_active))
+            if victim.lock.locked():
+                raise HTTPError(503, "too many games", {'Retry-After': '1'})
+            del self.games[victim.id]
+
+    def create(self, body):
+        styles = body.get('players')
+        if body.get('state') is not None:
+            state = state_from_json(body['state'])
+        else:
+            if not isinstance(styles, list) or not 2 <= len(styles) <= MAX_PLAYERS:
+                raise HTTPError(400, f"players must be a list of 2..{MAX_PLAYERS} styles")
+            state = GameState([str(s) for s in styles])
+        self._evict_idle()
+        game = Game(uuid.uuid4().hex[:12], state)
+        self.games[game.id] = game
+        return {'game_id': game.id, 'state': state_to_json(state)}
+
+    def get(self, game_id):
+        return {'state': state_to_json(self._get(game_id).state)}
+
+    def delete(self, game_id):
+        self._get(game_id)
+        del self.games[game_id]
+        return {}
+
+    async def move(self, game_id, body):
+        game = self._get(game_id)
+        move = parse_move(body.get('move'))
+        async with game.lock:
+            state = game.state
+            if state.game_over:
+                raise HTTPError(409, "game is over")
+            if move not in state.get_possible_moves():
+                raise HTTPError(409, f"illegal move: {move}")
+            self._apply(game, move)
+            return {'state': state_to_json(state)}
+
+    async def ai_move(self, game_id, body):
+        game = self._get(game_id)
+        time_budget_ms = self.pool.clamp_budget(body.get('time_budget_ms'))
+        async with game.lock:
+            if body.get('state') is not None:
+                game.state = state_from_json(body['state'])
+            state = game.state
+            if state.game_over:
+                raise HTTPError(409, "game is over")
+            style = state.players[state.turn_index].style
+            if style not in AI_STYLES:
+                raise HTTPError(409, f"seat {state.turn_index} is not a server AI ({style})")
+            move, stats = await self.pool.best_move(state, style, time_budget_ms)
+            self._apply(game, move)
+            return {'move': move, 'stats': stats, 'state': state_to_json(game.state)}
+
+    def _apply(self, game, move):
+        state = game.state
+        if move == "pass":
+            state.player_pass(state.turn_index)
+        else:
+            state.play_cards(state.turn_index, move['rank'], move['count'])
+        if game.subscribers:
+            event = {'event': 'move', 'game_id': game.id, 'move': move, 'state': state_to_json(state)}
+            for socket in list(game.subscribers):
+                socket.send_later(event)
+
+    def stats(self):
+        return {'games': len(self.games), 'ai': self.pool.stats()}
+
+
+# ==============================================================================
+# HTTP
+# ==============================================================================
+REASONS = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           409: 'Conflict', 413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable',
+           504: 'Gateway Timeout'}
+MAX_BODY = 1 << 20
+CORS_HEADERS = {'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'GET, POST, DELETE, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type'}
+
+
+def _response(status, body=b'', content_type='application/json', headers=None, keep_alive=True):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+             f"Content-Length: {len(body)}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if body:
+        lines.append(f"Content-Type: {content_type}")
+    for key, value in {**CORS_HEADERS, **(headers or {})}.items():
+        lines.append(f"{key}: {value}")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode() + body
+
+
+def _json_response(status, data, headers=None, keep_alive=True):
+    return _response(status, json.dumps(data).encode(), headers=headers, keep_alive=keep_alive)
+
+
+async def _read_request(reader):
+    """ (메서드, 경로, 헤더 dict, 본문)을 읽습니다. 연결이 닫혔으면 None """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, path, _ = request_line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0) or 0)
+    except ValueError:
+        raise HTTPError(400, "invalid Content-Length")
+    if length < 0:
+        raise HTTPError(400, "invalid Content-Length")
+    if length > MAX_BODY:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), path.split('?', 1)[0], headers, body
+
+
+class HTTPHandler:
+    def __init__(self, games):
+        self.games = games
+
+    async def __call__(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as e:
+                    writer.write(_json_response(e.status, {'error': str(e)}, keep_alive=False))
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                if path == '/ws' and headers.get('upgrade', '').lower() == 'websocket':
+                    await WebSocket(reader, writer, headers).serve(self.games)
+                    return
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(await self.dispatch(method, path, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # 서버 종료 중에 취소된 연결. 다시 올리면 asyncio가 연결 콜백에서 오류로 출력함
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body, keep_alive):
+        try:
+            if method == 'OPTIONS':
+                return _response(204, keep_alive=keep_alive)
+            if path.startswith('/api/'):
+                data = json.loads(body) if body else {}
+                if not isinstance(data, dict):
+                    raise HTTPError(400, "request body must be a JSON object")
+                return _json_response(200, await self.api(method, path[len('/api/'):].strip('/').split('/'), data),
+                                      keep_alive=keep_alive)
+            if method == 'GET':
+                return self.static(path, keep_alive)
+            raise HTTPError(405, f"{method} not allowed")
+        except HTTPError as e:
+            return _json_response(e.status, {'error': str(e)}, e.headers, keep_alive)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return _json_response(400, {'error': "invalid JSON"}, keep_alive=keep_alive)
+        except Exception:
+            # 처리하지 못한 오류도 연결을 끊지 않고 500으로 답함 (원인은 서버 로그에)
+            traceback.print_exc()
+            return _json_response(500, {'error': "internal server error"}, keep_alive=keep_alive)
+
+    async def api(self, method, parts, data):
+        games = self.games
+        if parts == ['stats'] and method == 'GET':
+            return games.stats()
+        if parts[0] != 'games':
+            raise HTTPError(404, "unknown endpoint")
+        if len(parts) == 1 and method == 'POST':
+            return games.create(data)
+        if len(parts) == 2 and method == 'GET':
+            return games.get(parts[1])
+        if len(parts) == 2 and method == 'DELETE':
+            return games.delete(parts[1])
+        if len(parts) == 3 and method == 'POST' and parts[2] == 'move':
+            return await games.move(parts[1], data)
+        if len(parts) == 3 and method == 'POST' and parts[2] == 'ai-move':
+            return await games.ai_move(parts[1], data)
+        raise HTTPError(404, "unknown endpoint")
+
+    def static(self, path, keep_alive):
+        name = path.lstrip('/') or 'index.html'
+        if name not in STATIC_FILES:
+            raise HTTPError(404, f"not found: {path}")
+        with open(os.path.join(STATIC_ROOT, name), 'rb') as f:
+            content = f.read()
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        return _response(200, content, content_type, keep_alive=keep_alive)
+
+
+# ==============================================================================
+# WebSocket (RFC 6455, 텍스트 프레임만)
+# ==============================================================================
+OP_CONTINUATION, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+def encode_frame(opcode, payload, mask=False):
+    """ 프레임 하나를 만듭니다. 서버는 mask=False, 클라이언트(loadtest)는 mask=True """
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack('!H', length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack('!Q', length)
+    if mask:
+        key = os.urandom(4)
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+        header += key
+    return bytes(header) + payload
+
+
+async def read_frame(reader):
+    """ (opcode, fin, payload)를 읽습니다. 마스크가 있으면 풉니다. """
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack('!H', await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack('!Q', await reader.readexactly(8))
+    if length > MAX_BODY:
+        raise ConnectionError("frame too large")
+    key = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if key is not None:
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+    return first & 0x0F, bool(first & 0x80), payload
+
+
+class WebSocket:
+    def __init__(self, reader, writer, headers):
+        self.reader = reader
+        self.writer = writer
+        self.key = headers.get('sec-websocket-key', '')
+        self.subscriptions = set()
+        self.tasks = set()
+
+    def send_later(self, message):
+        """ 이벤트 루프를 막지 않고 메시지를 보냅니다. (게임 이벤트 브로드캐스트용) """
+        if not self.writer.is_closing():
+            self.writer.write(encode_frame(OP_TEXT, json.dumps(message).encode()))
+
+    async def serve(self, games):
+        accept = base64.b64encode(hashlib.sha1((self.key + WS_GUID).encode()).digest()).decode()
+        self.writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                           f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        fragments = []
+        try:
+            while True:
+                opcode, fin, payload = await read_frame(self.reader)
+                if opcode == OP_CLOSE:
+                    self.writer.write(encode_frame(OP_CLOSE, payload[:2]))
+                    break
+                if opcode == OP_PING:
+                    self.writer.write(encode_frame(OP_PONG, payload))
+                    continue
+                if opcode in (OP_TEXT, OP_BINARY, OP_CONTINUATION):
+                    fragments.append(payload)
+                    if not fin:
+                        continue
+                    message, fragments = b''.join(fragments), []
+                    # 요청마다 작업을 따로 띄워 느린 AI 요청이 같은 소켓의 다른 요청을 막지 않게 함
+                    task = asyncio.create_task(self.handle(games, message))
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+                await self.writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for game_id in self.subscriptions:
+                game = games.games.get(game_id)
+                if game is not None:
+                    game.subscribers.discard(self)
+            for task in list(self.tasks):
+                task.cancel()
+            self.writer.close()
+
+    async def handle(self, games, message):
+        request_id = None
+        try:
+            request = json.loads(message)
+            if not isinstance(request, dict):
+                raise HTTPError(400, "message must be a JSON object")
+            request_id = request.get('id')
+            op = request.get('op')
+            game_id = request.get('game_id')
+            if op == 'create':
+                result = games.create(request)
+            elif op == 'get':
+                result = games.get(game_id)
+            elif op == 'move':
+                result = await games.move(game_id, request)
+            elif op == 'ai_move':
+                result = await games.ai_move(game_id, request)
+            elif op == 'subscribe':
+                games._get(game_id).subscribers.add(self)
+                self.subscriptions.add(game_id)
+                result = {}
+            elif op == 'stats':
+                result = games.stats()
+            else:
+                raise HTTPError(400, f"unknown op: {op}")
+            reply = {'id': request_id, 'ok': True, **result}
+        except HTTPError as e:
+            reply = {'id': request_id, 'ok': False, 'status': e.status, 'error': str(e)}
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            reply = {'id': request_id, 'ok': False, 'status': 400, 'error': "invalid JSON"}
+        except Exception:
+            traceback.print_exc()
+            reply = {'id': request_id, 'ok': False, 'status': 500, 'error': "internal server error"}
+        self.send_later(reply)
+
+
+async def serve(host, port, workers, max_pending, max_time_budget_ms, max_games):
+    pool = AIPool(workers, max_pending, max_time_budget_ms)
+    games = GameServer(pool, max_games)
+    server = await asyncio.start_server(HTTPHandler(games), host, port)
+    print(f"Dalmuti server on http://{host}:{port}/ ({workers} AI workers, max {max_pending} pending AI requests)")
+    # SIGTERM도 Ctrl+C처럼 처리해서 AI 워커 프로세스를 정리하고 끝냄 (loadtest.py --start-server가 terminate로 종료).
+    # 신호를 받으면 먼저 풀을 닫아 새 작업을 막고 대기 중인 작업을 취소한 뒤 서버 작업을 멈추고,
+    # 끝으로 계산 중이던 워커를 기다려 정리함 (기다리지 않고 끝내면 풀 관리 스레드가 닫힌 파이프를 건드림)
+    main_task = asyncio.current_task()
+
+    def stop():
+        pool.close()
+        main_task.cancel()
+
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop)
+    except NotImplementedError:
+        pass
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        pool.close(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio HTTP/WebSocket server for Dalmuti games with server-side AI.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="AI worker processes")
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help="AI requests allowed in flight before answering 503 (default: 4 per worker)")
+    parser.add_argument('--max-time-ms', type=float, default=5000, help="upper bound for per-request time budgets")
+    parser.add_argument('--max-games', type=int, default=1000)
+    args = parser.parse_args()
+
+    max_pending = args.max_pending if args.max_pending is not None else 4 * args.workers
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, max_pending, args.max_time_ms, args.max_games))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == '__main__':
+    main()
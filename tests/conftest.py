@@ -0,0 +1,5 @@
+# 테스트에서 저장소 최상위 모듈(dalmuti_game, compact_state, ...)을 바로 import할 수 있게 경로를 추가합니다.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,88 @@
+# 대국장의 통계 함수(Elo 변환, SPRT, Wilson 구간)와 좌석 배치, 설정 문자열 해석을 확인합니다.
+import random
+
+import pytest
+
+from arena import SPRT, elo_from_score, expected_score, make_ai, seat_configs, wilson_interval
+from dalmuti_game import GameState
+
+
+@pytest.mark.parametrize('num_players,candidate_seats', [(2, 1), (4, 1), (4, 2), (5, 2), (7, 3)])
+@pytest.mark.parametrize('elo', [-300, -35, 0, 12.5, 200])
+def test_elo_round_trip(elo, num_players, candidate_seats):
+    score = expected_score(elo, candidate_seats, num_players)
+    assert 0 < score < 1
+    assert elo_from_score(score, candidate_seats, num_players) == pytest.approx(elo)
+
+
+def test_equal_strength_scores_seat_share():
+    assert expected_score(0, 2, 4) == pytest.approx(0.5)
+    assert expected_score(0, 1, 4) == pytest.approx(0.25)
+    assert elo_from_score(0.0, 1, 4) == float('-inf')
+    assert elo_from_score(1.0, 1, 4) == float('inf')
+
+
+def test_sprt_accepts_h1_on_win_streak_and_h0_on_loss_streak():
+    for won, expected in ((True, 'H1'), (False, 'H0')):
+        sprt = SPRT(0, 50, 0.05, 0.05, 2, 4)
+        assert sprt.decision() is None
+        decision = None
+        for games in range(1, 1000):
+            decision = sprt.update(won)
+            if decision:
+                break
+        assert decision == expected
+        assert games < 100
+
+
+def test_sprt_alternating_results_stay_undecided_at_h0_rate():
+    # 4인 중 1자리 후보가 정확히 1/4을 이기면 H0(elo0=0) 쪽으로 기울어야 함
+    sprt = SPRT(0, 50, 0.05, 0.05, 1, 4)
+    decision = None
+    for game in range(4000):
+        decision = sprt.update(game % 4 == 0)
+        if decision:
+            break
+    assert decision == 'H0'
+
+
+@pytest.mark.parametrize('num_players', range(2, 8))
+def test_seat_configs_rotate_every_config_through_every_seat(num_players):
+    for candidate_seats in range(1, num_players):
+        per_seat = [0] * num_players
+        for game_index in range(num_players):
+            seats = seat_configs(num_players, candidate_seats, game_index)
+            assert len(seats) == num_players
+            assert seats.count(0) == candidate_seats
+            for seat, config in enumerate(seats):
+                per_seat[seat] += config == 0
+        # num_players판마다 모든 자리가 후보를 candidate_seats번씩 맡음
+        assert per_seat == [candidate_seats] * num_players
+
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = wilson_interval(8, 10)
+    assert low == pytest.approx(0.4902, abs=1e-4)
+    assert high == pytest.approx(0.9433, abs=1e-4)
+    low, high = wilson_interval(50, 100)
+    assert 0.5 - low == pytest.approx(high - 0.5)
+    assert wilson_interval(0, 20)[0] == 0.0
+    assert wilson_interval(20, 20)[1] == 1.0
+    # 판 수가 늘면 구간이 좁아짐
+    assert wilson_interval(500, 1000)[1] - wilson_interval(500, 1000)[0] < high - low
+
+
+def test_make_ai_parses_options():
+    ai = make_ai('pro:30:reuse_tree=1,leaf_batch=8,belief=1')
+    assert ai.iterations == 30 and ai.reuse_tree and ai.leaf_batch in (1, 8) and ai.belief is not None
+    with pytest.raises(ValueError):
+        make_ai('nosuch:10')
+
+
+def test_puct_accepts_belief():
+    random.seed(0)
+    ai = make_ai('puct:20:belief=1')
+    assert ai.belief is not None
+    state = GameState(['mcts'] * 4)
+    assert ai.find_best_move(state) in state.get_possible_moves()
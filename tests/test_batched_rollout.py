@@ -0,0 +1,57 @@
+# BatchedRollout의 벡터화 규칙이 GameState.get_possible_moves와 같은 합법 수를 만드는지 확인합니다.
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from batched_rollout import NUM_MOVE_SLOTS, BatchedRollout, move_slot
+from dalmuti_game import GameState
+
+
+def sample_states(num_players, seed, limit=300):
+    random.seed(seed)
+    rng = random.Random(seed)
+    state = GameState(['mcts_pro'] * num_players)
+    states = []
+    while not state.game_over and len(states) < limit:
+        states.append(state)
+        state = state.make_move(rng.choice(state.get_possible_moves()))
+    return states
+
+
+def expected_slots(state):
+    return sorted(0 if move == "pass" else move_slot(move['rank'], move['count'])
+                  for move in state.get_possible_moves())
+
+
+def current_player_arrays(batch):
+    rows = np.arange(len(batch['turn']))
+    turn = batch['turn']
+    return batch['counts'][rows, turn], batch['passed'][rows, turn], batch['table_rank'], batch['table_count']
+
+
+@pytest.mark.parametrize('num_players', [2, 4, 7])
+def test_legal_mask_matches_game_state(num_players):
+    states = sample_states(num_players, seed=num_players)
+    mask = BatchedRollout(np.random.default_rng(0)).legal_mask(*current_player_arrays(BatchedRollout.stack(states)))
+    assert mask.shape == (len(states), NUM_MOVE_SLOTS)
+    for state, row in zip(states, mask):
+        assert np.flatnonzero(row).tolist() == expected_slots(state)
+
+
+def test_sample_moves_are_legal():
+    states = sample_states(5, seed=11)
+    roller = BatchedRollout(np.random.default_rng(1))
+    arrays = current_player_arrays(BatchedRollout.stack(states))
+    for _ in range(20):
+        rank, count = roller.sample_moves(*arrays)
+        for state, r, c in zip(states, rank, count):
+            slot = 0 if r == 0 else move_slot(int(r), int(c))
+            assert slot in expected_slots(state)
+
+
+def test_simulate_states_finishes_with_a_winner():
+    states = sample_states(4, seed=3, limit=20)
+    winners = BatchedRollout(np.random.default_rng(2)).simulate_states(states, max_plies=2000)
+    assert ((winners >= 0) & (winners < 4)).all()
@@ -0,0 +1,117 @@
+# CardBelief 결정화가 패스 제약을 지키고, 관찰자 손패와 손패 장수·카드 묶음을 바꾸지 않는지 확인합니다.
+import random
+
+import pytest
+
+from belief import CardBelief
+from compact_state import CompactState
+from dalmuti_game import GameState
+from mcts_pro import MCTS_Pro_AI
+
+OBSERVER = 3
+PASSER = 1
+
+
+def give(state, player_index, rank):
+    """ player_index가 rank 카드를 한 장 이상 갖도록 다른 플레이어와 카드 한 장을 맞바꿉니다. """
+    hand = state.players[player_index].hand
+    if rank in hand:
+        return
+    holder = next(p for p in state.players if rank in p.hand)
+    swap = next(card for card in hand if card not in (1, 2))
+    holder.hand.remove(rank)
+    hand.remove(swap)
+    holder.hand.append(swap)
+    hand.append(rank)
+    holder.sort_hand()
+    state.players[player_index].sort_hand()
+
+
+def constrained_game(pass_play_likelihood=0.0):
+    """ 0번이 2를 한 장 내고 1번이 패스한 4인 게임. 1번은 '1을 한 장으로 낼 수 없음' (= 1 카드가 없음) 제약을 얻고,
+        1 카드는 실제로 2번이 갖고 있습니다. 다음 차례는 2번이고 관찰자는 3번입니다. """
+    random.seed(0)
+    state = GameState(['mcts'] * 4)
+    give(state, 0, 2)
+    give(state, 2, 1)
+    state.turn_index = state.round_lead_index = 0
+    state.zobrist_hash = state.compute_zobrist_hash()
+
+    belief = CardBelief(pass_play_likelihood=pass_play_likelihood, max_tries=50, seed=0)
+    belief.reset(state)
+    move = {'rank': 2, 'count': 1}
+    belief.observe(state, move)
+    state.play_cards(0, 2, 1)
+    belief.observe(state, "pass")
+    state.player_pass(PASSER)
+    assert state.turn_index == 2
+    assert belief.constraints[PASSER] == {1: 2}
+    return state, belief
+
+
+def test_incremental_tracking_matches_snapshot():
+    state, belief = constrained_game()
+    fresh = CardBelief()
+    fresh.reset(state)
+    assert belief.matches(state)
+    assert belief.played == fresh.played
+    assert sum(belief.played) == 1
+    mine = CompactState.from_game_state(state).counts[OBSERVER]
+    others = [sum(p_counts) for p_counts in zip(*[CompactState.from_game_state(state).counts[i]
+                                                  for i in range(4) if i != OBSERVER])]
+    assert belief.remaining(mine) == others
+
+
+def test_serial_samples_honor_pass_constraint():
+    state, belief = constrained_game(0.0)
+    for _ in range(200):
+        scratch = belief.determinize_into(CompactState.from_game_state(state), OBSERVER)
+        assert scratch.counts[PASSER][0] == 0
+
+    loose = constrained_game(1.0)[1]
+    held = sum(loose.determinize_into(CompactState.from_game_state(state), OBSERVER).counts[PASSER][0]
+               for _ in range(200))
+    assert held > 0
+
+
+def test_batched_samples_honor_pass_constraint():
+    pytest.importorskip('numpy')
+    state, belief = constrained_game(0.0)
+    scratches = [CompactState.from_game_state(state) for _ in range(200)]
+    belief.determinize_batch(scratches, [OBSERVER] * len(scratches))
+    assert all(s.counts[PASSER][0] == 0 for s in scratches)
+    hands = belief.sample(CompactState.from_game_state(state).counts[OBSERVER], OBSERVER, 200)
+    assert not hands[:, PASSER, 0].any()
+
+
+def test_observer_hand_is_never_changed():
+    state, belief = constrained_game(0.5)
+    original = CompactState.from_game_state(state)
+    mine = list(original.counts[OBSERVER])
+    # 차례는 2번이지만 손패를 아는 것은 관찰자(3번)
+    for _ in range(50):
+        scratch = belief.determinize_into(CompactState.from_game_state(state), OBSERVER)
+        assert scratch.counts[OBSERVER] == mine
+    for with_belief in (belief, None):
+        ai = MCTS_Pro_AI(iterations=10, belief=with_belief)
+        changed = 0
+        for _ in range(50):
+            scratch = ai._determinize_into(CompactState(4), state, OBSERVER)
+            assert scratch.counts[OBSERVER] == mine
+            changed += scratch.counts[state.turn_index] != original.counts[state.turn_index]
+        assert changed > 0
+
+
+def test_determinize_batch_preserves_hand_sizes_and_card_pool():
+    pytest.importorskip('numpy')
+    state, belief = constrained_game(0.5)
+    original = CompactState.from_game_state(state)
+    scratches = [CompactState.from_game_state(state) for _ in range(100)]
+    belief.determinize_batch(scratches, [OBSERVER] * len(scratches))
+    pool = [sum(rank) for rank in zip(*original.counts)]
+    assert any(s.counts != original.counts for s in scratches)
+    for scratch in scratches:
+        assert scratch.counts[OBSERVER] == original.counts[OBSERVER]
+        assert [sum(row) for row in scratch.counts] == list(original.sizes)
+        assert list(scratch.sizes) == list(original.sizes)
+        assert [sum(rank) for rank in zip(*scratch.counts)] == pool
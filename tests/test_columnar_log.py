@@ -0,0 +1,67 @@
+# 열 형식 학습 로그가 JSONL 로그와 같은 내용으로 되돌아오는지 (청크 경계를 넘는 배치 포함) 확인합니다.
+import json
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from analyze_strategy import action_to_dict, state_to_vector
+from columnar_log import ColumnarLogReader, ColumnarLogWriter, convert_jsonl
+from dalmuti_game import GameState
+
+
+def logged_rows(num_players, game_index, seed):
+    """ 무작위 대국을 analyze_strategy 로그와 같은 형식의 행 목록으로 만듭니다. """
+    random.seed(seed)
+    rng = random.Random(seed)
+    state = GameState(['mcts_pro'] * num_players)
+    rows = []
+    while not state.game_over and len(rows) < 300:
+        move = rng.choice(state.get_possible_moves())
+        rows.append({"game_id": f"{num_players}p_{game_index}", "turn_number": len(rows) + 1,
+                     "player_index": state.turn_index, "state_vector": state_to_vector(state),
+                     "action": action_to_dict(move)})
+        state = state.make_move(move)
+    for row in rows:
+        row["outcome_win"] = 1 if row["player_index"] == state.winner_index else 0
+    return rows
+
+
+@pytest.fixture(scope='module')
+def rows():
+    return [row for game, num_players in enumerate([2, 4, 5, 8, 3])
+            for row in logged_rows(num_players, game * 1000 + 7, seed=game)]
+
+
+def test_round_trip_across_chunks(rows, tmp_path):
+    path = str(tmp_path / 'log.cols')
+    with ColumnarLogWriter(path, chunk_rows=37) as writer:
+        for row in rows:
+            writer.append(row)
+
+    reader = ColumnarLogReader(path)
+    assert len(reader) == len(rows)
+    assert len(reader.chunk_rows) == -(-len(rows) // 37)
+    assert list(reader.iter_rows()) == rows
+
+    # 청크 크기와 맞지 않는 배치도 빠짐없이 같은 순서로 나와야 함
+    batches = list(reader.iter_batches(batch_size=50, columns=['game', 'turn']))
+    assert all(len(b['game']) == 50 for b in batches[:-1])
+    assert [int(t) for b in batches for t in b['turn']] == [row['turn_number'] for row in rows]
+
+
+def test_convert_jsonl(rows, tmp_path):
+    src = tmp_path / 'log.jsonl'
+    src.write_text(''.join(json.dumps(row) + '\n' for row in rows) + '\n')
+    dest = str(tmp_path / 'converted.cols')
+    assert convert_jsonl([str(src)], dest, chunk_rows=64) == len(rows)
+    assert list(ColumnarLogReader(dest).iter_rows()) == rows
+
+
+def test_writer_refuses_existing_log(tmp_path):
+    path = str(tmp_path / 'log.cols')
+    ColumnarLogWriter(path).close()
+    assert len(ColumnarLogReader(path)) == 0
+    with pytest.raises(FileExistsError):
+        ColumnarLogWriter(path)
@@ -0,0 +1,68 @@
+# CompactState가 GameState와 같은 게임을 두는지 시드 고정 무작위 대국으로 매 수마다 비교합니다.
+import random
+
+import pytest
+
+from compact_state import MAX_MOVES, CompactState, decode_move, encode_move
+from dalmuti_game import GameState
+
+MAX_PLIES = 400  # 빈 테이블 패스가 허용되므로 무작위 대국이 길어질 수 있어 상한을 둠
+
+
+def snapshot(compact):
+    return (compact.num_players, [row[:] for row in compact.counts], compact.sizes[:], compact.turn, compact.lead,
+            compact.table_rank, compact.table_count, compact.table_jokers, compact.passed, compact.consecutive,
+            compact.winner)
+
+
+def random_game(num_players, seed):
+    """ (수를 두기 전 GameState, 둔 수) 쌍을 차례로 내놓는 무작위 대국 """
+    random.seed(seed)
+    state = GameState(['mcts_pro'] * num_players)
+    rng = random.Random(seed)
+    for _ in range(MAX_PLIES):
+        if state.game_over:
+            return
+        move = rng.choice(state.get_possible_moves())
+        yield state, move
+        state = state.make_move(move)
+
+
+@pytest.mark.parametrize('num_players', range(2, 9))
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_game_state_move_by_move(num_players, seed):
+    buf = [0] * MAX_MOVES
+    compact = None
+    for state, move in random_game(num_players, seed * 100 + num_players):
+        loaded = CompactState.from_game_state(state)
+        if compact is None:
+            compact = loaded
+        # 적용을 이어 온 상태와 GameState에서 새로 읽은 상태가 같아야 함
+        assert snapshot(compact) == snapshot(loaded)
+        assert compact.to_game_state(state).signature() == state.signature()
+
+        n = compact.legal_moves(buf)
+        assert [decode_move(code) for code in buf[:n]] == state.get_possible_moves()
+
+        before = snapshot(compact)
+        expected = state.make_move(move)
+        token = compact.apply(encode_move(move))
+        assert compact.to_game_state(state).signature() == expected.signature()
+        assert compact.game_over == expected.game_over
+        assert compact.winner == expected.winner_index
+
+        compact.undo(token)
+        assert snapshot(compact) == before
+
+        compact.play(encode_move(move))
+        assert compact.to_game_state(state).signature() == expected.signature()
+
+
+def test_make_move_leaves_original_untouched():
+    random.seed(7)
+    state = GameState(['mcts_pro'] * 4)
+    compact = CompactState.from_game_state(state)
+    before = snapshot(compact)
+    child = compact.make_move(state.get_possible_moves()[0])
+    assert snapshot(compact) == before
+    assert child.to_game_state(state).signature() == state.make_move(state.get_possible_moves()[0]).signature()
@@ -0,0 +1,79 @@
+# 종반 풀이기가 빈 테이블 패스(국면 반복)를 포함한 게임에서 정확한 값을 내는지,
+# 도달 가능한 모든 국면에 대한 고정점(attractor) 계산과 비교해 확인합니다.
+import random
+
+import pytest
+
+from compact_state import MAX_MOVES, CompactState
+from endgame import EndgameSolver
+
+
+def snapshot(state):
+    return (state.turn, state.lead, state.table_rank, state.table_count, state.table_jokers, state.passed,
+            state.consecutive, state.winner, tuple(map(tuple, state.counts)))
+
+
+def small_endgame(num_players, cards, seed):
+    rng = random.Random(seed)
+    state = CompactState(num_players)
+    for p in range(num_players):
+        for _ in range(rng.randint(1, cards)):
+            state.counts[p][rng.choice([0, 2, 4, 6, 9, 11, 12])] += 1
+        state.sizes[p] = sum(state.counts[p])
+    state.turn = state.lead = rng.randrange(num_players)
+    return state
+
+
+def exact_wins(start, player):
+    """ 도달 가능한 국면 그래프에서 player가 (나머지 모두가 막아도) 이길 수 있는 국면 집합 """
+    buf = [0] * MAX_MOVES
+    successors = {}
+    stack = [start.copy()]
+    while stack:
+        state = stack.pop()
+        key = snapshot(state)
+        if key in successors:
+            continue
+        successors[key] = []
+        if state.winner >= 0:
+            continue
+        for code in buf[:state.legal_moves(buf)]:
+            child = state.copy()
+            child.apply(code)
+            successors[key].append(snapshot(child))
+            stack.append(child)
+
+    wins = {key for key in successors if key[7] == player}
+    changed = True
+    while changed:
+        changed = False
+        for key, children in successors.items():
+            if key in wins or key[7] >= 0:
+                continue
+            hits = [child in wins for child in children]
+            if (any(hits) if key[0] == player else all(hits)):
+                wins.add(key)
+                changed = True
+    return wins
+
+
+@pytest.mark.parametrize('num_players', [2, 3])
+@pytest.mark.parametrize('seed', range(8))
+def test_solver_matches_fixed_point(num_players, seed):
+    start = small_endgame(num_players, 3, seed)
+    for player in range(num_players):
+        wins = exact_wins(start, player)
+        before = snapshot(start)
+        assert EndgameSolver().wins(start, player) == (before in wins)
+        assert snapshot(start) == before
+
+
+def test_lead_pass_is_searched():
+    # 빈 테이블 패스로 같은 국면이 반복될 수 있는 최소 종반
+    state = CompactState(2)
+    state.counts[0][0] = 1
+    state.counts[0][1] = 1
+    state.counts[1][0] = 1
+    state.sizes[:] = [2, 1]
+    assert EndgameSolver().wins(state, 0) == (snapshot(state) in exact_wins(state, 0))
+    assert EndgameSolver().wins(state, 1) == (snapshot(state) in exact_wins(state, 1))
@@ -0,0 +1,39 @@
+# FeatureEncoder(증분 갱신)와 encode_states(배치)가 analyze_strategy.state_to_vector와 같은 벡터를 만드는지 확인합니다.
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from analyze_strategy import state_to_vector
+from dalmuti_game import GameState
+from feature_encoder import FeatureEncoder, encode_states, vector_length
+
+
+@pytest.mark.parametrize('num_players', [2, 4, 6, 8])
+def test_incremental_and_batch_encoding_match_state_to_vector(num_players):
+    random.seed(num_players)
+    rng = random.Random(num_players)
+    state = GameState(['mcts_pro'] * num_players)
+    encoder = FeatureEncoder(state)
+    snapshots = []
+    expected = []
+    for _ in range(300):
+        if state.game_over:
+            break
+        vector = state_to_vector(state)
+        assert len(vector) == vector_length(num_players)
+        assert encoder.encode().tolist() == vector
+        snapshots.append(state.clone())
+        expected.append(vector)
+        encoder.make_move(rng.choice(state.get_possible_moves()))
+
+    assert encode_states(snapshots).tolist() == expected
+    out = np.zeros((len(snapshots), vector_length(num_players)), dtype=np.int32)
+    assert encode_states(snapshots, out=out) is out
+    assert out.tolist() == expected
+
+
+def test_encode_states_rejects_mixed_player_counts():
+    with pytest.raises(ValueError):
+        encode_states([GameState(['mcts'] * 4), GameState(['mcts'] * 5)])
@@ -0,0 +1,120 @@
+# FlatTree의 형제 연결 리스트가 new_node/recycle 뒤에도 일관되고,
+# max_nodes 상한이 지켜지는지 확인합니다.
+import random
+
+import pytest
+
+from compact_state import CompactState
+from dalmuti_game import GameState
+from flat_tree import FREED, NO_NODE, FlatMCTS_AI, FlatTree
+from mcts_ai import MCTS_AI
+from search_budget import SearchBudget
+
+
+def children(tree, node):
+    result = []
+    child = tree.first_child[node]
+    while child != NO_NODE:
+        result.append(child)
+        child = tree.next_sibling[child]
+    return result
+
+
+def reachable(tree, root=0):
+    seen = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        seen.append(node)
+        kids = children(tree, node)
+        assert len(kids) == tree.num_children[node]
+        for child in kids:
+            assert tree.parent[child] == node
+        stack.extend(kids)
+    return seen
+
+
+def assert_consistent(tree):
+    live = reachable(tree)
+    assert len(live) == len(set(live)) == len(tree)
+    assert all(tree.parent[node] != FREED for node in live)
+    assert set(tree.free).isdisjoint(live)
+    assert all(tree.parent[node] == FREED for node in tree.free)
+
+
+def test_new_node_links_children():
+    tree = FlatTree(capacity=2)
+    root = tree.new_node(NO_NODE, 0)
+    a = tree.new_node(root, 17)
+    b = tree.new_node(root, 33)
+    c = tree.new_node(a, 49)
+    assert tree.parent[root] == NO_NODE
+    assert children(tree, root) == [b, a]
+    assert children(tree, a) == [c]
+    assert tree.num_children[root] == 2 and tree.num_children[c] == 0
+    assert tree.move[c] == 49
+    assert len(tree) == 4
+    assert_consistent(tree)
+
+
+def test_best_child_picks_most_visited():
+    tree = FlatTree()
+    root = tree.new_node(NO_NODE, 0)
+    assert tree.best_child(root) == NO_NODE
+    nodes = [tree.new_node(root, move) for move in (17, 33, 49)]
+    for node, visits in zip(nodes, (3, 9, 5)):
+        tree.visits[node] = visits
+    assert tree.best_child(root) == nodes[1]
+    assert sorted(tree.child_visits(root)) == [3, 5, 9]
+
+
+def test_recycle_keeps_links_consistent_and_reuses_slots():
+    random.seed(0)
+    tree = FlatTree()
+    root = tree.new_node(NO_NODE, 0)
+    nodes = [root]
+    for _ in range(300):
+        node = tree.new_node(random.choice(nodes), random.randrange(1, 200))
+        tree.visits[node] = random.randrange(100)
+        nodes.append(node)
+    tree.visits[root] = 1000
+
+    freed = tree.recycle(50)
+    assert freed >= 50
+    assert tree.recycled == freed
+    assert len(tree) == 301 - freed
+    assert_consistent(tree)
+
+    # 비운 칸을 다시 쓰더라도 연결이 유지됨
+    size = tree.size
+    for _ in range(freed):
+        tree.new_node(root, 5)
+    assert tree.size == size and not tree.free
+    assert_consistent(tree)
+
+
+@pytest.mark.parametrize('seed', range(2))
+def test_run_stays_within_max_nodes(seed):
+    random.seed(seed)
+    root_state = CompactState.from_game_state(GameState(['mcts'] * 4))
+    ai = FlatMCTS_AI(iterations=2000, max_nodes=200)
+    tree = FlatTree(max_nodes=200)
+    tree.new_node(NO_NODE, 0)
+    budget = SearchBudget(2000)
+    ai._run(tree, root_state, budget)
+    assert tree.recycled > 0
+    assert len(tree) <= 200
+    assert tree.visits[0] == budget.done
+    assert_consistent(tree)
+
+
+def test_mcts_ai_flat_tree_option():
+    random.seed(1)
+    state = GameState(['mcts'] * 4)
+    ai = MCTS_AI(iterations=200, tree='flat', max_nodes=100)
+    move, stats = ai.search(state)
+    assert move in state.get_possible_moves()
+    assert stats['iterations'] == 200
+    assert stats['nodes'] <= 100
+    with pytest.raises(ValueError):
+        MCTS_AI(tree='flat', leaf_batch=8)
@@ -0,0 +1,53 @@
+# 중단된 generate 실행을 이어갈 때 manifest 복구와 남은 샤드 계획이 맞는지 확인합니다.
+import json
+import os
+
+from analyze_strategy import MANIFEST_NAME, load_manifest, plan_shards, recover_shards, shard_name
+
+
+def write_shard(out_dir, num_players, indexes, turns_per_game=3):
+    name = shard_name(num_players, indexes[0], indexes[-1])
+    with open(os.path.join(out_dir, name), 'w') as f:
+        for index in indexes:
+            for turn in range(turns_per_game):
+                f.write(json.dumps({'game_id': f"{num_players}p_{index}", 'turn': turn}) + '\n')
+    return name
+
+
+def test_plan_shards_skips_done_games_and_keeps_boundaries():
+    done = {'4p_0', '4p_1', '4p_2', '5p_3'}
+    tasks = plan_shards([4, 5], 7, 3, done)
+    assert tasks == [(4, [3, 4, 5]), (4, [6]), (5, [0, 1, 2]), (5, [4, 5]), (5, [6])]
+    assert plan_shards([4], 3, 3, {'4p_0', '4p_1', '4p_2'}) == []
+
+
+def test_recover_shards_adds_finished_shard_missing_from_manifest(tmp_path):
+    out_dir = str(tmp_path)
+    listed = write_shard(out_dir, 4, [0, 1])
+    orphan = write_shard(out_dir, 4, [2, 3])
+    # manifest에 쓰다 만 마지막 줄이 남아 있는 경우
+    with open(os.path.join(out_dir, MANIFEST_NAME), 'w') as f:
+        f.write(json.dumps({'shard': listed, 'game_ids': ['4p_0', '4p_1'], 'turns': 6}) + '\n')
+        f.write('{"shard": "4p_0000')
+
+    assert recover_shards(out_dir) == [orphan]
+    assert load_manifest(out_dir) == {'4p_0', '4p_1', '4p_2', '4p_3'}
+    assert plan_shards([4], 4, 2, load_manifest(out_dir)) == []
+    # 다시 불러도 같은 샤드를 두 번 덧붙이지 않음
+    assert recover_shards(out_dir) == []
+
+
+def test_recover_shards_removes_leftover_tmp(tmp_path):
+    out_dir = str(tmp_path)
+    name = shard_name(4, 0, 1)
+    tmp_name = f"{name}.12345.tmp"
+    with open(os.path.join(out_dir, tmp_name), 'w') as f:
+        f.write(json.dumps({'game_id': '4p_0', 'turn': 0}) + '\n')
+    other = os.path.join(out_dir, 'notes.tmp')
+    open(other, 'w').close()
+
+    assert recover_shards(out_dir) == []
+    assert not os.path.exists(os.path.join(out_dir, tmp_name))
+    assert os.path.exists(other)
+    assert load_manifest(out_dir) == set()
+    assert plan_shards([4], 2, 2, load_manifest(out_dir)) == [(4, [0, 1])]
@@ -0,0 +1,93 @@
+# ISMCTS가 합법 수만 두고 게임을 끝까지 진행하는지, availability 수가 그 반복의 결정화에서
+# 가능했던 수에만 더해지는지 확인합니다.
+import random
+
+import pytest
+
+from compact_state import CompactState, MAX_MOVES, decode_move, encode_move
+from dalmuti_game import GameState
+from ismcts import ISMCTS_AI, ISMCTS_Node
+from mcts_pro import MCTS_Pro_AI
+from search_budget import SearchBudget
+
+
+@pytest.mark.parametrize('num_players', [3, 5])
+@pytest.mark.parametrize('seed', range(2))
+def test_plays_legal_moves_until_game_over(num_players, seed):
+    random.seed(seed)
+    ai = ISMCTS_AI(iterations=60, max_plies=100)
+    state = GameState(['mcts'] * num_players)
+    for _ in range(1000):
+        if state.game_over:
+            break
+        move = ai.find_best_move(state)
+        assert move in state.get_possible_moves()
+        state = state.make_move(move)
+    assert state.game_over
+
+
+def test_mode_ismcts_plays_legal_move():
+    random.seed(3)
+    state = GameState(['mcts'] * 4)
+    ai = MCTS_Pro_AI(iterations=50, mode='ismcts')
+    assert ai.find_best_move(state) in state.get_possible_moves()
+
+
+def test_select_child_counts_availability_only_for_legal_moves():
+    node = ISMCTS_Node()
+    moves = [encode_move({'rank': r, 'count': 1}) for r in (3, 5, 7)]
+    for move in moves:
+        child = node.add_child(move, 0)
+        child.visits = 1
+    legal = [moves[0], moves[2]] + [0] * (MAX_MOVES - 2)
+    chosen = node.select_child(legal, 2, 0.7)
+    assert chosen.move in (moves[0], moves[2])
+    assert [node.children[m].avails for m in moves] == [2, 1, 2]
+
+
+def test_search_tree_availability_matches_determinized_legal_moves():
+    """ 탐색 중 select_child가 부를 때마다 avails가 바뀐 자식이 정확히 그 결정화의 합법 수인지 """
+    random.seed(4)
+    calls = []
+    original = ISMCTS_Node.select_child
+
+    def checked(self, legal, n, exploration):
+        before = {move: child.avails for move, child in self.children.items()}
+        chosen = original(self, legal, n, exploration)
+        changed = {move for move, child in self.children.items() if child.avails != before[move]}
+        calls.append((changed, set(legal[:n]), len(self.children)))
+        return chosen
+
+    ISMCTS_Node.select_child = checked
+    try:
+        ai = ISMCTS_AI(iterations=400, max_plies=100)
+        ai.search(GameState(['mcts'] * 4))
+    finally:
+        ISMCTS_Node.select_child = original
+
+    assert calls
+    assert all(changed == legal for changed, legal, _ in calls)
+    # 결정화마다 상대 손패가 달라 합법 수 집합도 달라지므로, 가능하지 않았던 자식이 있는 선택도 나와야 함
+    assert any(len(legal) < size for _, legal, size in calls)
+
+
+def test_tree_invariants_after_search():
+    random.seed(5)
+    state = GameState(['mcts'] * 4)
+    ai = ISMCTS_AI(iterations=300, max_plies=100)
+    root = ISMCTS_Node()
+    root_state = CompactState.from_game_state(state)
+    ai._run(root, root_state, state.turn_index, SearchBudget(300))
+
+    assert root.visits == 300
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        for child in node.children.values():
+            # 자식은 만들어질 때 한 번 가능했고, 선택될 때마다 가능했던 것이므로 avails >= visits
+            assert 1 <= child.visits <= child.avails <= node.visits
+            stack.append(child)
+        assert sum(c.visits for c in node.children.values()) <= node.visits
+    # 관찰자 자신의 수는 결정화와 무관하므로 루트 자식은 실제 합법 수뿐
+    legal = state.get_possible_moves()
+    assert all(decode_move(move) in legal for move in root.children)
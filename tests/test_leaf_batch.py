@@ -0,0 +1,60 @@
+# leaf_batch로 리프를 모아 평가할 때도 AI에 준 플레이아웃 정책/cutoff와 종반 풀이기가 쓰이는지 확인합니다.
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from dalmuti_game import GameState
+from endgame import EndgameSolver
+from mcts_ai import MCTS_AI
+from mcts_pro import MCTS_Pro_AI
+from rollout import RolloutEngine
+
+
+class CountingPolicy:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, state, buf, n, rand):
+        self.calls += 1
+        return buf[int(rand() * n)]
+
+
+@pytest.mark.parametrize('ai_type', [MCTS_AI, MCTS_Pro_AI])
+def test_batched_leaves_use_rollout_policy_and_cutoff(ai_type):
+    random.seed(0)
+    policy = CountingPolicy()
+    engine = RolloutEngine(policy=policy, cutoff=10)
+    ai = ai_type(iterations=64, leaf_batch=8, rollout_engine=engine)
+    assert ai.leaf_batch == 8
+    ai.find_best_move(GameState(['mcts'] * 4))
+    assert policy.calls > 0
+    assert engine.cutoffs > 0
+
+
+@pytest.mark.parametrize('ai_type', [MCTS_AI, MCTS_Pro_AI])
+def test_batched_leaves_use_endgame_solver(ai_type):
+    random.seed(1)
+    solver = EndgameSolver()
+    ai = ai_type(iterations=64, leaf_batch=8, endgame_threshold=200, endgame_solver=solver)
+    state = GameState(['mcts'] * 4)
+    for player in state.players:
+        del player.hand[3:]
+    ai.find_best_move(state)
+    assert solver.misses > 0
+
+
+@pytest.mark.parametrize('ai_type', [MCTS_AI, MCTS_Pro_AI])
+def test_numpy_rollouts_only_for_large_batches(ai_type):
+    from batched_rollout import MIN_EFFICIENT_BATCH
+
+    random.seed(2)
+    small = ai_type(iterations=32, leaf_batch=16)
+    small.find_best_move(GameState(['mcts'] * 4))
+    assert small.batched_rollout.rollouts == 0
+    assert small.rollout_engine.rollouts > 0
+
+    large = ai_type(iterations=MIN_EFFICIENT_BATCH, leaf_batch=MIN_EFFICIENT_BATCH)
+    large.find_best_move(GameState(['mcts'] * 4))
+    assert large.batched_rollout.rollouts == MIN_EFFICIENT_BATCH
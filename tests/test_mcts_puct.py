@@ -0,0 +1,21 @@
+# PUCT 탐색이 루트를 먼저 펼쳐 첫 배치부터 서로 다른 루트 자식으로 리프를 나누는지 확인합니다.
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from dalmuti_game import GameState
+from mcts_puct import MCTS_PUCT_AI, PUCT_Node
+from search_budget import SearchBudget
+
+
+def test_first_batch_spreads_over_root_children():
+    random.seed(0)
+    state = GameState(['mcts'] * 4)
+    ai = MCTS_PUCT_AI(iterations=8, leaf_batch=8)
+    root = PUCT_Node(state)
+    ai._search_puct(root, state, SearchBudget(8, None))
+    assert root.visits == 8
+    assert sum(child.visits for child in root.children) == 8
+    assert sum(1 for child in root.children if child.visits) == min(8, len(root.children))
@@ -0,0 +1,49 @@
+# 정책 신경망 학습이 추론과 같이 합법 수 안에서만 softmax하는지, 상태 벡터에서 만든 합법 수 마스크가
+# GameState.get_possible_moves와 같은지 확인합니다.
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from dalmuti_game import GameState
+from feature_encoder import encode_states
+from policy_net import (NUM_MOVE_SLOTS, PolicyValueNet, game_state_features, legal_slots, move_to_slot,
+                        pad_state_vectors)
+
+
+def random_states(num_players, count, seed):
+    random.seed(seed)
+    states = []
+    while len(states) < count:
+        state = GameState(['mcts'] * num_players)
+        while not state.game_over and len(states) < count:
+            if state.turn_index not in state.passed_in_round:
+                states.append(state.clone())
+            state = state.make_move(random.choice(state.get_possible_moves()))
+    return states
+
+
+@pytest.mark.parametrize('num_players', [2, 4, 6])
+def test_legal_slots_match_possible_moves(num_players):
+    states = random_states(num_players, 300, num_players)
+    mask = legal_slots(pad_state_vectors(encode_states(states), num_players))
+    for state, row in zip(states, mask):
+        assert set(np.flatnonzero(row)) == {move_to_slot(m) for m in state.get_possible_moves()}
+
+
+def test_forced_moves_do_not_train_the_policy():
+    net = PolicyValueNet(hidden=16)
+    states = random_states(4, 64, 0)
+    features = game_state_features(states)
+    slots = np.zeros(len(states), dtype=np.intp)
+    legal = np.zeros((len(states), NUM_MOVE_SLOTS), dtype=bool)
+    legal[:, 0] = True
+    bias = net.params['bp'].copy()
+    policy_loss, _ = net.train_batch(features, slots, np.zeros(len(states), dtype=np.float32), legal=legal)
+    assert policy_loss == pytest.approx(0.0, abs=1e-6)
+    assert np.array_equal(net.params['bp'], bias)
+
+    # 마스크 없이 학습하면 같은 패스 턴이 패스 로짓을 끌어올림
+    net.train_batch(features, slots, np.zeros(len(states), dtype=np.float32))
+    assert net.params['bp'][0] > bias[0]
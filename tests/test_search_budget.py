@@ -0,0 +1,78 @@
+# SearchBudget가 반복 횟수/시간 예산에서 멈추고, 가장 많이 방문한 수가 남은 예산으로 역전될 수 없으면
+# 일찍 멈추며, 가능한 수가 하나뿐이면 탐색 없이 그 수를 돌려주는지 확인합니다.
+import random
+import time
+from types import SimpleNamespace
+
+from dalmuti_game import GameState
+from mcts_ai import MCTS_AI, MCTS_Node
+from mcts_pro import MCTS_Pro_AI
+from search_budget import DECIDED_CHECK_INTERVAL, SearchBudget
+
+
+def root_with_visits(*visits):
+    return SimpleNamespace(children=[SimpleNamespace(visits=v) for v in visits], unexplored_moves=[])
+
+
+def test_first_iteration_always_runs():
+    budget = SearchBudget(iterations=0)
+    assert budget.keep_going(root_with_visits())
+
+
+def test_stops_at_iteration_limit():
+    budget = SearchBudget(iterations=10)
+    budget.done = 10
+    assert not budget.keep_going(root_with_visits(5, 5))
+    assert budget.stop_reason == 'iterations'
+
+
+def test_stops_at_deadline():
+    budget = SearchBudget(time_budget_ms=5)
+    budget.done = 1
+    assert budget.keep_going(root_with_visits(1))
+    time.sleep(0.01)
+    assert not budget.keep_going(root_with_visits(1))
+    assert budget.stop_reason == 'deadline'
+
+
+def test_stops_when_best_move_cannot_be_overtaken():
+    budget = SearchBudget(iterations=100)
+    budget.done = DECIDED_CHECK_INTERVAL * 5
+    # 남은 반복 20번으로 60 vs 15의 차이는 뒤집을 수 없음
+    assert not budget.keep_going(root_with_visits(60, 15, 5))
+    assert budget.stop_reason == 'decided'
+
+    close = SearchBudget(iterations=100)
+    close.done = DECIDED_CHECK_INTERVAL * 5
+    assert close.keep_going(root_with_visits(45, 35))
+    assert close.stop_reason is None
+
+
+def test_decided_check_uses_time_budget_rate():
+    budget = SearchBudget(time_budget_ms=10_000)
+    budget.done = DECIDED_CHECK_INTERVAL
+    budget.start -= 9.0     # 9초 동안 16번, 남은 1초에 약 2번
+    budget.deadline -= 9.0
+    assert budget.keep_going(root_with_visits(10, 9))
+    budget.done = 2 * DECIDED_CHECK_INTERVAL
+    assert not budget.keep_going(root_with_visits(20, 10))
+    assert budget.stop_reason == 'decided'
+
+
+def test_only_move_returns_the_single_move():
+    random.seed(0)
+    state = GameState(['mcts'] * 4)
+    state.play_cards(state.turn_index, *next((m['rank'], m['count']) for m in state.get_possible_moves()
+                                              if m != "pass"))
+    state.passed_in_round.add(state.turn_index)
+
+    budget = SearchBudget(iterations=100)
+    assert budget.only_move(MCTS_Node(state)) == "pass"
+    assert budget.stop_reason == 'single_move'
+    assert SearchBudget(iterations=100).only_move(MCTS_Node(GameState(['mcts'] * 4))) is None
+
+    for ai in (MCTS_AI(iterations=100), MCTS_Pro_AI(iterations=100)):
+        move, stats = ai.search(state)
+        assert move == "pass"
+        assert stats['iterations'] == 0
+        assert stats['stop_reason'] == 'single_move'
@@ -0,0 +1,108 @@
+# SearchStats 계측이 탐색 방식(직렬/배치/병렬)과 상관없이 같은 기준으로 기록되는지 확인합니다.
+import random
+
+import pytest
+
+from dalmuti_game import GameState
+from endgame import EndgameSolver
+from mcts_ai import MCTS_AI
+from mcts_pro import MCTS_Pro_AI
+from search_stats import SearchStats
+
+
+def endgame_state(num_players=4, cards=3):
+    state = GameState(['mcts'] * num_players)
+    for player in state.players:
+        del player.hand[cards:]
+    return state
+
+
+@pytest.mark.parametrize('ai_type', [MCTS_AI, MCTS_Pro_AI])
+def test_playout_histogram_is_per_search_in_events(ai_type):
+    random.seed(0)
+    events = []
+    stats = SearchStats()
+    stats.add_hook(events.append)
+    ai = ai_type(iterations=60, stats=stats)
+    state = GameState(['mcts'] * 4)
+    ai.find_best_move(state)
+    ai.find_best_move(state)
+
+    assert len(events) == 2
+    for event in events:
+        assert sum(event['playout_histogram'].values()) == event['playouts'] == 60
+    total = stats.as_dict()
+    assert sum(total['playout_histogram'].values()) == total['playouts'] == 120
+
+
+@pytest.mark.parametrize('ai_type', [MCTS_AI, MCTS_Pro_AI])
+def test_batched_search_is_instrumented(ai_type):
+    random.seed(1)
+    stats = SearchStats()
+    ai = ai_type(iterations=64, leaf_batch=8, stats=stats)
+    _, search_stats = ai.search(GameState(['mcts'] * 4))
+    event = search_stats['instrumentation']
+    assert event['playouts'] == 64
+    assert sum(event['playout_histogram'].values()) == 64
+    assert event['avg_playout_plies'] > 0
+    assert event['nodes_created'] > 0 and event['max_depth'] > 0
+    assert event['phase_ms']['playout'] > 0 and event['phase_ms']['selection'] > 0
+
+
+@pytest.mark.parametrize('ai_type', [MCTS_AI, MCTS_Pro_AI])
+def test_numpy_batch_records_playout_lengths(ai_type):
+    pytest.importorskip('numpy')
+    from batched_rollout import MIN_EFFICIENT_BATCH
+
+    random.seed(2)
+    stats = SearchStats()
+    ai = ai_type(iterations=MIN_EFFICIENT_BATCH, leaf_batch=MIN_EFFICIENT_BATCH, stats=stats)
+    _, search_stats = ai.search(GameState(['mcts'] * 4))
+    assert ai.batched_rollout.rollouts == MIN_EFFICIENT_BATCH
+    event = search_stats['instrumentation']
+    assert event['playouts'] == MIN_EFFICIENT_BATCH
+    assert event['avg_playout_plies'] > 0
+    assert event['max_playout_plies'] == ai.batched_rollout.last_plies.max()
+
+
+@pytest.mark.parametrize('ai_type', [MCTS_AI, MCTS_Pro_AI])
+@pytest.mark.parametrize('leaf_batch', [1, 8])
+def test_endgame_leaves_are_not_playouts(ai_type, leaf_batch):
+    random.seed(3)
+    stats = SearchStats()
+    ai = ai_type(iterations=40, leaf_batch=leaf_batch, endgame_threshold=200,
+                 endgame_solver=EndgameSolver(), stats=stats)
+    _, search_stats = ai.search(endgame_state())
+    event = search_stats['instrumentation']
+    assert event['endgame_leaves'] == search_stats['iterations']
+    assert event['playouts'] == 0
+    assert event['playout_histogram'] == {}
+    assert event['avg_depth'] > 0
+
+
+def test_root_parallel_merges_worker_records():
+    random.seed(4)
+    stats = SearchStats()
+    ai = MCTS_Pro_AI(iterations=80, workers=2, parallel_mode='root', stats=stats, seed=4)
+    try:
+        _, search_stats = ai.search(GameState(['mcts'] * 4))
+    finally:
+        ai.close()
+    event = search_stats['instrumentation']
+    assert event['playouts'] == search_stats['iterations'] == 80
+    assert sum(event['playout_histogram'].values()) == 80
+    assert event['nodes_created'] > 0
+    assert event['phase_ms']['playout'] > 0
+
+
+def test_leaf_parallel_is_instrumented():
+    random.seed(5)
+    stats = SearchStats()
+    ai = MCTS_Pro_AI(iterations=64, workers=2, parallel_mode='leaf', stats=stats, seed=5)
+    try:
+        _, search_stats = ai.search(GameState(['mcts'] * 4))
+    finally:
+        ai.close()
+    event = search_stats['instrumentation']
+    assert event['playouts'] == 64
+    assert event['avg_playout_plies'] > 0
@@ -0,0 +1,188 @@
+# 서버가 잘못된 요청을 400/409로 거절하고, AI 풀이 가득 차면 503(Retry-After), 제한 시간을 넘기면
+# 504로 답하는지 확인합니다.
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import server
+from dalmuti_game import GameState
+from server import AIPool, GameServer, HTTPError, HTTPHandler, state_from_json, state_to_json
+
+
+def valid_state_json(num_players=4):
+    random.seed(0)
+    return state_to_json(GameState(['mcts'] * num_players))
+
+
+def test_state_round_trip():
+    data = valid_state_json()
+    assert state_to_json(state_from_json(data)) == data
+
+
+def _bad_card(data):
+    data['players'][0]['hand'][0] = 14
+
+
+def _too_many_players(data):
+    data['players'] = data['players'] * 2
+
+
+def _table_mismatch(data):
+    data['table_cards'] = {'cards': [5, 6], 'effective_rank': 5}
+
+
+def _extra_copies(data):
+    data['players'][1]['hand'] += [1, 1]
+
+
+def _empty_hand_in_progress(data):
+    data['players'][2]['hand'] = []
+
+
+def _turn_out_of_range(data):
+    data['turn_index'] = 4
+
+
+def _winner_holds_cards(data):
+    data['game_over'] = True
+    data['winner_index'] = 0
+
+
+def _missing_hand(data):
+    del data['players'][0]['hand']
+
+
+def _non_numeric_card(data):
+    data['players'][0]['hand'][0] = 'joker'
+
+
+@pytest.mark.parametrize('corrupt', [_bad_card, _too_many_players, _table_mismatch, _extra_copies,
+                                     _empty_hand_in_progress, _turn_out_of_range, _winner_holds_cards,
+                                     _missing_hand, _non_numeric_card])
+def test_state_from_json_rejects_invalid_states(corrupt):
+    data = valid_state_json()
+    corrupt(data)
+    with pytest.raises(HTTPError) as e:
+        state_from_json(data)
+    assert e.value.status == 400
+
+
+def read_request(raw):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await server._read_request(reader)
+    return asyncio.run(read())
+
+
+@pytest.mark.parametrize('length', [b'abc', b'-5'])
+def test_bad_content_length_is_400(length):
+    with pytest.raises(HTTPError) as e:
+        read_request(b'POST /api/games HTTP/1.1\r\nContent-Length: ' + length + b'\r\n\r\n{}')
+    assert e.value.status == 400
+
+
+def test_request_is_parsed():
+    method, path, headers, body = read_request(b'post /api/games?x=1 HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}')
+    assert (method, path, body) == ('POST', '/api/games', b'{}')
+    assert headers['content-length'] == '2'
+
+
+class StubPool:
+    def clamp_budget(self, time_budget_ms):
+        return 10
+
+    def stats(self):
+        return {}
+
+
+def call(coroutine_fn, *args):
+    return asyncio.run(coroutine_fn(*args))
+
+
+def status_of(response):
+    return int(response.split(b' ', 2)[1])
+
+
+@pytest.mark.parametrize('body', [b'\xff\xfe{}', b'{"players": ', b'[1, 2]'])
+def test_dispatch_rejects_bad_bodies(body):
+    handler = HTTPHandler(GameServer(StubPool()))
+    response = call(handler.dispatch, 'POST', '/api/games', body, True)
+    assert status_of(response) == 400
+    assert b'"error"' in response
+
+
+def test_illegal_and_malformed_moves():
+    games = GameServer(StubPool())
+    game_id = games.create({'players': ['human'] * 4})['game_id']
+    state = games.games[game_id].state
+    legal = state.get_possible_moves()
+    illegal = next({'rank': rank, 'count': 1} for rank in range(1, 13) if {'rank': rank, 'count': 1} not in legal)
+
+    with pytest.raises(HTTPError) as e:
+        call(games.move, game_id, {'move': illegal})
+    assert e.value.status == 409
+    with pytest.raises(HTTPError) as e:
+        call(games.move, game_id, {'move': {'rank': 'x'}})
+    assert e.value.status == 400
+    with pytest.raises(HTTPError) as e:
+        call(games.move, 'nosuch', {'move': "pass"})
+    assert e.value.status == 404
+
+    before = state_to_json(state)
+    result = call(games.move, game_id, {'move': legal[0]})
+    assert result['state'] != before
+
+
+def test_busy_pool_answers_503_with_retry_after():
+    pool = AIPool(workers=1, max_pending=0, max_time_budget_ms=100)
+    try:
+        handler = HTTPHandler(GameServer(pool))
+        created = json.loads(call(handler.dispatch, 'POST', '/api/games',
+                                  b'{"players": ["mcts", "mcts", "mcts", "mcts"]}', True).split(b'\r\n\r\n', 1)[1])
+        response = call(handler.dispatch, 'POST', f"/api/games/{created['game_id']}/ai-move", b'{}', True)
+        assert status_of(response) == 503
+        assert b'Retry-After: 1\r\n' in response
+        assert pool.rejected == 1 and pool.pending == 0
+    finally:
+        pool.close(wait=True)
+
+
+def test_slow_worker_answers_504(monkeypatch):
+    def slow_worker(state, style, time_budget_ms, seed):
+        time.sleep(0.5)
+        return "pass", {}
+
+    monkeypatch.setattr(server, '_ai_move_worker', slow_worker)
+    monkeypatch.setattr(server, 'QUEUE_GRACE_S', 0.0)
+    pool = AIPool(workers=1, max_pending=4, max_time_budget_ms=100)
+    # 바꿔 끼운 워커 함수를 그대로 쓰도록 프로세스 대신 스레드 풀로 실행
+    pool.executor.shutdown()
+    pool.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def scenario():
+        with pytest.raises(HTTPError) as e:
+            await pool.best_move(GameState(['mcts'] * 4), 'mcts', 10)
+        assert e.value.status == 504
+        assert pool.timed_out == 1 and pool.pending == 1
+        # 워커가 계산을 마치면 대기열에서도 빠짐
+        await asyncio.sleep(0.7)
+        assert pool.pending == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.close(wait=True)
+
+
+def test_closed_pool_answers_503():
+    pool = AIPool(workers=1, max_pending=4, max_time_budget_ms=100)
+    pool.close(wait=True)
+    with pytest.raises(HTTPError) as e:
+        call(pool.best_move, GameState(['mcts'] * 4), 'mcts', 10)
+    assert e.value.status == 503
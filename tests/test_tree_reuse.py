@@ -0,0 +1,67 @@
+# reuse_tree=True일 때 observe()로 따라간 서브트리를 다음 탐색에서 그대로 쓰고,
+# 보관한 루트가 현재 상태와 다르면 새 루트로 바꾸는지 확인합니다.
+import random
+
+import pytest
+
+from dalmuti_game import GameState
+from mcts_ai import MCTS_AI
+from mcts_pro import MCTS_Pro_AI
+
+
+def explored_line(root):
+    """ 루트에서 가장 많이 방문한 자식과 그 자식의 가장 많이 방문한 자식 """
+    child = max((c for c in root.children if c.children), key=lambda c: c.visits)
+    grandchild = max(child.children, key=lambda c: c.visits)
+    return child, grandchild
+
+
+@pytest.mark.parametrize('ai_type', [MCTS_AI, MCTS_Pro_AI])
+def test_observed_moves_reuse_matching_subtree(ai_type):
+    random.seed(0)
+    state = GameState(['mcts'] * 2)
+    ai = ai_type(iterations=300, reuse_tree=True)
+    player = state.turn_index
+    ai.find_best_move(state)
+    root = ai._trees[player]
+    child, grandchild = explored_line(root)
+    if grandchild.game_state.turn_index != player:
+        pytest.skip("explored line does not return to the same player")
+
+    ai.observe(child.move)
+    ai.observe(grandchild.move)
+    assert ai._trees[player] is grandchild
+    assert grandchild.parent is None
+
+    next_state = state.make_move(child.move).make_move(grandchild.move)
+    visits_before = grandchild.visits
+    assert ai._root_for(next_state) is grandchild
+    ai.find_best_move(next_state)
+    assert ai._trees[player] is grandchild
+    assert grandchild.visits > visits_before
+
+
+@pytest.mark.parametrize('ai_type', [MCTS_AI, MCTS_Pro_AI])
+def test_signature_mismatch_rebuilds_root(ai_type):
+    random.seed(1)
+    state = GameState(['mcts'] * 3)
+    ai = ai_type(iterations=50, reuse_tree=True)
+    ai.find_best_move(state)
+    old_root = ai._trees[state.turn_index]
+
+    other = state.clone()
+    other.players[state.turn_index].hand.pop()
+    root = ai._root_for(other)
+    assert root is not old_root
+    assert root.visits == 0 and not root.children
+    assert root.game_state is other
+    assert ai._trees[state.turn_index] is root
+
+
+def test_unexplored_observed_move_drops_tree():
+    random.seed(2)
+    state = GameState(['mcts'] * 3)
+    ai = MCTS_AI(iterations=20, reuse_tree=True)
+    ai.find_best_move(state)
+    ai.observe({'rank': 99, 'count': 1})
+    assert ai._trees == {}
@@ -0,0 +1,82 @@
+# 수마다 증분으로 갱신하는 Zobrist 해시가 처음부터 다시 계산한 값과 같은지 (그래서 경로와 무관하게 같은 상태는
+# 같은 해시를 갖는지), 전치 테이블이 통계를 공유하는지 확인합니다.
+import random
+
+import pytest
+
+from compact_state import CompactState
+from dalmuti_game import GameState
+from mcts_ai import MCTS_AI, MCTS_Node
+from mcts_pro import MCTS_Pro_AI, MCTS_Pro_Node
+from search_budget import SearchBudget
+from transposition import TranspositionTable
+
+
+@pytest.mark.parametrize('num_players', [2, 3, 5, 8])
+@pytest.mark.parametrize('seed', range(4))
+def test_incremental_hash_matches_full_recompute(num_players, seed):
+    random.seed(seed)
+    rng = random.Random(seed)
+    state = GameState(['mcts'] * num_players)
+    assert state.zobrist_hash == state.compute_zobrist_hash()
+    for _ in range(400):
+        if state.game_over:
+            break
+        state = state.make_move(rng.choice(state.get_possible_moves()))
+        assert state.zobrist_hash == state.compute_zobrist_hash()
+        assert state.clone().zobrist_hash == state.zobrist_hash
+        assert CompactState.from_game_state(state).to_game_state(state).zobrist_hash == state.zobrist_hash
+
+
+def test_table_lookup_shares_stats_and_evicts_lru():
+    table = TranspositionTable(max_entries=2)
+    random.seed(5)
+    state = GameState(['mcts'] * 4)
+    key = table.key(state, 0)
+    assert table.lookup(key) is table.lookup(table.key(state.clone(), 0))
+    assert table.key(state, 0) != table.key(state, 1)
+    table.lookup(1)
+    table.lookup(2)
+    assert len(table) == 2 and table.evictions == 1
+    assert table.stats()['hits'] == 1
+
+
+@pytest.mark.parametrize('node_type', [MCTS_Node, MCTS_Pro_Node])
+def test_pass_cycle_counts_shared_stats_once(node_type):
+    # 2인 게임에서 빈 테이블의 선 플레이어가 패스하면 라운드가 다시 시작되어 똑같은 상태로 돌아옴
+    random.seed(6)
+    state = GameState(['mcts'] * 2)
+    cycled = state.make_move("pass")
+    assert cycled.signature() == state.signature() and cycled.zobrist_hash == state.zobrist_hash
+
+    table = TranspositionTable()
+    root = node_type(state, table=table, perspective=state.turn_index)
+    root.unexplored_moves.remove("pass")
+    root.unexplored_moves.append("pass")
+    child = root.expand()
+    assert child.move == "pass" and child.stats is root.stats
+
+    leaf = child.expand()
+    leaf.update(1)
+    assert (root.visits, root.wins) == (1, 1)
+    assert (leaf.visits, leaf.wins) == (1, 1)
+
+    leaf.add_virtual_loss()
+    leaf.update_wins(0.5)
+    assert (root.visits, root.wins) == (2, 1.5)
+
+
+@pytest.mark.parametrize('ai_type', [MCTS_AI, MCTS_Pro_AI])
+@pytest.mark.parametrize('leaf_batch', [1, 8])
+def test_root_visits_match_iterations_with_table(ai_type, leaf_batch):
+    random.seed(7)
+    state = GameState(['mcts'] * 2)
+    table = TranspositionTable()
+    ai = ai_type(iterations=300, leaf_batch=leaf_batch, transposition_table=table)
+    root = ai._root_for(state)
+    budget = SearchBudget(300)
+    if ai_type is MCTS_AI:
+        (ai._run_batched if leaf_batch > 1 else ai._run)(root, state, budget)
+    else:
+        ai._search(root, state, budget)
+    assert root.visits == budget.done
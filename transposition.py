@@ -0,0 +1,92 @@
+# transposition.py
+# MCTS 노드 통계를 같은 상태(전치, transposition)끼리 공유하기 위한 크기 제한 테이블.
+# 키는 GameState.zobrist_hash에 탐색하는 플레이어 관점 키를 섞은 값이고,
+# 가득 차면 가장 오래 쓰이지 않은 항목부터 버립니다(LRU).
+
+import random
+import sys
+from collections import OrderedDict
+
+from dalmuti_game import MAX_PLAYERS
+
+# 같은 상태라도 승리 기준 플레이어가 다르면 통계가 다르므로 관점별 키를 섞습니다.
+_perspective_random = random.Random(0x7AB1E)
+ZOBRIST_PERSPECTIVE = [_perspective_random.getrandbits(64) for _ in range(MAX_PLAYERS)]
+
+
+class NodeStats:
+    """ 노드의 방문/승리 수. 전치 테이블을 쓰면 같은 상태의 노드들이 이 객체 하나를 공유합니다. """
+    __slots__ = ('visits', 'wins')
+
+    def __init__(self):
+        self.visits = 0
+        self.wins = 0
+
+
+def path_stats(node):
+    """ node에서 루트까지 경로에 있는 노드들의 통계 객체를 차례로 내놓습니다. 같은 통계는 한 번만.
+        규칙상 빈 테이블에서도 패스할 수 있어 한 경로에 같은 상태가 다시 나올 수 있고, 전치 테이블을 쓰면
+        그 노드들이 통계를 공유하므로 역전파가 같은 통계를 두 번 세지 않게 합니다. """
+    seen = set()
+    while node is not None:
+        stats = node.stats
+        if id(stats) not in seen:
+            seen.add(id(stats))
+            yield stats
+        node = node.parent
+
+
+class TranspositionTable:
+    def __init__(self, max_entries=200_000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(game_state, perspective):
+        return game_state.zobrist_hash ^ ZOBRIST_PERSPECTIVE[perspective]
+
+    def lookup(self, key):
+        """ key의 통계 객체를 돌려줍니다. 없으면 새로 만들어 넣습니다. """
+        stats = self._entries.get(key)
+        if stats is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return stats
+
+        self.misses += 1
+        stats = NodeStats()
+        self._entries[key] = stats
+        if len(self._entries) > self.max_entries:
+            # 버려진 통계는 이미 그것을 가리키는 노드들에서 계속 쓰이고, 공유만 끊깁니다.
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return stats
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def memory_bytes(self):
+        """ 테이블이 차지하는 메모리 근사치 (딕셔너리 + 키 + 통계 객체) """
+        if not self._entries:
+            return sys.getsizeof(self._entries)
+        key, stats = next(iter(self._entries.items()))
+        per_entry = sys.getsizeof(key) + sys.getsizeof(stats)
+        return sys.getsizeof(self._entries) + per_entry * len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'memory_bytes': self.memory_bytes(),
+        }